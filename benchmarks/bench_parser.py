@@ -0,0 +1,72 @@
+"""
+목록 페이지 파서 벤치마크 - lxml / BeautifulSoup(html.parser) 경로의 페이지당 파싱 시간 비교
+
+두 파서의 결과 DataFrame이 같은지 먼저 확인한 뒤, 각 파서로 모든 픽스처 페이지를 반복 파싱합니다.
+
+사용법:
+    python benchmarks/bench_parser.py [반복 횟수]          - 픽스처 페이지로 측정
+    python benchmarks/bench_parser.py record <종목코드> [페이지 수]  - 실제 목록 페이지를 픽스처로 저장
+"""
+
+import sys
+import time
+import pandas as pd
+from fixtures import load_board_pages, record_board_pages
+from crawler import HAS_LXML, parse_naver_board_list
+
+
+def check_same_output(pages):
+    """두 파서의 결과가 같은지 확인 (다르면 AssertionError)"""
+    for name, html in pages:
+        pd.testing.assert_frame_equal(
+            parse_naver_board_list(html, parser='lxml'),
+            parse_naver_board_list(html, parser='bs4'),
+            obj=name
+        )
+
+
+def bench(pages, parser, repeat):
+    """repeat번 전체 페이지를 파싱하고 (페이지당 ms, 초당 페이지 수, 초당 행 수) 반환"""
+    rows = sum(len(parse_naver_board_list(html, parser=parser)) for _, html in pages)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            parse_naver_board_list(html, parser=parser)
+    elapsed = time.perf_counter() - started
+    parsed = len(pages) * repeat
+    return {
+        'ms_per_page': elapsed / parsed * 1000,
+        'pages_per_sec': parsed / elapsed,
+        'rows_per_sec': rows * repeat / elapsed
+    }
+
+
+def main(repeat=20):
+    pages = load_board_pages()
+    print(f"픽스처 {len(pages)}페이지, 반복 {repeat}회")
+
+    parsers = ['bs4']
+    if HAS_LXML:
+        check_same_output(pages)
+        parsers.append('lxml')
+    else:
+        print("lxml이 설치되어 있지 않아 bs4만 측정합니다")
+
+    results = {parser: bench(pages, parser, repeat) for parser in parsers}
+    for parser, r in results.items():
+        print(f"{parser:5s}: {r['ms_per_page']:.2f}ms/페이지, {r['pages_per_sec']:.0f}페이지/초, {r['rows_per_sec']:.0f}행/초")
+    if 'lxml' in results:
+        print(f"lxml 속도 향상: {results['bs4']['ms_per_page'] / results['lxml']['ms_per_page']:.1f}배")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == 'record':
+        if len(args) < 2:
+            print("사용법: python benchmarks/bench_parser.py record <종목코드> [페이지 수]")
+            sys.exit(1)
+        for path in record_board_pages(args[1], int(args[2]) if len(args) > 2 else 10):
+            print(f"저장: {path}")
+    else:
+        main(int(args[0]) if args else 20)
@@ -0,0 +1,392 @@
+"""
+수집/추출/분석/저장 단계별 처리량 벤치마크 - 네트워크와 실제 DB 없이 실행
+
+저장된(없으면 생성한) 목록/게시글 페이지를 로컬 HTTP 서버(127.0.0.1)로 제공하고, 공유 HTTP 세션이
+finance.naver.com 요청을 그 서버로 보내도록 어댑터를 등록해 크롤러 코드를 그대로 측정합니다.
+- crawl: crawl_stock_discussion() 초당 목록 페이지 수 (HTTP 요청 + 파싱, 동시 요청 수 CRAWLING_CONCURRENCY)
+- content: get_post_content() 초당 게시글 수, 본문 추출만(extract_post_content) 초당 게시글 수
+- sentiment: analyze_post_sentiment() / analyze_posts_batch() 초당 게시글 수
+- save: save_posts_to_db() 초당 행 수 (새 글 / 모두 중복), 기본값은 임시 SQLite 파일 (--db=mysql이면 설정된 DB)
+
+rate limiter와 HTML 캐시는 끄고 측정합니다. 결과는 JSON 파일(기본값 benchmarks/results/pipeline.json)로
+저장하므로, 성능에 영향을 주는 변경에는 결과 파일을 함께 커밋해 리뷰에서 이전 값과 비교할 수 있습니다.
+
+사용법:
+    python benchmarks/bench_pipeline.py [--repeat=N] [--pages=N] [--rows=N] [--db=sqlite|mysql]
+                                        [--out=results.json] [--compare=이전결과.json] [--threshold=0.1]
+    python benchmarks/bench_pipeline.py record <종목코드> [목록 페이지 수] [게시글 수]  - 실제 페이지를 픽스처로 저장
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from sqlalchemy import create_engine, event, text
+from fixtures import (BENCH_DIR, board_page_html, load_board_pages, load_post_pages, record_board_pages,
+                      record_post_pages)
+import crawler
+import database
+from config import CRAWLING_CONFIG, HTML_CACHE_CONFIG, HTTP_CONFIG
+from content_extractor import HAS_LXML, extract_post_content
+from http_client import get_http_session
+from sentiment_analyzer import analyze_post_sentiment, analyze_posts_batch
+
+STOCK_CODE = '139480'
+
+# --db=mysql일 때 저장하는 종목코드 (측정 전후로 이 종목의 행을 삭제)
+BENCH_STOCK_CODE = 'BENCH0'
+
+DEFAULT_OUT = os.path.join(BENCH_DIR, 'results', 'pipeline.json')
+
+# 초당 처리량 비교에서 회귀로 표시할 하락 비율
+REGRESSION_THRESHOLD = 0.10
+
+_SQLITE_SCHEMA = """
+    CREATE TABLE stock_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stock_code VARCHAR(20) NOT NULL,
+        nid BIGINT,
+        date DATETIME,
+        title TEXT,
+        author VARCHAR(100),
+        views VARCHAR(20),
+        likes VARCHAR(20),
+        dislikes VARCHAR(20),
+        link TEXT,
+        content TEXT,
+        content_strategy VARCHAR(20),
+        is_analyzed BOOLEAN DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        blind_key TEXT GENERATED ALWAYS AS (CASE WHEN nid IS NULL THEN date || '|' || author END) STORED,
+        UNIQUE (stock_code, nid),
+        UNIQUE (stock_code, blind_key)
+    )
+"""
+
+
+class FixtureServer:
+    """목록/게시글 픽스처를 제공하는 로컬 HTTP 서버 (board.naver?page=N, board_read.naver?nid=N)"""
+
+    def __init__(self, board_pages, post_pages):
+        self.board_pages = [html.encode('utf-8') for _, html in board_pages]
+        self.post_pages = [html.encode('utf-8') for _, html in post_pages]
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive (공유 세션의 연결 재사용 포함해서 측정)
+            disable_nagle_algorithm = True  # 헤더/본문을 따로 쓰므로 지연 ACK 대기(약 40ms) 방지
+
+            def do_GET(self):
+                body = server.page(self.path)
+                self.send_response(200 if body is not None else 404)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body or b'')))
+                self.end_headers()
+                self.wfile.write(body or b'')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def page(self, path):
+        """요청 경로의 페이지 (목록은 페이지 번호, 게시글은 글 번호로 픽스처를 순환해서 선택)"""
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        if parsed.path.endswith('board.naver'):
+            page = int(query.get('page', ['1'])[0])
+            return self.board_pages[(page - 1) % len(self.board_pages)]
+        if parsed.path.endswith('board_read.naver') and query.get('nid'):
+            return self.post_pages[int(query['nid'][0]) % len(self.post_pages)]
+        return None
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LocalAdapter(HTTPAdapter):
+    """요청 URL의 호스트를 로컬 서버로 바꿔 보내는 어댑터 (경로/쿼리는 그대로)"""
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+        request.url = f"{self.base_url}{parsed.path}?{parsed.query}"
+        return super().send(request, **kwargs)
+
+
+def _rate(count, elapsed):
+    return round(count / elapsed, 1) if elapsed > 0 else 0.0
+
+
+def _best_of(repeat, func):
+    """func()를 repeat번 실행해 (가장 짧은 시간, 마지막 결과) 반환 - 처리량은 최솟값 기준 (잡음 감소)"""
+    best, result = float('inf'), None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def bench_crawl(pages, repeat):
+    """crawl_stock_discussion()으로 1~pages 페이지 수집"""
+    elapsed, df = _best_of(repeat, lambda: crawler.crawl_stock_discussion(STOCK_CODE, 1, pages))
+    return {
+        'pages': pages,
+        'elapsed_sec': round(elapsed, 3),
+        'pages_per_sec': _rate(pages, elapsed),
+        'rows_per_sec': _rate(len(df), elapsed),
+        'concurrency': CRAWLING_CONFIG['concurrency']
+    }, df
+
+
+def bench_content(links, post_pages, repeat):
+    """get_post_content()로 게시글 링크를 차례로 요청/추출하고, 같은 페이지의 추출만 따로 측정"""
+    elapsed, bodies = _best_of(repeat, lambda: [crawler.get_post_content(link) for link in links])
+    extract_elapsed, _ = _best_of(repeat, lambda: [extract_post_content(html, stats=None) for _, html in post_pages])
+    return {
+        'posts': len(links),
+        'elapsed_sec': round(elapsed, 3),
+        'bodies_per_sec': _rate(len(links), elapsed),
+        'extract_only_per_sec': _rate(len(post_pages), extract_elapsed),
+        'empty_bodies': sum(1 for body in bodies if not body)
+    }, bodies
+
+
+def bench_sentiment(texts, repeat, size=2000):
+    """게시글별 analyze_post_sentiment()와 한 번에 처리하는 analyze_posts_batch() 비교 (본문을 반복해 size건)"""
+    corpus = (texts * (size // max(1, len(texts)) + 1))[:size]
+    elapsed, _ = _best_of(repeat, lambda: [analyze_post_sentiment(content) for content in corpus])
+    batch_elapsed, _ = _best_of(repeat, lambda: analyze_posts_batch(corpus))
+    return {
+        'posts': len(corpus),
+        'elapsed_sec': round(elapsed, 3),
+        'posts_per_sec': _rate(len(corpus), elapsed),
+        'batch_posts_per_sec': _rate(len(corpus), batch_elapsed)
+    }
+
+
+def _sqlite_engine(path):
+    """save_posts_to_db()의 MySQL 문법(INSERT IGNORE)을 SQLite 문법으로 바꿔 실행하는 엔진"""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, 'before_cursor_execute', retval=True)
+    def _mysql_to_sqlite(conn, cursor, statement, parameters, context, executemany):
+        return statement.replace('INSERT IGNORE', 'INSERT OR IGNORE'), parameters
+
+    with engine.begin() as conn:
+        conn.execute(text(_SQLITE_SCHEMA))
+    return engine
+
+
+def _board_rows(count):
+    """저장 측정용 게시글 DataFrame (생성 목록 페이지를 파싱해 글 번호가 모두 다른 count행)"""
+    frames = []
+    page = 1
+    while sum(len(frame) for frame in frames) < count:
+        frames.append(crawler.parse_naver_board_list(board_page_html(STOCK_CODE, page)))
+        page += 1
+    return pd.concat(frames, ignore_index=True).head(count)
+
+
+def bench_save(rows, db):
+    """save_posts_to_db()로 새 글 rows행을 저장한 뒤, 같은 행을 다시 저장(모두 중복)"""
+    posts_df = _board_rows(rows)
+    stock_code = STOCK_CODE
+    tmp_dir = None
+    if db == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix='bench_db_')
+        database._engine = _sqlite_engine(os.path.join(tmp_dir, 'bench.db'))
+    else:
+        stock_code = BENCH_STOCK_CODE
+    engine = database.get_db_connection()
+    if engine is None:
+        raise RuntimeError("데이터베이스 연결 실패")
+
+    delete_query = text("DELETE FROM stock_posts WHERE stock_code = :stock_code")
+    try:
+        if db == 'mysql':
+            with engine.begin() as conn:
+                conn.execute(delete_query, {'stock_code': stock_code})
+
+        started = time.perf_counter()
+        inserted = database.save_posts_to_db(posts_df, stock_code, raise_on_error=True)
+        elapsed = time.perf_counter() - started
+
+        dup_started = time.perf_counter()
+        resaved = database.save_posts_to_db(posts_df, stock_code, raise_on_error=True)
+        dup_elapsed = time.perf_counter() - dup_started
+    finally:
+        if db == 'mysql':
+            with engine.begin() as conn:
+                conn.execute(delete_query, {'stock_code': stock_code})
+        database.dispose_db_connection()
+        if tmp_dir:
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
+
+    return {
+        'db': db,
+        'rows': rows,
+        'inserted': inserted,
+        'elapsed_sec': round(elapsed, 3),
+        'rows_per_sec': _rate(rows, elapsed),
+        'duplicate_rows_per_sec': _rate(rows, dup_elapsed),
+        'resaved_rows': resaved  # 같은 행을 다시 저장했을 때 새로 들어간 행 (중복 키가 모두 걸러내면 0)
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _throughputs(results):
+    """결과 dict에서 '단계.지표' -> 초당 처리량 값만 모음"""
+    return {
+        f"{stage}.{name}": value
+        for stage, metrics in results.items()
+        for name, value in metrics.items()
+        if name.endswith('_per_sec')
+    }
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """이전 결과 파일과 초당 처리량 비교 - threshold 비율 이상 느려진 지표 목록 반환"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = _throughputs(json.load(f)['results'])
+    regressions = []
+    for name, value in _throughputs(results).items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = value / old - 1
+        marker = ''
+        if change <= -threshold:
+            marker = '  <- 회귀'
+            regressions.append(name)
+        print(f"  {name:35s} {old:>10.1f} -> {value:>10.1f} ({change:+.0%}){marker}")
+    return regressions
+
+
+def main(repeat=3, pages=20, rows=10000, db='sqlite', out_path=DEFAULT_OUT, baseline_path=None,
+         threshold=REGRESSION_THRESHOLD):
+    board_pages = load_board_pages()
+    post_pages = load_post_pages()
+    print(f"픽스처: 목록 {len(board_pages)}페이지, 게시글 {len(post_pages)}페이지 "
+          f"({'저장된 페이지' if not board_pages[0][0].startswith('generated_') else '생성'}), 반복 {repeat}회")
+
+    # 측정 대상 외의 대기/캐시 끄기
+    crawler.rate_limiter.min_interval = 0.0
+    HTML_CACHE_CONFIG['dir'] = ''
+
+    results = {}
+    with FixtureServer(board_pages, post_pages) as server:
+        get_http_session().mount('https://finance.naver.com/', LocalAdapter(
+            server.base_url, pool_connections=HTTP_CONFIG['pool_connections'], pool_maxsize=HTTP_CONFIG['pool_maxsize']
+        ))
+        crawler.crawl_stock_discussion(STOCK_CODE, 1, 1)  # 연결/모듈 준비
+        results['crawl'], posts_df = bench_crawl(pages, repeat)
+        links = [link for link in posts_df['링크'] if crawler.extract_nid(link)][:len(post_pages)]
+        results['content'], bodies = bench_content(links, post_pages, repeat)
+
+    titles = posts_df['제목'].head(len(bodies)).tolist()
+    texts = [f"{title} {body}".strip() for title, body in zip(titles, bodies)]
+    results['sentiment'] = bench_sentiment(texts, repeat)
+    results['save'] = bench_save(rows, db)
+
+    print(f"crawl    : {results['crawl']['pages_per_sec']:.1f}페이지/초 ({results['crawl']['rows_per_sec']:.0f}행/초)")
+    print(f"content  : {results['content']['bodies_per_sec']:.1f}건/초 "
+          f"(추출만 {results['content']['extract_only_per_sec']:.1f}건/초, 빈 본문 {results['content']['empty_bodies']}건)")
+    print(f"sentiment: {results['sentiment']['posts_per_sec']:.0f}건/초 "
+          f"(analyze_posts_batch {results['sentiment']['batch_posts_per_sec']:.0f}건/초)")
+    print(f"save     : {results['save']['rows_per_sec']:.0f}행/초 "
+          f"(중복 {results['save']['duplicate_rows_per_sec']:.0f}행/초, {db})")
+
+    report = {
+        'benchmark': 'pipeline',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'lxml': HAS_LXML,
+            'list_parser': CRAWLING_CONFIG['list_parser']
+        },
+        'fixtures': {
+            'board_pages': len(board_pages),
+            'post_pages': len(post_pages),
+            'generated': board_pages[0][0].startswith('generated_')
+        },
+        'parameters': {'repeat': repeat, 'pages': pages, 'rows': rows},
+        'results': results
+    }
+
+    regressions = []
+    if baseline_path:
+        print(f"이전 결과 비교: {baseline_path}")
+        regressions = compare(results, baseline_path, threshold)
+
+    if out_path:
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"결과 저장: {out_path}")
+    return report, regressions
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+
+    if args and args[0] == 'record':
+        if len(args) < 2:
+            print("사용법: python benchmarks/bench_pipeline.py record <종목코드> [목록 페이지 수] [게시글 수]")
+            sys.exit(1)
+        saved = record_board_pages(args[1], int(args[2]) if len(args) > 2 else 10)
+        saved += record_post_pages(args[1], int(args[3]) if len(args) > 3 else 50)
+        for path in saved:
+            print(f"저장: {path}")
+        sys.exit(0)
+
+    db = options.get('db', 'sqlite')
+    if db not in ('sqlite', 'mysql'):
+        print("--db는 sqlite 또는 mysql이어야 합니다")
+        sys.exit(1)
+    _, regressions = main(
+        repeat=int(options.get('repeat', 3)),
+        pages=int(options.get('pages', 20)),
+        rows=int(options.get('rows', 10000)),
+        db=db,
+        out_path=options.get('out', DEFAULT_OUT),
+        baseline_path=options.get('compare'),
+        threshold=float(options.get('threshold', REGRESSION_THRESHOLD))
+    )
+    # 이전 결과보다 느려진 지표가 있으면 종료 코드 1
+    sys.exit(1 if regressions else 0)
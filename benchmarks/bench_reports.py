@@ -0,0 +1,185 @@
+"""
+패턴 리포트 벤치마크 - 합성 게시글 규모별로 주간/월간 리포트 생성 시간을 단계별로 측정
+
+synthetic_posts.py로 지정한 건수의 합성 게시글을 만든 뒤 (이미 같은 건수가 있으면 그대로 사용),
+hourly_sentiment_cube 전체 집계 시간을 재고 PatternAnalyzer.generate_weekly_report() /
+generate_monthly_report()를 단계별로 나누어 측정합니다.
+- rollup: 리포트 전에 하는 hourly_sentiment_cube 증분 갱신 (refresh_cube=True로 만든 PatternAnalyzer, refresh_hourly_cube)
+- query: 집계 셀 조회와 파생 컬럼 계산 (_load_cells, rollup 제외)
+- aggregate: 요약 통계/요일별/장중-장외 집계와 출력 (전체 시간에서 나머지 단계를 뺀 시간)
+- plot: 차트 그리기 (_plot_weekly_patterns / _plot_monthly_patterns, save 제외)
+- save: 차트 파일 저장 (plt.savefig)
+
+MariaDB가 필요하며 합성 게시글을 저장하므로 벤치마크용 DB(DB_NAME)에서 실행하세요.
+차트는 임시 디렉토리에 저장하고 README는 갱신하지 않습니다.
+결과는 JSON 파일(기본값 benchmarks/results/reports.json)로 저장합니다.
+
+사용법:
+    python benchmarks/bench_reports.py [--sizes=1000000,10000000] [--repeat=3] [--stocks=10] [--days=365]
+                                       [--out=results.json] [--keep]
+    (--keep: 측정 후 합성 게시글을 지우지 않음)
+"""
+
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from fixtures import BENCH_DIR
+from synthetic_posts import clear_synthetic, generate_posts, synthetic_codes, synthetic_count
+import pattern_analyzer
+from pattern_analyzer import PatternAnalyzer
+from summary_rollup import refresh_hourly_cube
+
+DEFAULT_OUT = os.path.join(BENCH_DIR, 'results', 'reports.json')
+
+PHASES = ('rollup', 'query', 'aggregate', 'plot', 'save')
+
+# 리포트 종류 -> (리포트 메서드, 차트 메서드)
+REPORTS = {
+    'weekly': ('generate_weekly_report', '_plot_weekly_patterns'),
+    'monthly': ('generate_monthly_report', '_plot_monthly_patterns'),
+}
+
+
+class PhaseTimer:
+    """감싼 함수의 실행 시간을 단계별로 누적 (안쪽에서 호출된 다른 단계의 시간은 빼서 계산)"""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._nested = []
+
+    def wrap(self, phase, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            self._nested.append(0.0)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.totals[phase] += elapsed - self._nested.pop()
+                if self._nested:
+                    self._nested[-1] += elapsed
+        return timed
+
+
+def time_report(analyzer, report, stock_code, target_date):
+    """리포트 한 번 생성하고 단계별 시간(초)과 전체 시간 반환 (리포트 출력은 숨김)"""
+    report_method, plot_method = REPORTS[report]
+    timer = PhaseTimer()
+    savefig = pattern_analyzer.plt.savefig
+    refresh = pattern_analyzer.refresh_hourly_cube
+
+    # 인스턴스/모듈 속성을 잠시 바꿔 끼워 측정 (리포트 코드는 그대로 실행)
+    pattern_analyzer.refresh_hourly_cube = timer.wrap('rollup', refresh)
+    pattern_analyzer.plt.savefig = timer.wrap('save', savefig)
+    analyzer._load_cells = timer.wrap('query', PatternAnalyzer._load_cells.__get__(analyzer))
+    setattr(analyzer, plot_method, timer.wrap('plot', getattr(PatternAnalyzer, plot_method).__get__(analyzer)))
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = getattr(analyzer, report_method)(stock_code, target_date)
+        total = time.perf_counter() - started
+    finally:
+        pattern_analyzer.refresh_hourly_cube = refresh
+        pattern_analyzer.plt.savefig = savefig
+        del analyzer._load_cells
+        delattr(analyzer, plot_method)
+
+    if result is None:
+        raise RuntimeError(f"{report} 리포트 생성 실패 (데이터 없음)")
+    phases = {phase: timer.totals[phase] for phase in PHASES if phase != 'aggregate'}
+    phases['aggregate'] = max(0.0, total - sum(phases.values()))
+    return {phase: round(phases[phase], 4) for phase in PHASES}, round(total, 4)
+
+
+def bench_size(posts, repeat, stocks, days):
+    """합성 게시글 posts건에서 cube 전체 집계와 리포트별 단계 시간 측정"""
+    codes = synthetic_codes(stocks)
+    existing = synthetic_count()
+    if existing != posts:
+        if existing:
+            clear_synthetic()
+        print(f"합성 게시글 {posts}건 생성 중...")
+        started = time.perf_counter()
+        generate_posts(posts, stocks=stocks, days=days)
+        print(f"  {time.perf_counter() - started:.1f}초")
+
+    # 생성 직후에는 모든 날짜가 갱신 대상이므로 전체 집계를 따로 측정하고, 리포트는 증분 갱신 상태에서 측정
+    started = time.perf_counter()
+    cells = sum(refresh_hourly_cube(code, full=True) for code in codes)
+    cube_sec = time.perf_counter() - started
+    print(f"hourly_sentiment_cube 전체 집계: {cube_sec:.2f}초 ({cells}개 셀)")
+
+    # generate_posts()는 오늘 기준 days일 전부터 어제까지 생성 - 주간은 어제까지 7일, 월간은 지난달 전체
+    yesterday = datetime.now() - timedelta(days=1)
+    targets = {
+        'weekly': yesterday.strftime('%Y-%m-%d'),
+        'monthly': (datetime.now().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+    }
+    # 리포트 직전 증분 갱신까지 rollup 단계로 측정 (기본 PatternAnalyzer는 셀을 읽기만 함)
+    analyzer = PatternAnalyzer(auto_update_readme=False, refresh_cube=True)
+    results = {'posts': posts, 'cube_full_refresh_sec': round(cube_sec, 3), 'cube_cells': cells, 'reports': {}}
+    for report in REPORTS:
+        runs = [time_report(analyzer, report, codes, targets[report]) for _ in range(max(1, repeat))]
+        best_phases, best_total = min(runs, key=lambda run: run[1])
+        results['reports'][report] = {'total_sec': best_total, 'phases_sec': best_phases,
+                                      'runs_total_sec': [total for _, total in runs]}
+        print(f"{report:8s}: {best_total:.3f}초 - " +
+              ', '.join(f"{phase} {best_phases[phase]:.3f}" for phase in PHASES))
+    return results
+
+
+def main(sizes=(1000000, 10000000), repeat=3, stocks=10, days=365, out_path=DEFAULT_OUT, keep=False):
+    report = {
+        'benchmark': 'reports',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seaborn': pattern_analyzer.HAS_SEABORN
+        },
+        'parameters': {'repeat': repeat, 'stocks': stocks, 'days': days},
+        'sizes': {}
+    }
+
+    # 차트는 임시 디렉토리의 generate/에 저장 (PatternAnalyzer는 현재 디렉토리 기준으로 저장)
+    cwd = os.getcwd()
+    out_path = os.path.abspath(out_path) if out_path else None
+    try:
+        with tempfile.TemporaryDirectory(prefix='bench_reports_') as chart_dir:
+            os.chdir(chart_dir)
+            for posts in sizes:
+                print(f"=== 게시글 {posts}건 ===")
+                report['sizes'][str(posts)] = bench_size(posts, repeat, stocks, days)
+    finally:
+        os.chdir(cwd)
+        if not keep:
+            clear_synthetic()
+
+    if out_path:
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"결과 저장: {out_path}")
+    return report
+
+
+if __name__ == "__main__":
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+    main(
+        sizes=[int(float(size)) for size in options.get('sizes', '1000000,10000000').split(',')],
+        repeat=int(options.get('repeat', 3)),
+        stocks=int(options.get('stocks', 10)),
+        days=int(options.get('days', 365)),
+        out_path=options.get('out', DEFAULT_OUT),
+        keep='--keep' in sys.argv
+    )
@@ -0,0 +1,202 @@
+"""
+벤치마크용 HTML 픽스처 - 저장해 둔 네이버 종목토론실 페이지를 읽거나, 없으면 같은 구조의 페이지를 생성
+
+record_board_pages()/record_post_pages()로 실제 목록/게시글 페이지를 fixtures/board/, fixtures/post/ 아래에
+저장해 두면 그 페이지를 우선 사용합니다.
+생성 목록 페이지는 실제 목록과 같은 마크업(헤더/구분선 행, 댓글 수, 클린봇 블라인드 글)을,
+생성 게시글 페이지는 본문 테이블(summary="게시판 글 본문보기")과 이전글/다음글 목록, 푸터를 흉내 냅니다.
+"""
+
+import glob
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from html import escape
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'source')
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+# source/의 모듈은 flat import(from config import ...)를 쓰므로 경로에 추가
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
+
+TITLES = [
+    '오늘 장 마감 후 공시 나올까요', '외인 매도세 언제까지', '실적 발표 기대됩니다', '물타기 해야 하나',
+    '목표가 상향 리포트 나왔네요', '거래량 터졌습니다', '손절하고 나갑니다', '배당 정보 공유합니다',
+    '내일 시초가 예상', '이 가격이면 저점 매수 기회', '기관 순매수 전환', '반등 언제 오나요'
+]
+
+AUTHORS = ['주식초보****', 'kim1****', '장투맨****', 'abc1****', '단타왕****', '개미****']
+
+# 게시글 본문 문장 (감정 사전의 긍정/부정 키워드가 섞이도록)
+SENTENCES = [
+    '오늘 외인 매수세가 계속 들어오네요', '실적 발표 이후 반등 기대합니다', '목표가 상향 리포트 보고 추가 매수했습니다',
+    '거래량 없이 하락하는 게 걱정입니다', '손절 라인 깨지면 매도하려고요', '악재는 이미 다 반영된 것 같습니다',
+    '장기 투자 관점에서는 아직 저평가', '급락 나오면 분할로 모아갈 생각', '공매도 물량이 부담이네요',
+    '내일 시초가 갭상승 나올까요', '배당 기준일 전에 들어갈지 고민 중', '수급이 좋아서 우상향 전망합니다',
+    '그냥 지켜보는 중입니다', '다들 평단가 얼마인가요', '이번 분기 적자 전환이라 불안합니다'
+]
+
+
+def _board_row(nid, stock_code, posted_at, rng):
+    """목록 테이블의 게시글 행 하나"""
+    date = posted_at.strftime('%Y.%m.%d %H:%M')
+    author = rng.choice(AUTHORS)
+    views, likes, dislikes = rng.randint(0, 500), rng.randint(0, 30), rng.randint(0, 10)
+
+    if rng.random() < 0.05:
+        title_td = '<td class="title"><span class="cleanbot_list_blind">클린봇이 이용자 보호를 위해 숨긴 게시물입니다.</span></td>'
+    else:
+        title = escape(rng.choice(TITLES))
+        replies = f'\n<span class="tah p9" style="color:#ff6600;">[{rng.randint(1, 20)}]</span>' if rng.random() < 0.3 else ''
+        title_td = (
+            f'<td class="title">\n'
+            f'<a href="/item/board_read.naver?code={stock_code}&amp;nid={nid}&amp;st=&amp;sw=&amp;page=1" '
+            f'title="{title}">{title}</a>{replies}\n</td>'
+        )
+
+    return (
+        '<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)">\n'
+        f'<td><span class="tah p10 gray03">{date}</span></td>\n'
+        f'{title_td}\n'
+        f'<td class="p11"><span class="gray03 p11">{escape(author)}</span></td>\n'
+        f'<td><span class="tah p10 gray03">{views}</span></td>\n'
+        f'<td><strong class="tah p10 red01">{likes}</strong></td>\n'
+        f'<td><strong class="tah p10 blue01">{dislikes}</strong></td>\n'
+        '</tr>\n'
+        '<tr><td colspan="6" class="blank_02"><img src="https://ssl.pstatic.net/static/nfinance/blank.gif" width="1" height="1" alt=""></td></tr>\n'
+    )
+
+
+def board_page_html(stock_code='139480', page=1, rows=20, top_nid=400000000, now=None, seed=None):
+    """목록 페이지 HTML 생성 (page가 커질수록 오래된 글, 글 번호는 페이지마다 rows씩 감소)"""
+    rng = random.Random(seed if seed is not None else page)
+    now = now or datetime(2025, 7, 1, 15, 30)
+    first_nid = top_nid - (page - 1) * rows
+    body = []
+    for i in range(rows):
+        offset = (page - 1) * rows + i
+        body.append(_board_row(first_nid - i, stock_code, now - timedelta(minutes=7 * offset), rng))
+
+    return (
+        '<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>종목토론실 : 네이버 페이 증권</title>\n</head>\n<body>\n'
+        '<div id="wrap"><div id="content">\n'
+        '<table class="type2" summary="게시판 리스트">\n<caption>게시판 리스트</caption>\n'
+        '<colgroup><col width="120"><col><col width="90"><col width="50"><col width="50"><col width="50"></colgroup>\n'
+        '<thead><tr><th scope="col">날짜</th><th scope="col">제목</th><th scope="col">글쓴이</th>'
+        '<th scope="col">조회</th><th scope="col">공감</th><th scope="col">비공감</th></tr></thead>\n'
+        '<tbody>\n<tr><td colspan="6" class="blank_07"></td></tr>\n'
+        + ''.join(body) +
+        '</tbody>\n</table>\n'
+        f'<table class="Nnavi"><tr><td class="on"><a href="/item/board.naver?code={stock_code}&amp;page={page}">{page}</a></td>'
+        f'<td class="pgRR"><a href="/item/board.naver?code={stock_code}&amp;page=1000">맨뒤</a></td></tr></table>\n'
+        '</div></div>\n</body>\n</html>\n'
+    )
+
+
+def post_page_html(stock_code='139480', nid=400000000, seed=None, lines=None):
+    """게시글 페이지 HTML 생성 (본문은 1~30줄, seed가 같으면 같은 페이지)"""
+    rng = random.Random(seed if seed is not None else nid)
+    title = escape(rng.choice(TITLES))
+    lines = lines or rng.randint(1, 30)
+    body = '<br>\n'.join(escape(rng.choice(SENTENCES)) for _ in range(lines))
+    posted_at = datetime(2025, 7, 1, 15, 30) - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+    nav = ''.join(
+        f'<tr><th>{label}</th><td class="title"><a href="/item/board_read.naver?code={stock_code}&amp;nid={nid + step}">'
+        f'{escape(rng.choice(TITLES))}</a></td><td class="p11">{escape(rng.choice(AUTHORS))}</td>'
+        f'<td><span class="tah p10 gray03">{posted_at.strftime("%Y.%m.%d %H:%M")}</span></td></tr>\n'
+        for label, step in (('이전글', -1), ('다음글', 1))
+    )
+
+    return (
+        '<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{title} : 네이버 페이 증권</title>\n'
+        '<script type="text/javascript">var nsc = "finance.stockend"; var boardTitle = "종목토론실 상승 기대";</script>\n'
+        '</head>\n<body>\n<div id="wrap"><div id="content">\n'
+        '<table class="view" summary="게시판 글 본문보기">\n<caption>게시판 글 본문보기</caption>\n'
+        f'<tr><th class="title"><strong class="c p15">{title}</strong></th></tr>\n'
+        f'<tr><th class="info"><span class="tah p11 gray03">{posted_at.strftime("%Y.%m.%d %H:%M")}</span> '
+        f'<span class="tah p11">조회 {rng.randint(0, 500)}</span> <span class="tah p11">공감 {rng.randint(0, 30)}</span> '
+        f'<span class="tah p11">비공감 {rng.randint(0, 10)}</span></th></tr>\n'
+        f'<tr><td class="p11">작성자 <strong>{escape(rng.choice(AUTHORS))}</strong> <span class="gray03">IP 211.234.***.***</span></td></tr>\n'
+        f'<tr><td class="view_text"><div id="body" class="view_se">{body}</div></td></tr>\n'
+        '<tr><td><a href="#">신고</a> | <a href="#">스크랩</a></td></tr>\n'
+        '</table>\n'
+        f'<table class="type2" summary="이전글 다음글">\n{nav}</table>\n'
+        f'<div class="btn_area"><a href="/item/board.naver?code={stock_code}">목록</a></div>\n'
+        '</div></div>\n'
+        '<div id="footer"><address>Copyright &copy; NAVER Financial Corp. All Rights Reserved.</address></div>\n'
+        '</body>\n</html>\n'
+    )
+
+
+def _load_recorded(kind):
+    """fixtures/<kind>/*.html을 (이름, HTML) 목록으로 읽음"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, kind, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def load_board_pages(count=10, stock_code='139480'):
+    """저장된 목록 페이지(fixtures/board/*.html)를 읽고, 없으면 count개 생성해 (이름, HTML) 목록 반환"""
+    pages = _load_recorded('board')
+    if pages:
+        return pages
+    return [(f"generated_{stock_code}_{page}.html", board_page_html(stock_code, page)) for page in range(1, count + 1)]
+
+
+def load_post_pages(count=50, stock_code='139480'):
+    """저장된 게시글 페이지(fixtures/post/*.html)를 읽고, 없으면 count개 생성해 (이름, HTML) 목록 반환"""
+    pages = _load_recorded('post')
+    if pages:
+        return pages
+    return [(f"generated_{stock_code}_{nid}.html", post_page_html(stock_code, nid))
+            for nid in range(400000000, 400000000 - count, -1)]
+
+
+def record_board_pages(stock_code, pages=10):
+    """실제 목록 페이지를 fixtures/board/에 저장 (네트워크 필요, crawler의 rate limiter 사용)"""
+    from crawler import get_discussion_url, rate_limiter
+    from http_client import fetch
+
+    target = os.path.join(FIXTURE_DIR, 'board')
+    os.makedirs(target, exist_ok=True)
+    saved = []
+    for page in range(1, pages + 1):
+        url = get_discussion_url(stock_code, page)
+        rate_limiter.wait(url)
+        html = fetch(url)
+        path = os.path.join(target, f"{stock_code}_{page}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        saved.append(path)
+    return saved
+
+
+def record_post_pages(stock_code, count=50):
+    """실제 게시글 페이지를 fixtures/post/에 저장 - 목록 앞쪽 페이지의 글 중 count개 (네트워크 필요)"""
+    from crawler import extract_nid, get_discussion_url, parse_naver_board_list, rate_limiter
+    from http_client import fetch
+
+    target = os.path.join(FIXTURE_DIR, 'post')
+    os.makedirs(target, exist_ok=True)
+    saved = []
+    page = 1
+    while len(saved) < count and page <= 10:
+        url = get_discussion_url(stock_code, page)
+        rate_limiter.wait(url)
+        links = [link for link in parse_naver_board_list(fetch(url))['링크'] if extract_nid(link)]
+        for link in links[:count - len(saved)]:
+            rate_limiter.wait(link)
+            html = fetch(link)
+            path = os.path.join(target, f"{stock_code}_{extract_nid(link)}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            saved.append(path)
+        page += 1
+    return saved
@@ -0,0 +1,355 @@
+"""
+합성 게시글 생성기 - 리포트 벤치마크용으로 stock_posts/post_analysis에 실제와 비슷한 분포의 게시글 수백만 건 저장
+
+실제 종목토론실 데이터의 모양을 흉내 냅니다.
+- 날짜: 평일이 주말보다 많고, 가끔 이슈가 있는 날은 글이 몇 배로 늘어남 (그날 분위기도 한쪽으로 치우침)
+- 시간: 평일은 장 시작(9시) 직후와 장 마감(15시) 전후, 저녁 시간에 몰리고 새벽에는 거의 없음 (주말은 완만)
+- 종목: 소수 종목에 글이 몰리는 Zipf 분포
+- 분석 결과: 중립이 가장 많고 긍정/부정 비율은 날짜별 분위기에 따라 움직임, 강세/약세 전망과 위험도는 레이블과 상관
+- 최근 일부 게시글은 아직 분석되지 않은 상태(is_analyzed = FALSE, post_analysis 행 없음)
+
+합성 게시글은 SYN으로 시작하는 종목코드(SYN001, ...)로 저장하므로 clear_synthetic()으로 모두 지울 수 있습니다.
+id를 직접 지정해 multi-row INSERT로 저장하므로 크롤러가 동시에 저장하지 않는 벤치마크용 DB(DB_NAME)에서 실행하세요.
+
+사용법:
+    python benchmarks/synthetic_posts.py generate <게시글 수> [--stocks=10] [--days=365] [--start=YYYY-MM-DD] [--seed=42]
+    python benchmarks/synthetic_posts.py count
+    python benchmarks/synthetic_posts.py clear
+"""
+
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from fixtures import AUTHORS, SENTENCES, TITLES
+from database import get_db_connection
+from keyword_matcher import get_lexicon
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_PREFIX = 'SYN'
+
+# 첫 글 번호 (실제 nid와 겹치지 않는 범위)
+NID_BASE = 900000000
+
+INSERT_CHUNK_SIZE = 20000
+DELETE_CHUNK_SIZE = 50000
+
+# 시간대별 상대 비중 (0~23시) - 평일은 장 시작/마감과 저녁에 몰림, 주말은 낮/저녁에 완만
+HOUR_WEIGHTS_WEEKDAY = np.array([
+    1.2, 0.7, 0.4, 0.3, 0.3, 0.5, 1.0, 2.2, 4.5, 9.0, 7.5, 6.0,
+    4.8, 5.2, 6.0, 7.8, 5.0, 3.6, 3.2, 3.4, 3.8, 3.9, 3.3, 2.2
+])
+HOUR_WEIGHTS_WEEKEND = np.array([
+    1.6, 1.0, 0.6, 0.4, 0.3, 0.3, 0.5, 0.9, 1.5, 2.2, 2.8, 3.0,
+    3.1, 3.1, 3.0, 2.9, 2.8, 2.8, 2.9, 3.2, 3.5, 3.6, 3.0, 2.2
+])
+
+# 요일별 상대 비중 (월~일)
+WEEKDAY_WEIGHTS = np.array([1.15, 1.0, 1.0, 0.95, 1.05, 0.45, 0.4])
+
+# 이슈가 있는 날의 비율과 게시글 배수
+EVENT_DAY_RATIO = 0.04
+EVENT_DAY_VOLUME = 3.5
+
+# 기본 레이블 비율 (neutral, positive, negative) - 날짜별 분위기(mood)만큼 긍정/부정이 이동
+LABEL_MIX = (0.55, 0.25, 0.20)
+
+# 마지막 날의 분석되지 않은 게시글 비율 (최근 7일에 걸쳐 0에서 늘어남)
+UNANALYZED_RECENT_RATIO = 0.3
+
+# 블라인드 글 비율 (글 번호/링크 없음)
+BLIND_RATIO = 0.03
+
+_LABELS = np.array(['neutral', 'positive', 'negative'])
+_OUTLOOKS = np.array(['neutral', 'bullish', 'bearish'])
+_RISKS = np.array(['low', 'medium', 'high'])
+
+# 레이블별 전망 (neutral, bullish, bearish) / 위험도 (low, medium, high) 확률
+_OUTLOOK_BY_LABEL = np.array([[0.80, 0.10, 0.10], [0.20, 0.75, 0.05], [0.20, 0.05, 0.75]])
+_RISK_BY_LABEL = np.array([[0.70, 0.25, 0.05], [0.60, 0.30, 0.10], [0.30, 0.40, 0.30]])
+
+_POSTS_INSERT_QUERY = text("""
+    INSERT INTO stock_posts
+    (id, stock_code, nid, date, title, author, views, likes, dislikes, link, content, is_analyzed)
+    VALUES
+    (:id, :stock_code, :nid, :date, :title, :author, :views, :likes, :dislikes, :link, :content, :is_analyzed)
+""")
+
+_ANALYSIS_INSERT_QUERY = text("""
+    INSERT INTO post_analysis
+    (post_id, sentiment_score, sentiment_label, confidence_score,
+     keywords, bullish_bearish, risk_level, analysis_model, analysis_version)
+    VALUES
+    (:post_id, :sentiment_score, :sentiment_label, :confidence_score,
+     :keywords, :bullish_bearish, :risk_level, :analysis_model, :analysis_version)
+""")
+
+
+def synthetic_codes(stocks):
+    """합성 종목코드 목록 (SYN001, SYN002, ...)"""
+    return [f"{SYNTHETIC_PREFIX}{i:03d}" for i in range(1, stocks + 1)]
+
+
+def _choice_rows(rng, probabilities):
+    """행마다 확률 분포가 다른 범주 추출 (probabilities: 행 수 x 범주 수)"""
+    cumulative = probabilities.cumsum(axis=1)
+    draws = rng.random(len(probabilities)) * cumulative[:, -1]
+    return (draws[:, None] > cumulative).sum(axis=1)
+
+
+def daily_plan(total, start, days, rng):
+    """날짜별 게시글 수와 분위기(mood, 긍정 쪽이 양수) - (날짜 목록, 게시글 수 배열, mood 배열)"""
+    dates = [start + timedelta(days=i) for i in range(days)]
+    weights = WEEKDAY_WEIGHTS[[day.weekday() for day in dates]]
+    weights = weights * rng.lognormal(0.0, 0.25, days)  # 날짜별 변동
+    events = rng.random(days) < EVENT_DAY_RATIO
+    weights[events] *= EVENT_DAY_VOLUME
+    weights *= np.linspace(0.8, 1.2, days)  # 관심 증가 추세
+
+    mood = rng.normal(0.0, 0.06, days)
+    mood[events] += rng.choice([-0.25, 0.25], events.sum())
+    counts = rng.multinomial(total, weights / weights.sum())
+    return dates, counts, np.clip(mood, -0.2, 0.2)
+
+
+def _analysis_columns(rng, n, mood):
+    """게시글 n건의 분석 결과 컬럼 (레이블, 점수, 신뢰도, 전망, 위험도, 키워드 수)"""
+    neutral, positive, negative = LABEL_MIX
+    probabilities = np.tile([neutral, max(0.02, positive + mood), max(0.02, negative - mood)], (n, 1))
+    labels = _choice_rows(rng, probabilities)
+
+    # 키워드 기반 점수: 중립은 대부분 0 (키워드 없음), 긍정/부정은 (긍정-부정)/(긍정+부정) 형태의 값
+    keyword_counts = np.where(labels == 0, rng.binomial(2, 0.3, n), 1 + rng.poisson(1.5, n))
+    magnitude = rng.choice([1.0, 0.6, 0.5, 0.3333], n, p=[0.5, 0.2, 0.15, 0.15])
+    scores = np.select(
+        [labels == 1, labels == 2],
+        [magnitude, -magnitude],
+        np.where(keyword_counts > 0, rng.choice([-0.2, 0.0, 0.2], n), 0.0)
+    )
+    outlooks = _choice_rows(rng, _OUTLOOK_BY_LABEL[labels])
+    risks = _choice_rows(rng, _RISK_BY_LABEL[labels])
+    confidence = np.minimum(1.0, keyword_counts / 10.0)
+    return labels, scores, confidence, outlooks, risks, keyword_counts
+
+
+def _keyword_pool(rng, lexicon, size=200):
+    """레이블별 키워드 JSON 문자열 후보 (행마다 json.dumps를 하지 않도록 미리 생성)"""
+    words = {
+        0: lexicon.categories.get('positive', []) + lexicon.categories.get('negative', []),
+        1: lexicon.categories.get('positive', []),
+        2: lexicon.categories.get('negative', [])
+    }
+    pool = {}
+    for label, candidates in words.items():
+        pool[label] = [
+            [json.dumps(list(rng.choice(candidates, k, replace=False)), ensure_ascii=False)
+             for _ in range(size)]
+            for k in range(0, min(lexicon.max_keywords, len(candidates)) + 1)
+        ]
+    return pool
+
+
+def generate_day(rng, day, count, mood, codes, stock_weights, next_nids, lexicon, keyword_pool):
+    """하루치 게시글/분석 결과 DataFrame 생성 (id는 저장할 때 지정)
+
+    next_nids: 종목별 다음 글 번호 (종목 순서의 배열, 갱신됨)
+    """
+    hour_weights = HOUR_WEIGHTS_WEEKEND if day.weekday() >= 5 else HOUR_WEIGHTS_WEEKDAY
+    hours = rng.choice(24, count, p=hour_weights / hour_weights.sum())
+    seconds = np.sort(hours * 3600 + rng.integers(0, 3600, count))
+    stocks = rng.choice(len(codes), count, p=stock_weights)
+
+    # 글 번호는 종목별로 작성 순서대로 증가, 블라인드 글은 번호 없음
+    order_in_stock = pd.Series(stocks).groupby(stocks).cumcount().to_numpy()
+    nids = next_nids[stocks] + order_in_stock
+    np.add.at(next_nids, stocks, 1)
+    blind = rng.random(count) < BLIND_RATIO
+    authors = rng.integers(0, len(AUTHORS), count)
+    # 블라인드 글은 (종목, 날짜|작성자)가 UNIQUE 키(blind_key)이므로 같은 초/작성자의 블라인드 글은 하나만 남김
+    blind_rows = np.flatnonzero(blind)
+    repeated = pd.DataFrame({'stock': stocks, 'second': seconds, 'author': authors}).iloc[blind_rows].duplicated()
+    blind[blind_rows[repeated.to_numpy()]] = False
+
+    code_array = np.array(codes)[stocks]
+    posts = pd.DataFrame({
+        'stock_code': code_array,
+        'nid': pd.Series(nids, dtype='Int64').mask(blind),
+        'date': pd.Timestamp(day) + pd.to_timedelta(seconds, unit='s'),
+        'title': np.array(TITLES)[rng.integers(0, len(TITLES), count)],
+        'author': np.array(AUTHORS)[authors],
+        'views': rng.lognormal(3.5, 1.0, count).astype(int).astype(str),
+        'likes': rng.poisson(0.8, count).astype(str),
+        'dislikes': rng.poisson(0.3, count).astype(str),
+        'content': np.array(SENTENCES)[rng.integers(0, len(SENTENCES), count)]
+    })
+    posts['link'] = np.where(
+        blind, '',
+        'https://finance.naver.com/item/board_read.naver?code=' + code_array + '&nid=' + nids.astype(str)
+    )
+
+    labels, scores, confidence, outlooks, risks, keyword_counts = _analysis_columns(rng, count, mood)
+    analysis = pd.DataFrame({
+        'sentiment_score': scores.round(4),
+        'sentiment_label': _LABELS[labels],
+        'confidence_score': confidence.round(4),
+        'keywords': [
+            keyword_pool[label][min(k, len(keyword_pool[label]) - 1)][i % len(keyword_pool[label][0])]
+            for i, (label, k) in enumerate(zip(labels, keyword_counts))
+        ],
+        'bullish_bearish': _OUTLOOKS[outlooks],
+        'risk_level': _RISKS[risks],
+        'analysis_model': lexicon.model,
+        'analysis_version': lexicon.analysis_version
+    })
+    return posts, analysis
+
+
+def _records(df):
+    """DataFrame을 executemany 바인딩 값 목록으로 변환 (결측값은 None, 값은 Python 타입)"""
+    columns = []
+    for _, column in df.items():
+        if pd.api.types.is_datetime64_any_dtype(column):
+            columns.append(list(column.dt.to_pydatetime()))
+        else:
+            columns.append(column.astype(object).where(column.notna(), None).tolist())
+    return [dict(zip(df.columns, row)) for row in zip(*columns)]
+
+
+def _write_chunk(conn, posts, analysis, first_id):
+    """id를 first_id부터 붙여 게시글과 분석 결과 저장 (분석되지 않은 게시글은 분석 행 없음)"""
+    posts = posts.copy()
+    posts['id'] = np.arange(first_id, first_id + len(posts))
+    conn.execute(_POSTS_INSERT_QUERY, _records(posts))
+    analyzed = analysis[posts['is_analyzed'].to_numpy()].copy()
+    analyzed['post_id'] = posts['id'][posts['is_analyzed']].to_numpy()
+    if not analyzed.empty:
+        conn.execute(_ANALYSIS_INSERT_QUERY, _records(analyzed))
+
+
+def generate_posts(total, stocks=10, days=365, start=None, seed=42, chunk_size=INSERT_CHUNK_SIZE):
+    """합성 게시글 total건과 분석 결과 저장 (start부터 days일, 기본값은 오늘 기준 days일 전부터) - 저장한 게시글 수 반환"""
+    engine = get_db_connection()
+    if engine is None:
+        raise RuntimeError("데이터베이스 연결 실패")
+
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start).to_pydatetime() if start else datetime.now().replace(
+        hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    codes = synthetic_codes(stocks)
+    stock_weights = 1.0 / np.arange(1, stocks + 1) ** 1.1
+    stock_weights /= stock_weights.sum()
+    next_nids = np.full(stocks, NID_BASE, dtype=np.int64)
+    lexicon = get_lexicon()
+    keyword_pool = _keyword_pool(rng, lexicon)
+    dates, counts, moods = daily_plan(total, start, days, rng)
+
+    started = time.perf_counter()
+    saved = 0
+    fast_load = engine.dialect.name == 'mysql'
+    with engine.connect() as conn:
+        if fast_load:
+            # 대량 저장 중에는 세션의 UNIQUE/외래키 검사 생략 (id/글 번호는 생성기가 겹치지 않게 부여)
+            conn.execute(text("SET SESSION unique_checks = 0, foreign_key_checks = 0"))
+        try:
+            first_id = (conn.execute(text("SELECT MAX(id) FROM stock_posts")).scalar() or 0) + 1
+
+            pending_posts, pending_analysis = [], []
+            pending = 0
+            for i, (day, count, mood) in enumerate(zip(dates, counts, moods)):
+                posts, analysis = generate_day(rng, day, int(count), mood, codes, stock_weights, next_nids,
+                                               lexicon, keyword_pool)
+                # 최근 7일의 게시글 일부는 아직 분석되지 않음
+                recent = max(0.0, 1 - (days - 1 - i) / 7)
+                posts['is_analyzed'] = rng.random(len(posts)) >= UNANALYZED_RECENT_RATIO * recent
+                pending_posts.append(posts)
+                pending_analysis.append(analysis)
+                pending += len(posts)
+                if pending >= chunk_size or i == days - 1:
+                    posts = pd.concat(pending_posts, ignore_index=True)
+                    analysis = pd.concat(pending_analysis, ignore_index=True)
+                    _write_chunk(conn, posts, analysis, first_id)
+                    conn.commit()
+                    first_id += len(posts)
+                    saved += len(posts)
+                    pending_posts, pending_analysis, pending = [], [], 0
+                    elapsed = time.perf_counter() - started
+                    logger.info(f"합성 게시글 {saved}/{total}건 저장 ({day:%Y-%m-%d}까지, {saved / elapsed:.0f}건/초)")
+        finally:
+            if fast_load:
+                # 풀에 돌려주는 연결이므로 검사를 다시 켬 (반환 시에는 롤백만 하므로 이후 작업이 검사 없이 실행되지 않도록)
+                try:
+                    conn.execute(text("SET SESSION unique_checks = 1, foreign_key_checks = 1"))
+                except Exception as e:
+                    logger.warning(f"세션 설정 복원 실패, 연결을 풀에서 제외: {e}")
+                    conn.invalidate()
+
+    logger.info(f"합성 게시글 {saved}건 저장 완료: {', '.join(codes)}, "
+                f"{start:%Y-%m-%d} ~ {dates[-1]:%Y-%m-%d}, {time.perf_counter() - started:.1f}초")
+    return saved
+
+
+def synthetic_count():
+    """저장된 합성 게시글 수"""
+    engine = get_db_connection()
+    if engine is None:
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM stock_posts WHERE stock_code LIKE :prefix"),
+                            {'prefix': f"{SYNTHETIC_PREFIX}%"}).scalar() or 0
+
+
+def clear_synthetic():
+    """합성 게시글과 분석 결과(ON DELETE CASCADE), 일별 요약/시간대별 집계/집계 워터마크 삭제 - 삭제한 게시글 수 반환"""
+    engine = get_db_connection()
+    if engine is None:
+        raise RuntimeError("데이터베이스 연결 실패")
+
+    params = {'prefix': f"{SYNTHETIC_PREFIX}%", 'chunk_size': DELETE_CHUNK_SIZE}
+    deleted = 0
+    with engine.connect() as conn:
+        # 긴 트랜잭션이 되지 않도록 나누어 삭제
+        while True:
+            count = conn.execute(text("DELETE FROM stock_posts WHERE stock_code LIKE :prefix LIMIT :chunk_size"),
+                                 params).rowcount
+            conn.commit()
+            deleted += count
+            if count < DELETE_CHUNK_SIZE:
+                break
+        conn.execute(text("DELETE FROM hourly_sentiment_cube WHERE stock_code LIKE :prefix"), params)
+        conn.execute(text("DELETE FROM daily_stock_summary WHERE stock_code LIKE :prefix"), params)
+        conn.execute(text("DELETE FROM rollup_state WHERE name LIKE :name"), {'name': f"%:{SYNTHETIC_PREFIX}%"})
+        conn.commit()
+    logger.info(f"합성 게시글 {deleted}건 삭제")
+    return deleted
+
+
+if __name__ == "__main__":
+    from config import setup_logging
+
+    setup_logging()
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+    command = args[0] if args else None
+
+    if command == 'generate' and len(args) > 1:
+        generate_posts(
+            int(float(args[1])),
+            stocks=int(options.get('stocks', 10)),
+            days=int(options.get('days', 365)),
+            start=options.get('start'),
+            seed=int(options.get('seed', 42))
+        )
+    elif command == 'count':
+        print(f"합성 게시글 {synthetic_count()}건")
+    elif command == 'clear':
+        clear_synthetic()
+    else:
+        print("사용법: python benchmarks/synthetic_posts.py generate <게시글 수> [--stocks=10] [--days=365] "
+              "[--start=YYYY-MM-DD] [--seed=42] | count | clear")
+        sys.exit(1)
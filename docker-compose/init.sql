@@ -2,6 +2,8 @@
 CREATE TABLE IF NOT EXISTS stock_posts (
     id INT AUTO_INCREMENT PRIMARY KEY,
     stock_code VARCHAR(20) NOT NULL,
+    nid BIGINT,  -- 네이버 글 번호 (링크의 nid, 블라인드 글은 NULL)
+    blind_key VARCHAR(130) AS (IF(nid IS NULL, CONCAT(date, '|', author), NULL)) PERSISTENT,  -- 블라인드 글 중복 판단 키 (같은 분/같은 마스킹 작성자의 블라인드 글은 한 글로 봄)
     date DATETIME,
     title TEXT,
     author VARCHAR(100),
@@ -10,14 +12,16 @@ CREATE TABLE IF NOT EXISTS stock_posts (
     dislikes VARCHAR(20),
     link TEXT,
     content TEXT,  -- 게시글 본문 내용
+    content_strategy VARCHAR(20),  -- 본문 추출 방법 (summary_table/selector/table_score/styled_td/longest_td)
     is_analyzed BOOLEAN DEFAULT FALSE,  -- 분석 완료 여부
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_stock_code (stock_code),
+    INDEX idx_stock_code_date (stock_code, date),
     INDEX idx_date (date),
     INDEX idx_author (author),
     INDEX idx_is_analyzed (is_analyzed),
-    UNIQUE KEY unique_post (stock_code, date, author, title(100))
+    UNIQUE KEY unique_stock_nid (stock_code, nid),
+    UNIQUE KEY unique_stock_blind (stock_code, blind_key)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- 게시글 분석 결과 테이블
@@ -37,10 +41,12 @@ CREATE TABLE IF NOT EXISTS post_analysis (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (post_id) REFERENCES stock_posts(id) ON DELETE CASCADE,
-    INDEX idx_post_id (post_id),
+    UNIQUE KEY unique_post_id (post_id),
+    INDEX idx_post_sentiment (post_id, sentiment_score, sentiment_label, bullish_bearish),
     INDEX idx_sentiment_label (sentiment_label),
     INDEX idx_bullish_bearish (bullish_bearish),
-    INDEX idx_analysis_model (analysis_model)
+    INDEX idx_analysis_model (analysis_model),
+    INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- 일별 종목 분석 요약 테이블
@@ -49,10 +55,16 @@ CREATE TABLE IF NOT EXISTS daily_stock_summary (
     stock_code VARCHAR(20) NOT NULL,
     date DATETIME NOT NULL,
     total_posts INT DEFAULT 0,
+    scored_posts INT DEFAULT 0,   -- 감정 점수가 있는 게시글 수
     positive_posts INT DEFAULT 0,
     negative_posts INT DEFAULT 0,
     neutral_posts INT DEFAULT 0,
     avg_sentiment_score DECIMAL(5,4),
+    sentiment_sum DOUBLE DEFAULT 0,    -- 감정 점수 합 (기간 평균 계산용)
+    sentiment_sumsq DOUBLE DEFAULT 0,  -- 감정 점수 제곱합 (표준편차 계산용)
+    avg_confidence_score DECIMAL(5,4),
+    bullish_posts INT DEFAULT 0,
+    bearish_posts INT DEFAULT 0,
     bullish_ratio DECIMAL(5,4),   -- 상승 전망 비율
     bearish_ratio DECIMAL(5,4),   -- 하락 전망 비율
     high_risk_posts INT DEFAULT 0,
@@ -63,3 +75,46 @@ CREATE TABLE IF NOT EXISTS daily_stock_summary (
     INDEX idx_stock_code_date (stock_code, date),
     INDEX idx_avg_sentiment (avg_sentiment_score)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 종목/날짜/시간대별 감정 집계 (리포트용, 게시글 행 대신 이 셀을 읽음)
+CREATE TABLE IF NOT EXISTS hourly_sentiment_cube (
+    stock_code VARCHAR(20) NOT NULL,
+    date DATE NOT NULL,
+    hour TINYINT NOT NULL,
+    total_posts INT DEFAULT 0,
+    scored_posts INT DEFAULT 0,           -- 감정 점수가 있는 게시글 수
+    sentiment_sum DOUBLE DEFAULT 0,       -- 감정 점수 합
+    sentiment_sumsq DOUBLE DEFAULT 0,     -- 감정 점수 제곱합
+    bullish_posts INT DEFAULT 0,
+    bearish_posts INT DEFAULT 0,
+    neutral_outlook_posts INT DEFAULT 0,  -- 전망 중립 게시글 수
+    positive_posts INT DEFAULT 0,
+    negative_posts INT DEFAULT 0,
+    neutral_posts INT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (stock_code, date, hour),
+    INDEX idx_date (date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 집계 작업 진행 상태 (마지막으로 반영한 post_analysis.updated_at)
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    watermark DATETIME NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 종목별 크롤링 상태 (orchestrator.py가 폴링 주기 계산에 사용)
+CREATE TABLE IF NOT EXISTS crawl_state (
+    stock_code VARCHAR(20) PRIMARY KEY,
+    last_nid BIGINT,  -- 크롤링 기준점: 이 nid 이하의 글은 모두 저장됨
+    last_post_at DATETIME,  -- 기준점 게시글 작성 시각
+    gap_low_nid BIGINT,  -- 기준점까지 도달하지 못한 수집에서 이미 저장한 nid 구간 (다음 수집에서 건너뜀)
+    gap_high_nid BIGINT,
+    last_crawled_at DATETIME,
+    next_crawl_at DATETIME,
+    velocity DOUBLE DEFAULT 0,  -- 시간당 새 게시글 수 (지수이동평균)
+    last_new_posts INT DEFAULT 0,
+    last_latency_ms INT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_next_crawl_at (next_crawl_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
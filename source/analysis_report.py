@@ -1,27 +1,31 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import json
 from datetime import datetime, timedelta
-import pymysql
-from config import DB_CONFIG
-from urllib.parse import quote_plus
+from database import get_db_connection
+from summary_rollup import refresh_daily_summary
 
-def get_db_connection():
-    """데이터베이스 연결 객체 반환"""
-    try:
-        # 비밀번호에 특수 문자가 있을 경우 URL 인코딩
-        encoded_password = quote_plus(DB_CONFIG['password'])
-        encoded_user = quote_plus(DB_CONFIG['user'])
-        
-        connection_string = f"mysql+pymysql://{encoded_user}:{encoded_password}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?charset={DB_CONFIG['charset']}"
-        engine = create_engine(connection_string, echo=False)
-        return engine
-    except Exception as e:
-        print(f"데이터베이스 연결 실패: {e}")
-        return None
+_KEYWORD_QUERY = text("""
+    SELECT pa.keywords
+    FROM stock_posts sp
+    JOIN post_analysis pa ON sp.id = pa.post_id
+    WHERE sp.stock_code = :stock_code
+    AND sp.date >= :start
+    AND sp.date < :end
+    AND pa.keywords IS NOT NULL
+    AND pa.keywords != '[]'
+""")
+
+def _recent_range(days):
+    """days일 전 0시부터 오늘 끝까지의 반개구간 [start, end) - 인덱스 컬럼을 함수로 감싸지 않고 비교"""
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return end - timedelta(days=days + 1), end
 
 def get_analysis_summary(stock_code, days=7):
-    """지정된 기간의 분석 결과 요약"""
+    """지정된 기간의 분석 결과 요약 (daily_stock_summary 집계 테이블에서 조회)
+
+    최신 분석 결과를 반영하려면 먼저 summary_rollup.refresh_daily_summary()를 실행합니다.
+    """
     engine = get_db_connection()
     if engine is None:
         return None
@@ -29,31 +33,29 @@ def get_analysis_summary(stock_code, days=7):
     try:
         query = text("""
             SELECT 
-                DATE(sp.date) as analysis_date,
-                COUNT(*) as total_posts,
-                SUM(CASE WHEN pa.sentiment_label = 'positive' THEN 1 ELSE 0 END) as positive_count,
-                SUM(CASE WHEN pa.sentiment_label = 'negative' THEN 1 ELSE 0 END) as negative_count,
-                SUM(CASE WHEN pa.sentiment_label = 'neutral' THEN 1 ELSE 0 END) as neutral_count,
-                SUM(CASE WHEN pa.bullish_bearish = 'bullish' THEN 1 ELSE 0 END) as bullish_count,
-                SUM(CASE WHEN pa.bullish_bearish = 'bearish' THEN 1 ELSE 0 END) as bearish_count,
-                AVG(pa.sentiment_score) as avg_sentiment_score,
-                AVG(pa.confidence_score) as avg_confidence_score
-            FROM stock_posts sp
-            JOIN post_analysis pa ON sp.id = pa.post_id
-            WHERE sp.stock_code = :stock_code
-            AND sp.date >= DATE_SUB(CURDATE(), INTERVAL :days DAY)
-            GROUP BY DATE(sp.date)
-            ORDER BY analysis_date DESC
+                DATE(date) as analysis_date,
+                total_posts,
+                positive_posts as positive_count,
+                negative_posts as negative_count,
+                neutral_posts as neutral_count,
+                bullish_posts as bullish_count,
+                bearish_posts as bearish_count,
+                avg_sentiment_score,
+                avg_confidence_score
+            FROM daily_stock_summary
+            WHERE stock_code = :stock_code
+            AND date >= :start
+            AND date < :end
+            ORDER BY date DESC
         """)
         
-        df = pd.read_sql(query, engine, params={'stock_code': stock_code, 'days': days})
+        start, end = _recent_range(days)
+        df = pd.read_sql(query, engine, params={'stock_code': stock_code, 'start': start.date(), 'end': end.date()})
         return df
         
     except Exception as e:
         print(f"분석 요약 조회 실패: {e}")
         return None
-    finally:
-        engine.dispose()
 
 def get_keyword_analysis(stock_code, days=7, top_n=20):
     """키워드 분석 결과"""
@@ -62,17 +64,8 @@ def get_keyword_analysis(stock_code, days=7, top_n=20):
         return None
     
     try:
-        query = text("""
-            SELECT pa.keywords
-            FROM stock_posts sp
-            JOIN post_analysis pa ON sp.id = pa.post_id
-            WHERE sp.stock_code = :stock_code
-            AND sp.date >= DATE_SUB(CURDATE(), INTERVAL :days DAY)
-            AND pa.keywords IS NOT NULL
-            AND pa.keywords != '[]'
-        """)
-        
-        df = pd.read_sql(query, engine, params={'stock_code': stock_code, 'days': days})
+        start, end = _recent_range(days)
+        df = pd.read_sql(_KEYWORD_QUERY, engine, params={'stock_code': stock_code, 'start': start, 'end': end})
         
         # 키워드 빈도 계산
         all_keywords = []
@@ -89,8 +82,6 @@ def get_keyword_analysis(stock_code, days=7, top_n=20):
     except Exception as e:
         print(f"키워드 분석 실패: {e}")
         return None
-    finally:
-        engine.dispose()
 
 def print_analysis_report(stock_code, days=7):
     """분석 리포트 출력"""
@@ -135,4 +126,5 @@ def print_analysis_report(stock_code, days=7):
 if __name__ == "__main__":
     # 사용 예시
     stock_code = "139480"
+    refresh_daily_summary(stock_code)
     print_analysis_report(stock_code, days=7)
@@ -18,11 +18,62 @@ DB_CONFIG = {
     'charset': os.getenv('DB_CHARSET', 'utf8mb4')
 }
 
+# 커넥션 풀 설정 (프로세스당 하나의 엔진이 공유)
+DB_POOL_CONFIG = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 3600)),  # 초, MySQL wait_timeout보다 짧게
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+}
+
 # 크롤링 설정
 CRAWLING_CONFIG = {
     'delay': float(os.getenv('CRAWLING_DELAY', 1.0)),
     'max_pages': int(os.getenv('MAX_PAGES', 10)),
-    'user_agent': os.getenv('USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    'max_extend_pages': int(os.getenv('MAX_EXTEND_PAGES', 100)),  # 기준점에 도달하지 못했을 때 늘려서 수집할 최대 페이지 수
+    'concurrency': int(os.getenv('CRAWLING_CONCURRENCY', 4)),  # 동시에 요청할 페이지 수
+    'dedup_cache_dir': os.getenv('DEDUP_CACHE_DIR', ''),  # 중복 검사 인덱스 캐시 디렉토리 (비어 있으면 캐시 안 함)
+    'list_parser': os.getenv('LIST_PARSER', 'auto'),  # 목록 페이지 파서 (auto: lxml이 있으면 lxml, lxml, bs4)
+    'rate_limit': float(os.getenv('CRAWLING_RATE_LIMIT', 5.0)),  # 호스트당 초당 최대 요청 수
+    'user_agent': os.getenv('USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                                          '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'),
+    # 여러 종목 수집 (orchestrator.py)
+    'watchlist_path': os.getenv('WATCHLIST_PATH',
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watchlist.json')),
+    'stock_concurrency': int(os.getenv('CRAWLING_STOCK_CONCURRENCY', 4)),  # 동시에 처리할 종목 수
+    'min_poll_interval': float(os.getenv('MIN_POLL_INTERVAL', 60)),  # 종목별 최소 폴링 간격(초)
+    'max_poll_interval': float(os.getenv('MAX_POLL_INTERVAL', 3600)),  # 종목별 최대 폴링 간격(초)
+    'target_posts_per_poll': int(os.getenv('TARGET_POSTS_PER_POLL', 20))  # 한 번 폴링할 때 쌓여 있기를 기대하는 새 글 수 (목록 1페이지)
+}
+
+# HTTP 클라이언트 설정 (http_client.py)
+HTTP_CONFIG = {
+    'connect_timeout': float(os.getenv('HTTP_CONNECT_TIMEOUT', 5.0)),  # 연결 타임아웃(초)
+    'read_timeout': float(os.getenv('HTTP_READ_TIMEOUT', 15.0)),  # 응답 읽기 타임아웃(초)
+    'retries': int(os.getenv('HTTP_RETRIES', 3)),  # 연결 실패, 429/5xx 응답 재시도 횟수
+    'backoff_factor': float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5)),  # 재시도 대기 = backoff_factor * 2^(재시도 횟수-1)초
+    'backoff_jitter': float(os.getenv('HTTP_BACKOFF_JITTER', 0.5)),  # 재시도 대기에 더하는 무작위 시간 상한(초)
+    'pool_connections': int(os.getenv('HTTP_POOL_CONNECTIONS', 4)),  # 커넥션 풀을 유지할 호스트 수
+    # 호스트당 유지할 연결 수 (동시에 수집하는 종목 수 x 종목당 동시 요청 수)
+    'pool_maxsize': int(os.getenv('HTTP_POOL_MAXSIZE',
+                                  CRAWLING_CONFIG['concurrency'] * CRAWLING_CONFIG['stock_concurrency'])),
+    'conditional_cache_size': int(os.getenv('HTTP_CONDITIONAL_CACHE_SIZE', 64))  # ETag/Last-Modified를 기억할 URL 수
+}
+
+# HTML 응답 캐시 설정 (html_cache.py)
+HTML_CACHE_CONFIG = {
+    'dir': os.getenv('HTML_CACHE_DIR', ''),  # 캐시 디렉토리 (비어 있으면 캐시 안 함)
+    'max_mb': int(os.getenv('HTML_CACHE_MAX_MB', 1024)),  # 최대 크기(MB), 넘으면 오래 사용하지 않은 파일부터 삭제
+    'list_ttl': float(os.getenv('HTML_CACHE_LIST_TTL', 30)),  # 목록 페이지 캐시 유효 시간(초)
+    'zstd_level': int(os.getenv('HTML_CACHE_ZSTD_LEVEL', 3))  # zstd 압축 레벨
+}
+
+# 감정 분석 설정
+ANALYSIS_CONFIG = {
+    'lexicon_path': os.getenv('SENTIMENT_LEXICON_PATH',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentiment_lexicon.json')),
+    'lexicon_reload_interval': float(os.getenv('SENTIMENT_LEXICON_RELOAD_INTERVAL', 5.0))  # 사전 파일 변경 확인 주기(초)
 }
 
 # 로깅 설정
@@ -0,0 +1,476 @@
+"""
+게시글 본문 추출기 - 게시글 페이지 HTML을 한 번만 훑어 본문 블록을 고름
+
+기존 get_post_content()는 다섯 가지 방법(본문 테이블 summary, CSS 선택자, 테이블 셀 점수, 스타일이 있는 td,
+가장 긴 td)을 차례로 시도하면서 방법마다 DOM을 다시 탐색하고, 중첩된 셀마다 get_text()를 반복 호출했습니다
+(중첩 테이블에서 문서 크기의 제곱에 비례).
+여기서는 문서를 한 번 훑어 텍스트 조각 목록과 td/본문 후보 요소의 조각 범위만 기록하고,
+조각마다 필터 단어/정규식 검사와 한글 수 계산을 한 번씩만 한 뒤 누적합으로 셀별 조건과 점수를 구합니다.
+방법의 우선순위와 필터 조건은 기존과 같으며, 어느 방법으로 추출했는지(strategy)를 함께 반환합니다.
+"""
+
+import logging
+import re
+import threading
+import time
+from itertools import accumulate, chain
+from bs4 import BeautifulSoup, NavigableString, Comment, Doctype, Declaration, ProcessingInstruction
+
+logger = logging.getLogger(__name__)
+
+# lxml 선택적 import (없으면 BeautifulSoup html.parser 트리를 훑음)
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# 우선순위 순서의 추출 방법 이름 (stock_posts.content_strategy에 저장)
+STRATEGIES = ('summary_table', 'selector', 'table_score', 'styled_td', 'longest_td')
+
+# 본문 테이블의 summary 속성
+CONTENT_TABLE_SUMMARY = '게시판 글 본문보기'
+
+# 방법 2에서 차례로 시도하는 선택자 (모두 class="view_text" 요소)
+_SELECTORS = ('.view_text', 'td.view_text', '.board_view .view_text', 'div.view_text', '.article_view .view_text')
+
+# 텍스트를 읽지 않는 태그 (BeautifulSoup get_text()도 제외)
+_SKIP_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+
+def _word_pattern(words):
+    """단어 목록 중 하나라도 포함되는지 검사하는 정규식"""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# 방법 1: 본문 셀이 아닌 것으로 보는 단어 (셀 전체) / 제외할 줄의 단어
+_HEADER_CELL_WORDS = _word_pattern(['게시판 글 본문보기', '조회', '공감', '비공감', '작성자', '더보기', 'IP', '작성일', '신고', '스크랩'])
+_HEADER_LINE_WORDS = _word_pattern([
+    '게시판 글 본문보기', '조회', '공감', '비공감', '작성자', '더보기', 'IP', '작성일', '신고', '스크랩',
+    '목록', '이전', '다음', '추천', '종목토론실', '네이버', '로그인', '검색', '댓글', 'Copyright', '©', 'Corp'
+])
+# 방법 3: 탐색 영역 셀 / 제외할 줄
+_NAV_CELL_WORDS = _word_pattern(['이전글', '다음글', '목록', '추천', '신고', '스크랩', '종목토론실', '네이버 금융', '로그인', '검색', '댓글'])
+_TABLE_LINE_WORDS = _word_pattern([
+    '목록', '이전', '다음', '추천', '신고', '스크랩', '종목토론실', '네이버', '로그인', '검색', '댓글',
+    'Copyright', '©', 'Corp', 'All Rights Reserved'
+])
+# 방법 4: 제외할 줄
+_STYLED_LINE_WORDS = _word_pattern(['목록', '이전글', '다음글', '추천', '신고', '스크랩', '종목토론실', '네이버 금융', '로그인', '검색'])
+# 방법 5: 셀 앞부분(50자)에 있으면 제외 / 제외할 줄
+_LONGEST_HEAD_WORDS = _word_pattern(['목록', '이전글', '다음글', '네이버 금융', '종목토론실'])
+_LONGEST_LINE_WORDS = _word_pattern(['목록', '이전', '다음', '추천', '신고', '스크랩', '종목토론실', '네이버', '로그인', '검색', '댓글'])
+
+_HANGUL = re.compile('[가-힣]')
+_DATE_LINE = re.compile(r'^\d{4}\.\d{2}\.\d{2}')
+_IP_LINE = re.compile(r'^\d+\.\d+\.\*\*\*\.\d+')
+
+
+def _is_number(text):
+    """쉼표/마침표를 빼면 숫자만 남는 문자열 (조회수 등)"""
+    return text.replace(',', '').replace('.', '').isdigit()
+
+
+def _header_line(line):
+    return (len(line) > 1 and not _is_number(line) and not _HEADER_LINE_WORDS.search(line)
+            and not _DATE_LINE.match(line) and not _IP_LINE.match(line))
+
+
+def _table_line(line):
+    return len(line) > 1 and not _is_number(line) and not _TABLE_LINE_WORDS.search(line)
+
+
+def _styled_line(line):
+    return len(line) > 1 and not _STYLED_LINE_WORDS.search(line)
+
+
+def _longest_line(line):
+    return len(line) > 1 and not _is_number(line) and not _LONGEST_LINE_WORDS.search(line)
+
+
+# 줄 필터별 (조각마다 남은 줄 목록, 누적 줄 수/길이/한글 수/공백 제외 글자 수)
+_LINE_FILTERS = {
+    'summary_table': _header_line,
+    'table_score': _table_line,
+    'styled_td': _styled_line,
+    'longest_td': _longest_line,
+}
+
+
+def _nonspace(text):
+    """공백과 줄바꿈을 뺀 글자 수 (기존 점수 계산의 total_chars)"""
+    return len(text) - text.count(' ') - text.count('\n')
+
+
+class _Prefix:
+    """조각별 값의 누적합 - 요소의 조각 범위 [start, end) 합계를 O(1)로 계산"""
+
+    def __init__(self, values):
+        self.sums = [0, *accumulate(values)]
+
+    def total(self, start, end):
+        return self.sums[end] - self.sums[start]
+
+
+class _FilteredLines:
+    """한 줄 필터를 모든 조각에 적용한 결과"""
+
+    def __init__(self, fragments, keep):
+        self.lines = []
+        for fragment in fragments:
+            lines = (line.strip() for line in fragment.split('\n'))
+            self.lines.append([line for line in lines if line and keep(line)])
+        self.count = _Prefix(len(lines) for lines in self.lines)
+        self.length = _Prefix(sum(len(line) for line in lines) for lines in self.lines)
+        self.hangul = _Prefix(sum(len(_HANGUL.findall(line)) for line in lines) for lines in self.lines)
+        self.nonspace = _Prefix(sum(_nonspace(line) for line in lines) for lines in self.lines)
+
+    def joined_length(self, start, end):
+        """'\\n'.join(남은 줄)의 길이"""
+        count = self.count.total(start, end)
+        return self.length.total(start, end) + count - 1 if count else 0
+
+    def score(self, start, end):
+        """한글 비율 * 길이 (방법 3의 점수)"""
+        nonspace = self.nonspace.total(start, end)
+        ratio = self.hangul.total(start, end) / nonspace if nonspace > 0 else 0
+        return ratio * self.joined_length(start, end)
+
+    def text(self, start, end):
+        return '\n'.join(chain.from_iterable(self.lines[start:end]))
+
+
+class _Element:
+    """본문 후보 요소 (td 또는 class="view_text")와 텍스트 조각 범위"""
+
+    __slots__ = ('tag', 'classes', 'style', 'start', 'end', 'in_table_row', 'in_content_table',
+                 'in_board_view', 'in_article_view')
+
+    def __init__(self, tag, classes, style, start, state):
+        self.tag = tag
+        self.classes = classes
+        self.style = style
+        self.start = start
+        self.end = start
+        self.in_table_row = state['table_rows'] > 0
+        self.in_content_table = state['content_table'] is not None
+        self.in_board_view = state['board_view'] > 0
+        self.in_article_view = state['article_view'] > 0
+
+
+def _lxml_events(root):
+    """lxml 트리를 문서 순서로 훑어 ('start', 태그, 속성) / ('text', 문자열) / ('end', 태그) 이벤트 생성"""
+    yield 'start', root.tag, root.attrib
+    if root.text:
+        yield 'text', root.text, None
+    stack = [(root, iter(root))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield 'end', element.tag, None
+            if stack and element.tail:
+                yield 'text', element.tail, None
+        elif isinstance(child.tag, str):
+            yield 'start', child.tag, child.attrib
+            if child.text:
+                yield 'text', child.text, None
+            stack.append((child, iter(child)))
+        elif child.tail:
+            # 주석/처리 명령은 건너뛰고 뒤의 텍스트만
+            yield 'text', child.tail, None
+
+
+def _bs4_events(soup):
+    """BeautifulSoup 트리를 _lxml_events()와 같은 이벤트로 변환"""
+    stack = [(soup, iter(soup.contents))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if stack:
+                yield 'end', element.name, None
+        elif isinstance(child, NavigableString):
+            if not isinstance(child, (Comment, Doctype, Declaration, ProcessingInstruction)):
+                yield 'text', str(child), None
+        else:
+            yield 'start', child.name, child.attrs
+            stack.append((child, iter(child.contents)))
+
+
+def _parse_events(html):
+    if HAS_LXML:
+        try:
+            return _lxml_events(lxml.html.fromstring(html))
+        except (etree.ParserError, ValueError):
+            return iter(())
+    return _bs4_events(BeautifulSoup(html, 'html.parser'))
+
+
+def _class_list(attrs):
+    value = attrs.get('class') or ''
+    return value.split() if isinstance(value, str) else list(value)
+
+
+class _Document:
+    """문서를 한 번 훑은 결과 - 텍스트 조각 목록과 본문 후보 요소 (문서 순서)"""
+
+    def __init__(self, events):
+        self.fragments = []
+        self.cells = []
+        self.view_texts = []
+        state = {'table_rows': 0, 'tables': 0, 'content_table': None, 'content_table_seen': False,
+                 'board_view': 0, 'article_view': 0, 'skip': 0}
+        open_elements = []  # (태그, 후보 요소, 상태 변화 목록)
+
+        for kind, value, attrs in events:
+            if kind == 'text':
+                if not state['skip']:
+                    fragment = value.strip()
+                    if fragment:
+                        self.fragments.append(fragment)
+                continue
+
+            if kind == 'end':
+                tag, candidate, changes = open_elements.pop()
+                if candidate is not None:
+                    candidate.end = len(self.fragments)
+                for key in changes:
+                    if key == 'content_table':
+                        state['content_table'] = None
+                    else:
+                        state[key] -= 1
+                continue
+
+            tag = value
+            classes = _class_list(attrs)
+            changes = []
+            candidate = None
+            if tag in ('td', 'th', 'tr', 'table') or 'view_text' in classes:
+                # 새 요소를 열기 전 상태 기준 (조상 여부)
+                if tag == 'td' or 'view_text' in classes:
+                    candidate = _Element(tag, classes, attrs.get('style') or '', len(self.fragments), state)
+                    if tag == 'td':
+                        self.cells.append(candidate)
+                    if 'view_text' in classes:
+                        self.view_texts.append(candidate)
+                if tag == 'table':
+                    changes.append('tables')
+                    if not state['content_table_seen'] and attrs.get('summary') == CONTENT_TABLE_SUMMARY:
+                        state['content_table'] = True
+                        state['content_table_seen'] = True
+                        changes.append('content_table')
+                elif tag == 'tr' and state['tables']:
+                    changes.append('table_rows')
+            if 'board_view' in classes:
+                changes.append('board_view')
+            if 'article_view' in classes:
+                changes.append('article_view')
+            if tag in _SKIP_TEXT_TAGS:
+                changes.append('skip')
+            for key in changes:
+                if key != 'content_table':
+                    state[key] += 1
+            open_elements.append((tag, candidate, changes))
+
+        # 닫히지 않은 요소는 문서 끝까지
+        for _, candidate, _ in open_elements:
+            if candidate is not None:
+                candidate.end = len(self.fragments)
+
+        fragments = self.fragments
+        self.length = _Prefix(len(fragment) for fragment in fragments)
+        self.hangul = _Prefix(len(_HANGUL.findall(fragment)) for fragment in fragments)
+        self.nonspace = _Prefix(_nonspace(fragment) for fragment in fragments)
+        self.header_words = _Prefix(bool(_HEADER_CELL_WORDS.search(fragment)) for fragment in fragments)
+        self.nav_words = _Prefix(bool(_NAV_CELL_WORDS.search(fragment)) for fragment in fragments)
+        self._filtered = {}
+
+    def filtered(self, strategy):
+        """줄 필터 결과 (처음 필요할 때 한 번만 계산)"""
+        if strategy not in self._filtered:
+            self._filtered[strategy] = _FilteredLines(self.fragments, _LINE_FILTERS[strategy])
+        return self._filtered[strategy]
+
+    def text_length(self, element):
+        """get_text(strip=True, separator='\\n')의 길이"""
+        count = element.end - element.start
+        return self.length.total(element.start, element.end) + count - 1 if count else 0
+
+    def text(self, element):
+        """get_text(strip=True, separator='\\n')"""
+        return '\n'.join(self.fragments[element.start:element.end])
+
+    def has_hangul(self, element):
+        return self.hangul.total(element.start, element.end) > 0
+
+
+def _summary_table(doc):
+    """방법 1: summary="게시판 글 본문보기" 테이블에서 헤더 단어가 없는 첫 한글 셀"""
+    lines = doc.filtered('summary_table')
+    for cell in doc.cells:
+        if not cell.in_content_table:
+            continue
+        if (doc.text_length(cell) > 5 and doc.has_hangul(cell)
+                and not doc.header_words.total(cell.start, cell.end)
+                and lines.joined_length(cell.start, cell.end) > 5):
+            return lines.text(cell.start, cell.end)
+    return None
+
+
+def _selector(doc):
+    """방법 2: class="view_text" 요소 (선택자 순서대로 첫 요소)
+
+    10자를 넘는 본문이 없으면 마지막으로 찾은 요소의 짧은 본문을 그대로 사용합니다 (짧은 글, 기존 동작과 같음).
+    """
+    last = None
+    for selector in _SELECTORS:
+        for element in doc.view_texts:
+            if ((selector == 'td.view_text' and element.tag != 'td') or
+                    (selector == 'div.view_text' and element.tag != 'div') or
+                    (selector == '.board_view .view_text' and not element.in_board_view) or
+                    (selector == '.article_view .view_text' and not element.in_article_view)):
+                continue
+            last = doc.text(element)
+            if len(last) > 10:
+                return last
+            break
+    return last
+
+
+def _table_score(doc):
+    """방법 3: 테이블 행 안의 셀 중 (한글 비율 * 길이) 점수가 가장 높은 셀"""
+    lines = doc.filtered('table_score')
+    best, best_score = None, None
+    for cell in doc.cells:
+        if not cell.in_table_row:
+            continue
+        if (doc.text_length(cell) > 5 and doc.has_hangul(cell)
+                and not doc.nav_words.total(cell.start, cell.end)
+                and lines.count.total(cell.start, cell.end)):
+            score = lines.score(cell.start, cell.end)
+            if best_score is None or score > best_score:
+                best, best_score = cell, score
+    if best is not None and lines.joined_length(best.start, best.end) > 5:
+        return lines.text(best.start, best.end)
+    return None
+
+
+def _styled_td(doc):
+    """방법 4: 패딩/높이 스타일이 있는 첫 한글 td"""
+    lines = doc.filtered('styled_td')
+    for cell in doc.cells:
+        if 'padding' not in cell.style and 'height' not in cell.style:
+            continue
+        if (doc.text_length(cell) > 5 and doc.has_hangul(cell)
+                and lines.joined_length(cell.start, cell.end) > 5):
+            return lines.text(cell.start, cell.end)
+    return None
+
+
+def _longest_td(doc):
+    """방법 5: 모든 td 중 (한글 비율 * 길이) 점수가 가장 높은 셀 (최후의 방법)"""
+    best, best_score = None, 0
+    for cell in doc.cells:
+        if doc.text_length(cell) <= 5 or not doc.has_hangul(cell):
+            continue
+        head = ''
+        for fragment in doc.fragments[cell.start:cell.end]:
+            head = f"{head}\n{fragment}" if head else fragment
+            if len(head) >= 50:
+                break
+        if _LONGEST_HEAD_WORDS.search(head[:50]):
+            continue
+        # 숫자만 있는 셀 제외 (조각이 둘 이상이면 줄바꿈이 있으므로 숫자만일 수 없음)
+        if cell.end - cell.start == 1 and _is_number(doc.fragments[cell.start]):
+            continue
+        nonspace = doc.nonspace.total(cell.start, cell.end)
+        ratio = doc.hangul.total(cell.start, cell.end) / nonspace if nonspace > 0 else 0
+        score = ratio * doc.text_length(cell)
+        if score > best_score:
+            best, best_score = cell, score
+    if best is None:
+        return None
+    return doc.filtered('longest_td').text(best.start, best.end) or None
+
+
+_STRATEGY_FUNCTIONS = (
+    ('summary_table', _summary_table),
+    ('selector', _selector),
+    ('table_score', _table_score),
+    ('styled_td', _styled_td),
+    ('longest_td', _longest_td),
+)
+
+
+class ExtractionStats:
+    """추출 방법별 적중 수와 소요 시간 (스레드 안전, 작업 스레드들이 공유)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pages = 0
+            self.parse_ms = 0.0
+            self.hits = {strategy: 0 for strategy in STRATEGIES}
+            self.misses = 0
+            self.evaluated = {strategy: 0 for strategy in STRATEGIES}
+            self.strategy_ms = {strategy: 0.0 for strategy in STRATEGIES}
+
+    def record(self, parse_ms, timings, strategy):
+        with self._lock:
+            self.pages += 1
+            self.parse_ms += parse_ms
+            for name, ms in timings:
+                self.evaluated[name] += 1
+                self.strategy_ms[name] += ms
+            if strategy is None:
+                self.misses += 1
+            else:
+                self.hits[strategy] += 1
+
+    def summary(self):
+        """방법별 적중률/평균 소요 시간 문자열"""
+        with self._lock:
+            if not self.pages:
+                return "추출한 페이지 없음"
+            parts = [f"{self.pages}페이지, 파싱 평균 {self.parse_ms / self.pages:.1f}ms"]
+            for strategy in STRATEGIES:
+                if self.evaluated[strategy]:
+                    parts.append(
+                        f"{strategy} {self.hits[strategy]}건({self.hits[strategy] / self.pages:.0%}, "
+                        f"평균 {self.strategy_ms[strategy] / self.evaluated[strategy]:.2f}ms)"
+                    )
+            parts.append(f"실패 {self.misses}건")
+            return ", ".join(parts)
+
+
+# get_post_content()가 기록하는 프로세스 전체 통계
+extraction_stats = ExtractionStats()
+
+
+def extract_post_content(html, stats=extraction_stats):
+    """게시글 페이지 HTML에서 본문 추출 - (본문, 추출 방법) 반환 (찾지 못하면 ("", None))"""
+    started = time.perf_counter()
+    doc = _Document(_parse_events(html))
+    parse_ms = (time.perf_counter() - started) * 1000
+
+    content, strategy, timings = "", None, []
+    for name, find in _STRATEGY_FUNCTIONS:
+        strategy_started = time.perf_counter()
+        found = find(doc)
+        timings.append((name, (time.perf_counter() - strategy_started) * 1000))
+        if found:
+            content, strategy = found.strip(), name
+            break
+
+    if stats is not None:
+        stats.record(parse_ms, timings, strategy)
+    if strategy:
+        logger.debug(f"본문 추출 ({strategy}): {len(content)}자")
+    return content, strategy
@@ -1,41 +1,116 @@
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import count
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 import re
+from config import CRAWLING_CONFIG
+from content_extractor import extract_post_content
+from html_cache import get_html_cache
+from http_client import fetch
+
+# lxml 선택적 import (없으면 목록 페이지를 BeautifulSoup html.parser로 파싱)
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    'Referer': 'https://finance.naver.com/'
-}
+class HostRateLimiter:
+    """호스트별 초당 요청 수를 제한하는 rate limiter (스레드 안전)"""
+
+    def __init__(self, rate_per_host):
+        self.min_interval = 1.0 / rate_per_host if rate_per_host > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        """해당 URL의 호스트에 요청을 보낼 수 있을 때까지 대기"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# 모든 크롤링 요청이 공유하는 rate limiter
+rate_limiter = HostRateLimiter(CRAWLING_CONFIG['rate_limit'])
+
+# 게시글 링크의 글 번호 (board_read.naver?code=...&nid=305317830&...)
+_NID_PATTERN = re.compile(r'[?&]nid=(\d+)')
+
+# 목록 페이지 DataFrame 컬럼 (순서대로)
+LIST_COLUMNS = ('날짜', '제목', '작성자', '조회수', '공감', '비공감', '링크', '글번호')
+
+# class 속성에 해당 클래스가 포함된 요소 (BeautifulSoup의 class_= 검색과 같음)
+_TYPE2_TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' type2 ')]"
+_BLIND_SPAN_XPATH = ".//span[contains(concat(' ', normalize-space(@class), ' '), ' cleanbot_list_blind ')]"
+
+# 목록 날짜의 기본 형식 "2024.12.29 14:21"
+_DATETIME_PATTERN = re.compile(r'^(\d{4})\.(\d{2})\.(\d{2}) (\d{2}):(\d{2})$')
 
 def get_discussion_url(stock_code, page=1):
     """네이버 종목토론실 URL 생성"""
     base_url = "https://finance.naver.com/item/board.naver"
     return f"{base_url}?code={stock_code}&page={page}"
 
-def parse_naver_board_list(html):
-    """네이버 종목토론실 게시글 목록 파싱"""
+def parse_naver_board_list(html, parser=None):
+    """네이버 종목토론실 게시글 목록 파싱
+
+    parser: 'lxml' 또는 'bs4' (기본값 CRAWLING_CONFIG['list_parser'], 'auto'이면 lxml이 설치되어 있을 때 lxml 사용).
+    두 파서 모두 행마다 dict를 만들지 않고 컬럼별 리스트에 바로 값을 채운 뒤 DataFrame으로 변환합니다.
+    """
+    parser = parser or CRAWLING_CONFIG['list_parser']
+    if parser == 'auto':
+        parser = 'lxml' if HAS_LXML else 'bs4'
+    
+    if parser == 'lxml' and HAS_LXML:
+        columns = _parse_board_rows_lxml(html)
+    else:
+        columns = _parse_board_rows_bs4(html)
+    
+    if not columns or not columns['날짜']:
+        return pd.DataFrame()
+    df = pd.DataFrame(columns, columns=LIST_COLUMNS)
+    # 블라인드 글처럼 링크가 없으면 결측값 (정수 컬럼 유지)
+    df['글번호'] = df['글번호'].astype('Int64')
+    return df
+
+def _append_board_row(columns, date_raw, title, author, views, like, dislike, link):
+    """파싱한 행 하나를 컬럼별 리스트에 추가"""
+    columns['날짜'].append(parse_date(date_raw))
+    columns['제목'].append(title)
+    columns['작성자'].append(author)
+    columns['조회수'].append(views)
+    columns['공감'].append(like)
+    columns['비공감'].append(dislike)
+    columns['링크'].append(link)
+    columns['글번호'].append(extract_nid(link))
+
+def _parse_board_rows_bs4(html):
+    """BeautifulSoup(html.parser)으로 목록 테이블 파싱 (lxml이 없을 때 사용하는 기존 방식)"""
     soup = BeautifulSoup(html, 'html.parser')
     table = soup.find('table', class_='type2')
-    posts = []
     if not table:
-        return pd.DataFrame()
+        return None
     
+    columns = {name: [] for name in LIST_COLUMNS}
     for row in table.find_all('tr'):
         cols = row.find_all('td')
         if len(cols) != 6:
             continue  # 헤더, 안내, 클린봇 등 스킵
         
-        # 날짜 파싱 개선
-        date_raw = cols[0].get_text(strip=True)
-        date = parse_date(date_raw)
-        
         # 제목 및 링크
         title_td = cols[1]
         blind = title_td.find('span', class_='cleanbot_list_blind')
@@ -54,33 +129,82 @@ def parse_naver_board_list(html):
                 title = title_td.get_text(strip=True)
                 link = ''
         
-        # 작성자
-        author = cols[2].get_text(strip=True)
-        # 조회수
-        views = cols[3].get_text(strip=True)
-        # 공감/비공감
-        like = cols[4].get_text(strip=True)
-        dislike = cols[5].get_text(strip=True)
+        # 날짜, 작성자, 조회수, 공감/비공감
+        _append_board_row(
+            columns, cols[0].get_text(strip=True), title, cols[2].get_text(strip=True),
+            cols[3].get_text(strip=True), cols[4].get_text(strip=True), cols[5].get_text(strip=True), link
+        )
+    return columns
+
+def _lxml_text(element):
+    """BeautifulSoup의 get_text(strip=True)와 같은 결과 (하위 텍스트 조각을 각각 strip해 이어 붙임)"""
+    return ''.join(part.strip() for part in element.itertext())
+
+def _lxml_first_string(element):
+    """BeautifulSoup의 find(string=True, recursive=False)와 같은 결과 (요소 바로 아래 첫 텍스트 노드)"""
+    if element.text is not None:
+        return element.text
+    for child in element:
+        if child.tail is not None:
+            return child.tail
+    return None
+
+def _parse_board_rows_lxml(html):
+    """lxml(C 파서)로 목록 테이블 파싱 - 결과는 _parse_board_rows_bs4()와 같음"""
+    try:
+        root = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+    tables = root.xpath(_TYPE2_TABLE_XPATH)
+    if not tables:
+        return None
+    
+    columns = {name: [] for name in LIST_COLUMNS}
+    for row in tables[0].iter('tr'):
+        cols = list(row.iter('td'))
+        if len(cols) != 6:
+            continue  # 헤더, 안내, 클린봇 등 스킵
+        
+        title_td = cols[1]
+        a_tag = title_td.find('.//a')
+        if title_td.xpath(_BLIND_SPAN_XPATH):
+            title = ''
+            link = ''
+        elif a_tag is not None:
+            text_node = _lxml_first_string(a_tag)
+            title = text_node.strip() if text_node else _lxml_text(a_tag)
+            href = a_tag.get('href')
+            link = f"https://finance.naver.com{href}" if href is not None else ''
+        else:
+            title = _lxml_text(title_td)
+            link = ''
         
-        posts.append({
-            '날짜': date,
-            '제목': title,
-            '작성자': author,
-            '조회수': views,
-            '공감': like,
-            '비공감': dislike,
-            '링크': link
-        })
+        _append_board_row(
+            columns, _lxml_text(cols[0]), title, _lxml_text(cols[2]),
+            _lxml_text(cols[3]), _lxml_text(cols[4]), _lxml_text(cols[5]), link
+        )
+    return columns
+
+def get_html(url, conditional=False):
+    """페이지 HTML 조회 - HTML 캐시(HTML_CACHE_DIR)에 있으면 요청하지 않고, 없으면 rate limiter를 거쳐 요청한 뒤 캐시에 저장"""
+    cache = get_html_cache()
+    if cache is not None:
+        html = cache.get(url)
+        if html is not None:
+            return html
     
-    return pd.DataFrame(posts)
+    rate_limiter.wait(url)
+    html = fetch(url, conditional=conditional)
+    if cache is not None:
+        cache.put(url, html)
+    return html
 
 def get_posts_from_page(stock_code, page_no):
     """한 페이지의 게시글 정보를 수집"""
     url = get_discussion_url(stock_code, page_no)
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        df = parse_naver_board_list(response.text)
+        # 1페이지는 폴링마다 다시 요청하므로 조건부 요청 (바뀌지 않았으면 304)
+        df = parse_naver_board_list(get_html(url, conditional=(page_no == 1)))
         return df
     except Exception as e:
         logger.error(f"페이지 {page_no} 수집 중 오류: {e}")
@@ -90,9 +214,7 @@ def get_last_page(stock_code):
     """해당 종목 토론실의 마지막 페이지 번호 구하기"""
     url = get_discussion_url(stock_code, 1)
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(get_html(url, conditional=True), 'html.parser')
         
         # 페이지네이션에서 마지막 페이지 번호 추출
         page_links = soup.select('.pgRR a')
@@ -105,268 +227,243 @@ def get_last_page(stock_code):
         logger.error(f"마지막 페이지 조회 실패: {e}")
         return 1
 
-def crawl_stock_discussion(stock_code, start_page=1, end_page=None, existing_set=None, include_title_in_key=False):
-    """종목토론실 전체 데이터 수집 (중복시 중단)"""
+def _iter_pages(stock_code, pages, max_workers):
+    """pages 순서대로 (페이지 번호, 게시글 DataFrame 또는 None)을 반환
+
+    max_workers개의 페이지 요청을 미리 진행하되 결과는 페이지 순서대로 내보내며,
+    호출하는 쪽이 중간에 멈추면(generator close) 아직 시작하지 않은 요청은 취소합니다.
+    """
+    pages = iter(pages)
+    in_flight = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    def submit_next_page():
+        page = next(pages, None)
+        if page is not None:
+            in_flight.append((page, executor.submit(get_posts_from_page, stock_code, page)))
+    
+    try:
+        for _ in range(max_workers):
+            submit_next_page()
+        
+        while in_flight:
+            page, future = in_flight.popleft()
+            yield page, future.result()
+            # 처리한 만큼 다음 페이지 요청 (서버 부하는 rate_limiter가 제어)
+            submit_next_page()
+    finally:
+        # 중간에 중단된 경우 대기 중인 페이지 요청 취소
+        for _, pending in in_flight:
+            pending.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def crawl_stock_discussion(stock_code, start_page=1, end_page=None, existing_set=None, include_title_in_key=False, max_workers=None):
+    """종목토론실 전체 데이터 수집 (중복시 중단)
+
+    max_workers개의 페이지 요청을 동시에 진행하되, 결과는 페이지 순서대로 처리합니다.
+    중복 게시글이 발견되면 아직 시작하지 않은 페이지 요청은 취소합니다.
+    """
     
     if end_page is None:
         end_page = get_last_page(stock_code)
+    if max_workers is None:
+        max_workers = CRAWLING_CONFIG['concurrency']
+    max_workers = max(1, max_workers)
     
     all_posts = []
     stop_crawling = False
     
-    # 기존 데이터가 제목을 포함하는지 확인
-    if existing_set and len(next(iter(existing_set), ())) == 3:
+    # 기존 데이터가 제목을 포함하는지 확인 (dedup_index의 인덱스는 key_type/key_length로 알려줌)
+    key_type = getattr(existing_set, 'key_type', None)
+    key_length = getattr(existing_set, 'key_length', None)
+    if key_length is None and existing_set:
+        key_length = len(next(iter(existing_set), ()))
+    if key_length == 3:
         include_title_in_key = True
         logger.info("기존 데이터가 제목을 포함하므로 제목도 함께 비교합니다.")
     
-    for page in range(start_page, end_page + 1):
-        logger.info(f"페이지 {page}/{end_page} 수집 중...")
-        
-        posts_df = get_posts_from_page(stock_code, page)
-        if posts_df is not None and not posts_df.empty:
-            # 중복 체크 개선
-            logger.debug(f"페이지 {page}에서 {len(posts_df)}개 게시글 수집")
+    with closing(_iter_pages(stock_code, range(start_page, end_page + 1), max_workers)) as pages:
+        for page, posts_df in pages:
+            logger.info(f"페이지 {page}/{end_page} 수집 중...")
             
-            page_posts = []
-            for idx, row in posts_df.iterrows():
-                # 키 생성
-                key = create_post_key(row, include_title_in_key)
+            if posts_df is not None and not posts_df.empty:
+                # 중복 체크 개선
+                logger.debug(f"페이지 {page}에서 {len(posts_df)}개 게시글 수집")
                 
-                logger.debug(f"검사 중: {key}")
+                page_posts = []
+                for idx, row in posts_df.iterrows():
+                    # 키 생성 (nid 인덱스면 글 번호, 아니면 날짜/작성자[/제목])
+                    key = row_nid(row) if key_type == 'nid' else create_post_key(row, include_title_in_key)
+                    
+                    logger.debug(f"검사 중: {key}")
+                    
+                    if existing_set and key is not None and key in existing_set:
+                        logger.info(f"중복 데이터 발견: {key}")
+                        logger.info(f"기존 데이터 수: {len(existing_set)}개")
+                        stop_crawling = True
+                        break
+                    else:
+                        page_posts.append(row)
                 
-                if existing_set and key in existing_set:
-                    logger.info(f"중복 데이터 발견: {key}")
-                    logger.info(f"기존 데이터 수: {len(existing_set)}개")
-                    stop_crawling = True
+                # 중복 발견 전까지의 데이터만 추가
+                if page_posts:
+                    page_df = pd.DataFrame(page_posts)
+                    all_posts.append(page_df)
+                    logger.info(f"페이지 {page}에서 {len(page_posts)}개 새 게시글 추가")
+                
+                if stop_crawling:
+                    logger.info(f"중복으로 인한 크롤링 중단 (페이지 {page})")
                     break
-                else:
-                    page_posts.append(row)
-            
-            # 중복 발견 전까지의 데이터만 추가
-            if page_posts:
-                page_df = pd.DataFrame(page_posts)
-                all_posts.append(page_df)
-                logger.info(f"페이지 {page}에서 {len(page_posts)}개 새 게시글 추가")
-            
-            if stop_crawling:
-                logger.info(f"중복으로 인한 크롤링 중단 (페이지 {page})")
-                break
-        else:
-            logger.warning(f"페이지 {page} 데이터 수집 실패")
-        
-        if stop_crawling:
-            break
-        
-        # 서버 부하 방지를 위한 딜레이
-        time.sleep(1)
+            else:
+                logger.warning(f"페이지 {page} 데이터 수집 실패")
     
     if all_posts:
         final_df = pd.concat(all_posts, ignore_index=True)
         return final_df
     return pd.DataFrame()
 
-def get_post_content(post_url):
-    """개별 게시글의 본문 내용을 크롤링"""
-    try:
-        response = requests.get(post_url, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        content = ""
-        
-        # 방법 1: summary 속성을 이용한 본문 테이블 찾기 (가장 정확한 방법)
-        content_table = soup.find('table', {'summary': '게시판 글 본문보기'})
-        if content_table:
-            # 테이블 내에서 실제 본문 영역 찾기
-            content_cells = content_table.find_all('td')
-            for cell in content_cells:
-                cell_text = cell.get_text(strip=True, separator='\n')
-                
-                # 본문으로 보이는 셀 조건
-                if (len(cell_text) > 5 and 
-                    any(ord(c) >= 0xAC00 and ord(c) <= 0xD7A3 for c in cell_text) and
-                    not any(header_word in cell_text for header_word in [
-                        '게시판 글 본문보기', '조회', '공감', '비공감', '작성자', 
-                        '더보기', 'IP', '작성일', '신고', '스크랩'
-                    ])):
-                    
-                    # 불필요한 텍스트 제거
-                    lines = cell_text.split('\n')
-                    content_lines = []
-                    
-                    for line in lines:
-                        line = line.strip()
-                        if (line and 
-                            len(line) > 1 and 
-                            not line.replace(',', '').replace('.', '').isdigit() and  # 숫자만 있는 라인 제외
-                            not any(word in line for word in [
-                                '게시판 글 본문보기', '조회', '공감', '비공감', '작성자',
-                                '더보기', 'IP', '작성일', '신고', '스크랩',
-                                '목록', '이전', '다음', '추천', '종목토론실', '네이버', 
-                                '로그인', '검색', '댓글', 'Copyright', '©', 'Corp'
-                            ]) and
-                            not re.match(r'^\d{4}\.\d{2}\.\d{2}', line) and  # 날짜 형식 제외
-                            not re.match(r'^\d+\.\d+\.\*\*\*\.\d+', line)):  # IP 주소 형식 제외
-                            content_lines.append(line)
-                    
-                    if content_lines and len('\n'.join(content_lines)) > 5:
-                        content = '\n'.join(content_lines)
-                        logger.debug(f"summary 속성으로 본문 추출: {len(content)}자")
-                        return content.strip()
-        
-        # 방법 2: 일반적인 본문 선택자들 시도
-        # 방법 2: 일반적인 본문 선택자들 시도
-        content_selectors = [
-            '.view_text',
-            'td.view_text', 
-            '.board_view .view_text',
-            'div.view_text',
-            '.article_view .view_text'
-        ]
-        
-        for selector in content_selectors:
-            content_element = soup.select_one(selector)
-            if content_element:
-                content = content_element.get_text(strip=True, separator='\n')
-                if content and len(content) > 10:
-                    logger.debug(f"본문 추출 성공 (선택자: {selector}): {len(content)}자")
-                    return content.strip()
-        
-        # 방법 3: 테이블 구조에서 본문 영역 찾기
-        if not content:
-            tables = soup.find_all('table')
-            candidates = []
-            
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all('td')
-                    for cell in cells:
-                        cell_text = cell.get_text(strip=True, separator='\n')
-                        
-                        # 본문 후보 조건
-                        if (len(cell_text) > 5 and 
-                            any(ord(c) >= 0xAC00 and ord(c) <= 0xD7A3 for c in cell_text) and
-                            not any(nav_word in cell_text for nav_word in [
-                                '이전글', '다음글', '목록', '추천', '신고', '스크랩',
-                                '종목토론실', '네이버 금융', '로그인', '검색', '댓글'
-                            ])):
-                            
-                            # 불필요한 텍스트 제거
-                            lines = cell_text.split('\n')
-                            content_lines = []
-                            
-                            for line in lines:
-                                line = line.strip()
-                                if (line and 
-                                    len(line) > 1 and 
-                                    not line.replace(',', '').replace('.', '').isdigit() and  # 숫자만 있는 라인 제외
-                                    not any(word in line for word in [
-                                        '목록', '이전', '다음', '추천', '신고', '스크랩',
-                                        '종목토론실', '네이버', '로그인', '검색', '댓글',
-                                        'Copyright', '©', 'Corp', 'All Rights Reserved'
-                                    ])):
-                                    content_lines.append(line)
-                            
-                            if content_lines:
-                                clean_content = '\n'.join(content_lines)
-                                # 한글 비율 계산
-                                korean_chars = sum(1 for c in clean_content if 0xAC00 <= ord(c) <= 0xD7A3)
-                                total_chars = len(clean_content.replace(' ', '').replace('\n', ''))
-                                korean_ratio = korean_chars / total_chars if total_chars > 0 else 0
-                                
-                                # 점수 계산 (한글 비율 * 길이)
-                                score = korean_ratio * len(clean_content)
-                                candidates.append((clean_content, score))
+def extract_nid(link):
+    """게시글 링크에서 글 번호(nid) 추출 (링크가 없는 블라인드 글 등은 None)"""
+    if not isinstance(link, str):
+        return None
+    match = _NID_PATTERN.search(link)
+    return int(match.group(1)) if match else None
+
+def row_nid(row):
+    """목록 행의 글 번호 (글번호 컬럼이 없으면 링크에서 추출, 없으면 None)"""
+    nid = row.get('글번호')
+    if nid is None or pd.isna(nid):
+        return extract_nid(row.get('링크'))
+    return int(nid)
+
+def crawl_new_posts(stock_code, mark=None, start_page=1, end_page=None, max_pages=None, max_workers=None):
+    """high-water mark(마지막으로 저장한 게시글의 nid)를 넘을 때까지 새 게시글을 수집하고 (DataFrame, 갱신할 mark) 반환
+
+    mark는 database.get_high_water_mark()가 반환하는 dict입니다 (last_nid, last_post_at, gap_low_nid, gap_high_nid).
+    - nid가 last_nid 이하인 글을 만나면 그 아래는 이미 저장된 글이므로 중단합니다.
+    - end_page까지 기준점에 도달하지 못하면(예상보다 글이 많이 올라온 경우) max_pages까지 페이지를 늘려 계속 수집합니다.
+    - max_pages에서도 도달하지 못하면 이번에 수집한 nid 구간을 gap으로 기록해, 다음 실행에서는 그 구간을 건너뛰고
+      아래쪽의 남은 글을 이어서 수집합니다 (기준점은 남은 글을 모두 수집한 뒤에 올립니다).
+    - mark가 없으면(처음 수집하는 종목) end_page까지만 수집하고 그중 가장 큰 nid를 기준점으로 삼습니다.
+    - 글 번호가 없는 블라인드 글은 기준점 위에 있으면 그대로 반환하며, 이미 저장된 글인지는
+      stock_posts의 UNIQUE KEY (stock_code, blind_key)로 저장할 때 판단합니다.
+    반환된 mark는 게시글을 DB에 저장한 뒤에 database.save_high_water_mark()로 저장해야 합니다.
+    """
+    mark = dict(mark or {})
+    last_nid = mark.get('last_nid')
+    gap_low, gap_high = mark.get('gap_low_nid'), mark.get('gap_high_nid')
+    if end_page is None:
+        end_page = CRAWLING_CONFIG['max_pages']
+    if max_pages is None:
+        max_pages = CRAWLING_CONFIG['max_extend_pages']
+    if max_workers is None:
+        max_workers = CRAWLING_CONFIG['concurrency']
+    max_workers = max(1, max_workers)
+    
+    # 기준점이 없으면 확장하지 않음 (게시판 전체 이력을 처음부터 받지 않도록)
+    page_budget = max(end_page, start_page + max_pages - 1) if last_nid is not None else end_page
+    page_budget -= start_page - 1
+    
+    all_posts = []
+    seen_nids = set()
+    collected = {}  # nid -> 날짜 (이번에 새로 수집한 글)
+    used_pages = 0  # gap 구간만 있던 페이지는 세지 않음 (남은 글을 이어서 수집할 수 있도록)
+    crossed = board_end = in_gap = False
+    previous_df = None
+    
+    with closing(_iter_pages(stock_code, count(start_page), max_workers)) as pages:
+        for page, posts_df in pages:
+            if posts_df is None:
+                # 실패한 페이지 아래로는 빈틈이 생기므로 여기서 멈추고 다음 실행에서 이어서 수집
+                logger.warning(f"페이지 {page} 데이터 수집 실패, 수집 중단")
+                break
+            if posts_df.empty:
+                board_end = True
+                break
             
-            # 가장 높은 점수의 후보 선택
-            if candidates:
-                best_content = max(candidates, key=lambda x: x[1])[0]
-                if len(best_content) > 5:
-                    logger.debug(f"테이블에서 본문 추출: {len(best_content)}자")
-                    return best_content.strip()
-        
-        # 방법 4: 특정 속성을 가진 td 요소 찾기
-        if not content:
-            # 높이나 패딩이 있는 td (본문 영역일 가능성)
-            content_tds = soup.find_all('td', attrs=lambda x: x and (
-                'height' in x or 'style' in x
-            ))
+            # 마지막 페이지를 넘기면 같은 목록이 반복됨 (글 번호가 없는 블라인드 글만 있는 페이지도 비교)
+            repeated = previous_df is not None and posts_df.equals(previous_df)
+            previous_df = posts_df
             
-            for td in content_tds:
-                if td.get('style') and ('padding' in td.get('style', '') or 'height' in td.get('style', '')):
-                    td_text = td.get_text(strip=True, separator='\n')
-                    if (len(td_text) > 5 and  # 길이 조건 완화
-                        any(ord(c) >= 0xAC00 and ord(c) <= 0xD7A3 for c in td_text)):
-                        
-                        # 불필요한 텍스트 필터링
-                        lines = [line.strip() for line in td_text.split('\n') if line.strip()]
-                        filtered_lines = []
-                        
-                        for line in lines:
-                            if (len(line) > 1 and  # 2자 이상의 라인
-                                not any(word in line for word in [
-                                    '목록', '이전글', '다음글', '추천', '신고', '스크랩',
-                                    '종목토론실', '네이버 금융', '로그인', '검색'
-                                ])):
-                                filtered_lines.append(line)
-                        
-                        if filtered_lines and len('\n'.join(filtered_lines)) > 5:
-                            content = '\n'.join(filtered_lines)
-                            logger.debug(f"속성 기반 td에서 본문 추출: {len(content)}자")
-                            return content.strip()
-        
-        # 방법 5: 가장 긴 텍스트 블록 찾기 (최후의 방법)
-        if not content:
-            all_tds = soup.find_all('td')
-            best_content = ""
-            best_score = 0
+            page_posts = []
+            nid_on_page = new_on_page = False
+            for _, row in posts_df.iterrows():
+                if repeated:
+                    break
+                nid = row_nid(row)
+                if nid is not None:
+                    nid_on_page = True
+                    # 수집 중 새 글이 올라와 앞 페이지의 글이 밀려 내려온 경우
+                    if nid in seen_nids:
+                        continue
+                    seen_nids.add(nid)
+                    new_on_page = True
+                    if last_nid is not None and nid <= last_nid:
+                        crossed = True
+                        break
+                    in_gap = gap_low is not None and gap_low <= nid <= gap_high
+                    if in_gap:
+                        continue
+                    collected[nid] = row['날짜']
+                elif in_gap:
+                    # 글 번호가 없는 블라인드 글도 gap 구간 안에 있으면 이미 저장된 글
+                    continue
+                page_posts.append(row)
             
-            for td in all_tds:
-                td_text = td.get_text(strip=True, separator='\n')
-                if (len(td_text) > 5 and 
-                    any(ord(c) >= 0xAC00 and ord(c) <= 0xD7A3 for c in td_text) and
-                    not any(nav_word in td_text[:50] for nav_word in [
-                        '목록', '이전글', '다음글', '네이버 금융', '종목토론실'
-                    ])):
-                    
-                    # 점수 계산 (한글 비율과 길이 고려)
-                    korean_chars = sum(1 for c in td_text if 0xAC00 <= ord(c) <= 0xD7A3)
-                    total_chars = len(td_text.replace(' ', '').replace('\n', ''))
-                    korean_ratio = korean_chars / total_chars if total_chars > 0 else 0
-                    
-                    # 숫자만 있는 텍스트 제외
-                    if not td_text.replace(',', '').replace('.', '').isdigit():
-                        score = korean_ratio * len(td_text)
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_content = td_text
+            if page_posts:
+                all_posts.append(pd.DataFrame(page_posts))
+                used_pages += 1
+                logger.info(f"페이지 {page}에서 {len(page_posts)}개 새 게시글 추가")
             
-            if best_content:
-                # 불필요한 텍스트 정리
-                lines = [line.strip() for line in best_content.split('\n') if line.strip()]
-                filtered_lines = []
-                
-                for line in lines:
-                    if (len(line) > 1 and 
-                        not line.replace(',', '').replace('.', '').isdigit() and  # 숫자만 있는 라인 제외
-                        not any(word in line for word in [
-                            '목록', '이전', '다음', '추천', '신고', '스크랩',
-                            '종목토론실', '네이버', '로그인', '검색', '댓글'
-                        ])):
-                        filtered_lines.append(line)
-                
-                if filtered_lines:
-                    content = '\n'.join(filtered_lines)
-                    logger.debug(f"가장 적합한 텍스트 블록에서 본문 추출: {len(content)}자")
-        
-        return content.strip() if content else ""
-        
+            if crossed:
+                logger.info(f"기준점(nid {last_nid}) 도달로 수집 중단 (페이지 {page})")
+                break
+            if repeated or (nid_on_page and not new_on_page):
+                # 이미 본 글만 있는 페이지 = 게시판 끝 (블라인드 글만 있는 페이지는 계속 수집)
+                board_end = True
+                break
+            if used_pages >= page_budget:
+                break
+            if page == end_page and last_nid is not None:
+                logger.info(f"페이지 {end_page}까지 기준점(nid {last_nid})에 도달하지 못해 최대 {page_budget}페이지까지 계속 수집")
+    
+    new_mark = dict(mark)
+    top = max(collected, default=None)
+    if top is not None and (last_nid is None or top > max(last_nid, gap_high or 0)):
+        new_mark['last_post_at'] = collected[top]
+    
+    if crossed or board_end or last_nid is None:
+        # 기준점 위의 글을 모두 수집함
+        candidates = [nid for nid in (last_nid, top, gap_high) if nid is not None]
+        new_mark['last_nid'] = max(candidates) if candidates else None
+        new_mark['gap_low_nid'] = new_mark['gap_high_nid'] = None
+    elif seen_nids:
+        # 기준점까지 도달하지 못함: 이번에 훑은 구간(새로 수집했거나 이미 gap으로 저장된 글)을 gap으로 기록
+        low, high = min(seen_nids), max(seen_nids)
+        if gap_low is not None and low <= gap_high:
+            low, high = min(low, gap_low), max(high, gap_high)
+        elif gap_low is not None:
+            logger.warning(f"기존 수집 구간(nid {gap_low}~{gap_high})까지 도달하지 못해 그 구간은 다음 실행에서 다시 확인합니다.")
+        new_mark['gap_low_nid'], new_mark['gap_high_nid'] = low, high
+        logger.warning(f"기준점(nid {last_nid})까지 남은 글이 있어 다음 실행에서 nid {low} 아래부터 이어서 수집합니다.")
+    
+    if all_posts:
+        return pd.concat(all_posts, ignore_index=True), new_mark
+    return pd.DataFrame(), new_mark
+
+def get_post_content(post_url, with_strategy=False):
+    """개별 게시글의 본문 내용을 크롤링 (HTML 캐시에 있으면 요청하지 않음)
+
+    본문 추출은 content_extractor.extract_post_content()가 문서를 한 번 훑어 처리합니다.
+    with_strategy=True이면 (본문, 추출 방법) 튜플을 반환합니다 (추출 실패 시 ("", None)).
+    """
+    try:
+        content, strategy = extract_post_content(get_html(post_url))
     except Exception as e:
         logger.error(f"게시글 본문 크롤링 실패 {post_url}: {e}")
-        return ""
+        content, strategy = "", None
+    
+    return (content, strategy) if with_strategy else content
 
 def filter_by_date(df, start_date, end_date):
     """날짜 범위로 게시글 필터링"""
@@ -399,6 +496,11 @@ def parse_date(date_str):
     try:
         date_str = date_str.strip()
         
+        # "2024.12.29 14:21" 형식 (목록의 거의 모든 행, pandas 파싱을 거치지 않음)
+        match = _DATETIME_PATTERN.match(date_str)
+        if match:
+            return datetime(*map(int, match.groups()))
+        
         # "12.29" 형식 (같은 해)
         if re.match(r'^\d{2}\.\d{2}$', date_str):
             current_year = datetime.now().year
@@ -438,8 +540,8 @@ if __name__ == "__main__":
     url = "https://finance.naver.com/item/board_read.naver?code=139480&nid=305317830&st=&sw=&page=1"
     print(f"크롤링 URL: {url}")
     
-    contents = get_post_content(url)
-    print("게시글 본문 내용:")
+    contents, strategy = get_post_content(url, with_strategy=True)
+    print(f"게시글 본문 내용 (추출 방법: {strategy}):")
     print("=" * 50)
     print(contents)
     print("=" * 50)
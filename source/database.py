@@ -1,71 +1,204 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 import logging
+import threading
+import time
 import pymysql
-from datetime import datetime
-from config import DB_CONFIG
+from config import DB_CONFIG, DB_POOL_CONFIG
 from urllib.parse import quote_plus
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 프로세스 전역 엔진 (get_db_connection()에서 최초 호출 시 생성)
+_engine = None
+_engine_lock = threading.Lock()
+
+# 커넥션 풀 통계
+_pool_stats_lock = threading.Lock()
+_pool_stats = {
+    'connects': 0,           # 새로 맺은 DB 연결 수 (TCP+인증 핸드셰이크)
+    'connect_time': 0.0,     # 핸드셰이크에 걸린 누적 시간(초)
+    'max_connect_time': 0.0,
+    'checkouts': 0,          # 풀에서 연결을 빌려간 횟수
+    'checkins': 0,
+    'checkout_time': 0.0     # 연결을 빌려서 사용한 누적 시간(초)
+}
+
+def _register_pool_listeners(engine):
+    """풀 이벤트에 통계 수집 리스너 등록"""
+    
+    @event.listens_for(engine, 'do_connect')
+    def _on_do_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info['connect_started'] = time.perf_counter()
+    
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, conn_rec):
+        started = conn_rec.info.pop('connect_started', None)
+        elapsed = time.perf_counter() - started if started else 0.0
+        with _pool_stats_lock:
+            _pool_stats['connects'] += 1
+            _pool_stats['connect_time'] += elapsed
+            _pool_stats['max_connect_time'] = max(_pool_stats['max_connect_time'], elapsed)
+    
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, conn_rec, conn_proxy):
+        conn_rec.info['checkout_at'] = time.perf_counter()
+        with _pool_stats_lock:
+            _pool_stats['checkouts'] += 1
+    
+    @event.listens_for(engine, 'checkin')
+    def _on_checkin(dbapi_connection, conn_rec):
+        checkout_at = conn_rec.info.pop('checkout_at', None)
+        with _pool_stats_lock:
+            _pool_stats['checkins'] += 1
+            if checkout_at:
+                _pool_stats['checkout_time'] += time.perf_counter() - checkout_at
+
 def get_db_connection():
-    """데이터베이스 연결 객체 반환"""
-    try:
-        # 비밀번호에 특수 문자가 있을 경우 URL 인코딩
-        encoded_password = quote_plus(DB_CONFIG['password'])
-        encoded_user = quote_plus(DB_CONFIG['user'])
-        
-        connection_string = f"mysql+pymysql://{encoded_user}:{encoded_password}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?charset={DB_CONFIG['charset']}"
-        engine = create_engine(connection_string, echo=False)
-        return engine
-    except Exception as e:
-        logger.error(f"데이터베이스 연결 실패: {e}")
-        return None
+    """데이터베이스 엔진 반환 (프로세스 내에서 커넥션 풀과 함께 공유)"""
+    global _engine
+    if _engine is not None:
+        return _engine
+    
+    with _engine_lock:
+        if _engine is not None:
+            return _engine
+        try:
+            # 비밀번호에 특수 문자가 있을 경우 URL 인코딩
+            encoded_password = quote_plus(DB_CONFIG['password'])
+            encoded_user = quote_plus(DB_CONFIG['user'])
+            
+            connection_string = f"mysql+pymysql://{encoded_user}:{encoded_password}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?charset={DB_CONFIG['charset']}"
+            engine = create_engine(connection_string, echo=False, **DB_POOL_CONFIG)
+            _register_pool_listeners(engine)
+            _engine = engine
+            logger.debug(f"DB 엔진 생성 (pool_size={DB_POOL_CONFIG['pool_size']}, max_overflow={DB_POOL_CONFIG['max_overflow']})")
+            return _engine
+        except Exception as e:
+            logger.error(f"데이터베이스 연결 실패: {e}")
+            return None
+
+def dispose_db_connection():
+    """공유 엔진과 풀의 연결을 모두 정리 (프로세스 종료 또는 fork 후 호출)"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
 
-def get_existing_posts(stock_code):
-    """기존에 저장된 게시글 데이터 조회 (중복 체크용)"""
+def get_pool_stats():
+    """커넥션 풀 상태 및 체크아웃/연결 지연 통계 반환"""
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    
+    stats['avg_connect_ms'] = stats['connect_time'] / stats['connects'] * 1000 if stats['connects'] else 0.0
+    stats['max_connect_ms'] = stats.pop('max_connect_time') * 1000
+    stats['avg_checkout_ms'] = stats['checkout_time'] / stats['checkins'] * 1000 if stats['checkins'] else 0.0
+    stats['reuse_ratio'] = 1 - stats['connects'] / stats['checkouts'] if stats['checkouts'] else 0.0
+    del stats['connect_time'], stats['checkout_time']
+    
+    engine = _engine
+    if engine is not None:
+        pool = engine.pool
+        stats['pool_size'] = pool.size()
+        stats['checked_out'] = pool.checkedout()
+        stats['overflow'] = pool.overflow()
+        stats['idle'] = pool.checkedin()
+    return stats
+
+def get_existing_posts(stock_code, include_title=False, by_nid=True):
+    """기존에 저장된 게시글 키 인덱스 조회 (중복 체크용, crawl_stock_discussion()의 existing_set으로 사용)
+
+    by_nid=True이면 글 번호(nid) 인덱스를, False이면 (날짜, 작성자[, 제목]) 키의 64비트 해시 인덱스를 반환합니다.
+    """
+    from dedup_index import build_nid_index, build_post_key_index
+    if by_nid:
+        return build_nid_index(stock_code)
+    return build_post_key_index(stock_code, include_title=include_title)
+
+def get_high_water_mark(stock_code):
+    """종목의 크롤링 기준점(마지막으로 저장한 게시글 nid와 작성 시각, 이어서 수집할 gap 구간) 조회
+
+    crawl_state에 기록이 없으면 저장된 게시글의 가장 큰 nid를 기준점으로 삼습니다
+    (UNIQUE (stock_code, nid) 인덱스만 읽음). 저장된 게시글도 없으면 빈 dict를 반환합니다.
+    """
     engine = get_db_connection()
     if engine is None:
-        return set()
+        return {}
     
     try:
-        query = text("SELECT date, author FROM stock_posts WHERE stock_code = :stock_code")
-        df = pd.read_sql(query, engine, params={'stock_code': stock_code})
-        
-        # 날짜와 작성자를 문자열로 변환하고 공백 제거
-        existing_set = set()
-        for _, row in df.iterrows():
-            # DATETIME 형식으로 저장된 날짜를 문자열로 변환
-            if pd.isna(row['date']):
-                date_str = "Unknown"
-            elif isinstance(row['date'], datetime):
-                date_str = row['date'].strftime('%Y-%m-%d %H:%M:%S')
-            else:
-                date_str = str(row['date']).strip()
+        with engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT last_nid, last_post_at, gap_low_nid, gap_high_nid
+                FROM crawl_state
+                WHERE stock_code = :stock_code
+            """), {'stock_code': stock_code}).mappings().fetchone()
+            if row and row['last_nid'] is not None:
+                return dict(row)
             
-            author_str = str(row['author']).strip()
-            existing_set.add((date_str, author_str))
-        
-        logger.info(f"기존 데이터 {len(existing_set)}개 로드 완료")
-        
-        # 디버깅을 위해 몇 개 샘플 출력
-        if existing_set:
-            sample_keys = list(existing_set)[:3]
-            logger.debug(f"기존 데이터 샘플: {sample_keys}")
-        
-        return existing_set
+            latest = conn.execute(text("""
+                SELECT nid, date
+                FROM stock_posts
+                WHERE stock_code = :stock_code
+                AND nid = (SELECT MAX(nid) FROM stock_posts WHERE stock_code = :stock_code)
+            """), {'stock_code': stock_code}).fetchone()
     except Exception as e:
-        logger.error(f"기존 데이터 조회 실패: {e}")
-        return set()
-    finally:
-        engine.dispose()
+        logger.error(f"크롤링 기준점 조회 실패: {e}")
+        return {}
+    
+    if latest is None:
+        return {}
+    last_nid, last_post_at = latest
+    logger.info(f"[{stock_code}] 저장된 게시글에서 크롤링 기준점 설정: nid {last_nid} ({last_post_at})")
+    return {'last_nid': last_nid, 'last_post_at': last_post_at, 'gap_low_nid': None, 'gap_high_nid': None}
+
+def save_high_water_mark(stock_code, mark):
+    """crawler.crawl_new_posts()가 반환한 기준점을 crawl_state에 저장 (게시글을 저장한 뒤에 호출)"""
+    engine = get_db_connection()
+    if engine is None or not mark:
+        return False
+    
+    last_post_at = mark.get('last_post_at')
+    last_post_at = None if last_post_at is None or pd.isna(last_post_at) else pd.Timestamp(last_post_at).to_pydatetime()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO crawl_state (stock_code, last_nid, last_post_at, gap_low_nid, gap_high_nid)
+                VALUES (:stock_code, :last_nid, :last_post_at, :gap_low_nid, :gap_high_nid)
+                ON DUPLICATE KEY UPDATE
+                last_nid = VALUES(last_nid),
+                last_post_at = VALUES(last_post_at),
+                gap_low_nid = VALUES(gap_low_nid),
+                gap_high_nid = VALUES(gap_high_nid)
+            """), {
+                'stock_code': stock_code,
+                'last_nid': mark.get('last_nid'),
+                'last_post_at': last_post_at,
+                'gap_low_nid': mark.get('gap_low_nid'),
+                'gap_high_nid': mark.get('gap_high_nid')
+            })
+            conn.commit()
+        return True
+    except Exception as e:
+        logger.error(f"크롤링 기준점 저장 실패: {e}")
+        return False
 
-def save_posts_to_db(posts_df, stock_code):
-    """게시글 데이터를 데이터베이스에 저장"""
+def save_posts_to_db(posts_df, stock_code, batch_size=500, on_duplicate='ignore', raise_on_error=False):
+    """게시글 데이터를 데이터베이스에 저장
+
+    batch_size건씩 묶어 multi-row INSERT(executemany)로 저장하고, 중복 판단은
+    stock_posts의 UNIQUE KEY (stock_code, nid)에 맡깁니다 (글 번호가 없는 블라인드 글은
+    (stock_code, blind_key = 날짜|작성자) UNIQUE KEY로 중복 판단).
+    on_duplicate='ignore'이면 중복 게시글을 건너뛰고(INSERT IGNORE),
+    'update'이면 조회수/공감/비공감 수를 최신 값으로 갱신합니다(ON DUPLICATE KEY UPDATE).
+    raise_on_error=True이면 저장 실패를 0건 저장과 구분할 수 있도록 예외를 다시 발생시킵니다.
+    """
     if posts_df.empty:
         logger.info("저장할 데이터가 없습니다.")
         return 0
+    if on_duplicate not in ('ignore', 'update'):
+        raise ValueError(f"on_duplicate는 'ignore' 또는 'update'여야 합니다: {on_duplicate}")
     
     engine = get_db_connection()
     if engine is None:
@@ -85,81 +218,82 @@ def save_posts_to_db(posts_df, stock_code):
             '조회수': 'views',
             '공감': 'likes',
             '비공감': 'dislikes',
-            '링크': 'link'
+            '링크': 'link',
+            '글번호': 'nid'
         })
         
-        # 날짜 형식 변환 (DATETIME으로 저장)
-        posts_df['date'] = pd.to_datetime(posts_df['date'], errors='coerce')
+        # 날짜 형식 변환 (DATETIME으로 저장, 파싱 실패는 NULL)
+        dates = pd.to_datetime(posts_df['date'], errors='coerce')
+        
+        # 데이터 정리 (None 값 처리)
+        text_columns = ['title', 'author', 'views', 'likes', 'dislikes', 'link']
+        posts_df[text_columns] = posts_df[text_columns].fillna('').astype(str)
+        posts_df['date'] = pd.Series([None if pd.isna(d) else d.to_pydatetime() for d in dates],
+                                     index=posts_df.index, dtype=object)
+        
+        # 글 번호 (링크가 없는 블라인드 글은 NULL)
+        if 'nid' in posts_df.columns:
+            posts_df['nid'] = pd.Series([None if pd.isna(n) else int(n) for n in posts_df['nid']],
+                                        index=posts_df.index, dtype=object)
+        else:
+            posts_df['nid'] = None
         
         # content와 is_analyzed 컬럼 초기화
         posts_df['content'] = ''
         posts_df['is_analyzed'] = False
         
-        # 데이터 정리 (None 값 처리)
-        posts_df = posts_df.fillna('')
+        records = posts_df[['stock_code', 'nid', 'date', 'title', 'author', 'views', 'likes',
+                            'dislikes', 'link', 'content', 'is_analyzed']].to_dict('records')
+        
+        if on_duplicate == 'ignore':
+            insert_query = text("""
+                INSERT IGNORE INTO stock_posts 
+                (stock_code, nid, date, title, author, views, likes, dislikes, link, content, is_analyzed)
+                VALUES 
+                (:stock_code, :nid, :date, :title, :author, :views, :likes, :dislikes, :link, :content, :is_analyzed)
+            """)
+        else:
+            insert_query = text("""
+                INSERT INTO stock_posts 
+                (stock_code, nid, date, title, author, views, likes, dislikes, link, content, is_analyzed)
+                VALUES 
+                (:stock_code, :nid, :date, :title, :author, :views, :likes, :dislikes, :link, :content, :is_analyzed)
+                ON DUPLICATE KEY UPDATE
+                views = VALUES(views),
+                likes = VALUES(likes),
+                dislikes = VALUES(dislikes)
+            """)
+        count_query = text("SELECT COUNT(*) FROM stock_posts WHERE stock_code = :stock_code")
         
         saved_count = 0
         
-        # 각 행을 개별적으로 저장 (중복 처리를 위해)
         with engine.connect() as conn:
-            for idx, row in posts_df.iterrows():
-                try:
-                    # 중복 확인
-                    check_query = text("""
-                        SELECT COUNT(*) as count FROM stock_posts 
-                        WHERE stock_code = :stock_code 
-                        AND date = :date 
-                        AND author = :author 
-                        AND title = :title
-                    """)
-                    
-                    result = conn.execute(check_query, {
-                        'stock_code': row['stock_code'],
-                        'date': row['date'],
-                        'author': row['author'],
-                        'title': row['title'][:100] if row['title'] else ''
-                    }).fetchone()
-                    
-                    if result[0] == 0:  # 중복이 아닌 경우만 삽입
-                        insert_query = text("""
-                            INSERT INTO stock_posts 
-                            (stock_code, date, title, author, views, likes, dislikes, link, content, is_analyzed)
-                            VALUES 
-                            (:stock_code, :date, :title, :author, :views, :likes, :dislikes, :link, :content, :is_analyzed)
-                        """)
-                        
-                        conn.execute(insert_query, {
-                            'stock_code': row['stock_code'],
-                            'date': row['date'],
-                            'title': row['title'],
-                            'author': row['author'],
-                            'views': row['views'],
-                            'likes': row['likes'],
-                            'dislikes': row['dislikes'],
-                            'link': row['link'],
-                            'content': row['content'],
-                            'is_analyzed': row['is_analyzed']
-                        })
-                        
-                        saved_count += 1
-                        logger.debug(f"저장 완료: {row['title'][:50]}...")
-                    else:
-                        logger.debug(f"중복 건너뜀: {row['title'][:50]}...")
-                        
-                except Exception as e:
-                    logger.error(f"개별 행 저장 실패: {e}, 행 데이터: {row.to_dict()}")
-                    continue
+            if on_duplicate == 'update':
+                # ON DUPLICATE KEY UPDATE의 affected rows는 갱신/삽입을 구분할 수 없으므로 행 수 차이로 계산
+                count_before = conn.execute(count_query, {'stock_code': stock_code}).scalar()
+            
+            for chunk_start in range(0, len(records), batch_size):
+                chunk = records[chunk_start:chunk_start + batch_size]
+                # executemany: PyMySQL이 하나의 multi-row INSERT 문으로 묶어서 전송
+                result = conn.execute(insert_query, chunk)
+                if on_duplicate == 'ignore':
+                    saved_count += result.rowcount
+                logger.debug(f"{chunk_start + len(chunk)}/{len(records)}건 전송 완료")
+            
+            if on_duplicate == 'update':
+                saved_count = conn.execute(count_query, {'stock_code': stock_code}).scalar() - count_before
             
             conn.commit()
         
-        logger.info(f"{saved_count}개의 새로운 게시글이 데이터베이스에 저장되었습니다.")
+        skipped_count = len(records) - saved_count
+        logger.info(f"{saved_count}개의 새로운 게시글이 데이터베이스에 저장되었습니다. (중복 {skipped_count}개 {'갱신' if on_duplicate == 'update' else '건너뜀'})")
         return saved_count
         
     except Exception as e:
         logger.error(f"데이터베이스 저장 실패: {e}")
+        if raise_on_error:
+            raise
         return 0
-    finally:
-        engine.dispose()
 
 def get_posts_count_from_db(stock_code):
     """해당 종목의 총 게시글 수 조회"""
@@ -174,8 +308,6 @@ def get_posts_count_from_db(stock_code):
     except Exception as e:
         logger.error(f"게시글 수 조회 실패: {e}")
         return 0
-    finally:
-        engine.dispose()
 
 def test_database_connection():
     """데이터베이스 연결 테스트"""
@@ -207,8 +339,6 @@ def test_database_connection():
     except Exception as e:
         print(f"❌ 데이터베이스 테스트 실패: {e}")
         return False
-    finally:
-        engine.dispose()
 
 def view_database_contents(stock_code=None, limit=100):
     """데이터베이스에 저장된 내용 확인"""
@@ -283,8 +413,6 @@ def view_database_contents(stock_code=None, limit=100):
         
     except Exception as e:
         print(f"데이터베이스 조회 실패: {e}")
-    finally:
-        engine.dispose()
 
 def process_engine(engine, stock_code):
     if engine:
@@ -432,8 +560,7 @@ def process_engine(engine, stock_code):
             
         except Exception as e:
             print(f"분석 결과 요약 실패: {e}")
-        finally:
-            engine.dispose()
 
 if __name__ == "__main__":
-    print(get_db_connection())
\ No newline at end of file
+    print(get_db_connection())
+    print(get_pool_stats())
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+중복 검사 인덱스 - 저장된 게시글 키 (날짜, 작성자[, 제목])를 64비트 해시의 정렬된 NumPy 배열로 보관
+
+get_existing_posts()가 종목의 모든 (date, author) 행을 읽어 문자열 튜플 set을 만들던 방식은
+게시글이 많은 종목에서 수백 MB의 메모리와 수 초의 시작 시간이 걸렸습니다.
+여기서는 DB가 키 문자열의 SHA1 앞 8바이트를 계산해 행마다 정수 하나만 전송하고,
+검사는 정렬된 배열의 이진 탐색으로 합니다 (게시글 100만 건 = 8MB).
+해시 충돌(확률 약 1e-8)로 잘못 일치하는 경우를 막기 위해 일치한 키는 기본적으로 DB에서 한 번 더 확인합니다.
+
+글 번호(nid)가 저장된 뒤로는 nid 자체를 정렬된 정수 배열로 보관하는 NidIndex를 기본으로 사용합니다
+(UNIQUE (stock_code, nid) 인덱스만 읽으므로 해시 계산도 필요 없음).
+
+두 인덱스 모두 crawl_stock_discussion()의 existing_set 인자에 그대로 넘길 수 있습니다 (`key in index`, `len(index)`).
+"""
+
+import hashlib
+import logging
+import os
+import time
+import numpy as np
+from sqlalchemy import text
+from config import CRAWLING_CONFIG
+from database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# 키 구성 요소 구분자 (CHAR(31) = unit separator)
+KEY_SEPARATOR = '\x1f'
+
+# 디스크 캐시 형식 버전 (해시 방식이 바뀌면 올려서 기존 캐시 무효화)
+CACHE_VERSION = 1
+
+FETCH_SIZE = 100000
+
+_KEY_HASH_SQL = """
+    SELECT id, CAST(CONV(LEFT(SHA1(CONCAT_WS(CHAR(31 USING utf8mb4),
+        COALESCE(DATE_FORMAT(date, '%Y-%m-%d %H:%i:%s'), 'Unknown'),
+        COALESCE(TRIM(author), '')
+        {title}
+    )), 16), 16, 10) AS UNSIGNED) AS key_hash
+    FROM stock_posts
+    WHERE stock_code = :stock_code
+    AND id > :last_id
+"""
+
+_KEY_HASH_QUERIES = {
+    2: text(_KEY_HASH_SQL.format(title='')),
+    3: text(_KEY_HASH_SQL.format(title=", COALESCE(TRIM(title), '')")),
+}
+
+_NID_QUERY = text("""
+    SELECT nid
+    FROM stock_posts
+    WHERE stock_code = :stock_code
+    AND nid IS NOT NULL
+    ORDER BY nid
+""")
+
+_VERIFY_QUERIES = {
+    2: text("""
+        SELECT 1 FROM stock_posts
+        WHERE stock_code = :stock_code AND date <=> :date AND TRIM(author) = :author
+        LIMIT 1
+    """),
+    3: text("""
+        SELECT 1 FROM stock_posts
+        WHERE stock_code = :stock_code AND date <=> :date AND TRIM(author) = :author AND TRIM(title) = :title
+        LIMIT 1
+    """),
+}
+
+
+def hash_post_key(key):
+    """create_post_key()가 만든 키 튜플의 64비트 해시 (DB의 CONV(LEFT(SHA1(...), 16), 16, 10)과 같은 값)"""
+    digest = hashlib.sha1(KEY_SEPARATOR.join(key).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class PostKeyIndex:
+    """게시글 키 해시의 정렬된 배열 - set처럼 `key in index`로 저장 여부 확인"""
+
+    def __init__(self, stock_code, hashes, include_title=False, last_id=0, verify=True):
+        self.stock_code = stock_code
+        self.hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        self.include_title = include_title
+        self.last_id = last_id
+        self.verify = verify
+
+    @property
+    def key_length(self):
+        """키 튜플의 길이 (제목 포함 여부)"""
+        return 3 if self.include_title else 2
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __bool__(self):
+        return len(self.hashes) > 0
+
+    def _has_hash(self, key):
+        value = np.uint64(hash_post_key(key))
+        i = np.searchsorted(self.hashes, value)
+        return i < len(self.hashes) and self.hashes[i] == value
+
+    def __contains__(self, key):
+        if not self._has_hash(key):
+            return False
+        if not self.verify:
+            return True
+        return self._exists_in_db(key)
+
+    def _exists_in_db(self, key):
+        """해시가 일치한 키를 DB에서 확인 (해시 충돌이나 삭제된 게시글로 인한 잘못된 중단 방지)"""
+        engine = get_db_connection()
+        if engine is None:
+            return True
+        params = {
+            'stock_code': self.stock_code,
+            'date': None if key[0] == 'Unknown' else key[0],
+            'author': key[1]
+        }
+        if self.include_title:
+            params['title'] = key[2]
+        try:
+            with engine.connect() as conn:
+                found = conn.execute(_VERIFY_QUERIES[self.key_length], params).fetchone() is not None
+        except Exception as e:
+            logger.warning(f"중복 키 DB 확인 실패, 인덱스 결과 사용: {e}")
+            return True
+        if not found:
+            logger.info(f"인덱스에만 있는 키 (DB에 없음): {key}")
+        return found
+
+
+class NidIndex:
+    """저장된 글 번호(nid)의 정렬된 배열 - `nid in index`로 저장 여부 확인"""
+
+    key_type = 'nid'
+
+    def __init__(self, stock_code, nids):
+        self.stock_code = stock_code
+        self.nids = np.unique(np.asarray(nids, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.nids)
+
+    def __bool__(self):
+        return len(self.nids) > 0
+
+    def __contains__(self, nid):
+        if nid is None:
+            return False
+        i = np.searchsorted(self.nids, nid)
+        return i < len(self.nids) and self.nids[i] == nid
+
+
+def build_nid_index(stock_code):
+    """종목의 저장된 글 번호 인덱스 생성 (UNIQUE (stock_code, nid) 인덱스 순서로 읽음)"""
+    started = time.perf_counter()
+    engine = get_db_connection()
+    if engine is None:
+        return NidIndex(stock_code, [])
+
+    chunks = []
+    try:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(_NID_QUERY, {'stock_code': stock_code})
+            while True:
+                rows = result.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                chunks.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+    except Exception as e:
+        logger.error(f"글 번호 인덱스 조회 실패: {e}")
+
+    index = NidIndex(stock_code, np.concatenate(chunks) if chunks else [])
+    logger.info(f"[{stock_code}] 글 번호 인덱스 {len(index)}개 ({index.nids.nbytes / 1024 / 1024:.1f}MB, "
+                f"{time.perf_counter() - started:.2f}초)")
+    return index
+
+
+def _cache_path(cache_dir, stock_code, key_length):
+    return os.path.join(cache_dir, f"post_keys_{stock_code}_{key_length}.npz")
+
+
+def _load_cache(path):
+    try:
+        with np.load(path) as data:
+            if int(data['version']) != CACHE_VERSION:
+                return None, 0
+            return data['hashes'], int(data['last_id'])
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"중복 검사 캐시 읽기 실패, 새로 생성: {e}")
+        return None, 0
+
+
+def _save_cache(path, index):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, hashes=index.hashes, last_id=np.int64(index.last_id), version=np.int64(CACHE_VERSION))
+    os.replace(tmp_path, path)
+
+
+def build_post_key_index(stock_code, include_title=False, cache_dir=None, verify=True):
+    """종목의 게시글 키 인덱스 생성
+
+    cache_dir(기본값 CRAWLING_CONFIG['dedup_cache_dir'])가 지정되면 이전 실행에서 저장한 해시 배열을 읽고,
+    그 뒤에 추가된 행(stock_posts.id 기준)만 DB에서 가져와 합친 뒤 다시 저장합니다.
+    """
+    cache_dir = CRAWLING_CONFIG['dedup_cache_dir'] if cache_dir is None else cache_dir
+    key_length = 3 if include_title else 2
+    path = _cache_path(cache_dir, stock_code, key_length) if cache_dir else None
+
+    started = time.perf_counter()
+    cached, last_id = _load_cache(path) if path and os.path.exists(path) else (None, 0)
+    chunks = [cached] if cached is not None else []
+    cached_count = len(cached) if cached is not None else 0
+    fetched = 0
+
+    engine = get_db_connection()
+    if engine is None:
+        return PostKeyIndex(stock_code, cached if cached is not None else [], include_title, last_id, verify)
+
+    complete = False
+    try:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(
+                _KEY_HASH_QUERIES[key_length], {'stock_code': stock_code, 'last_id': last_id}
+            )
+            while True:
+                rows = result.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                ids, hashes = zip(*rows)
+                chunks.append(np.fromiter(hashes, dtype=np.uint64, count=len(hashes)))
+                fetched += len(rows)
+                last_id = max(last_id, max(ids))
+        complete = True
+    except Exception as e:
+        logger.error(f"중복 검사 인덱스 조회 실패: {e}")
+
+    hashes = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.uint64)
+    index = PostKeyIndex(stock_code, hashes, include_title, last_id, verify)
+    logger.info(
+        f"[{stock_code}] 중복 검사 인덱스 {len(index)}개 키 ({index.hashes.nbytes / 1024 / 1024:.1f}MB, "
+        f"캐시 {cached_count}개 + DB {fetched}행, {time.perf_counter() - started:.2f}초)"
+    )
+
+    # 일부만 읽은 경우 last_id 이하에 읽지 못한 행이 있을 수 있으므로 캐시를 저장하지 않음
+    if path and complete:
+        try:
+            _save_cache(path, index)
+        except OSError as e:
+            logger.warning(f"중복 검사 캐시 저장 실패: {e}")
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+    from config import setup_logging
+
+    setup_logging()
+
+    # 사용법: python dedup_index.py [stock_code]  - 인덱스 생성 시간/크기 확인
+    stock_code = sys.argv[1] if len(sys.argv) > 1 else '139480'
+    index = build_post_key_index(stock_code)
+    print(f"키 해시 {len(index)}개, {index.hashes.nbytes / 1024:.1f}KB")
+    index = build_nid_index(stock_code)
+    print(f"글 번호 {len(index)}개, {index.nids.nbytes / 1024:.1f}KB")
@@ -72,8 +72,6 @@ def fix_duplicate_analysis():
     except Exception as e:
         logger.error(f"중복 레코드 정리 실패: {e}")
         return False
-    finally:
-        engine.dispose()
 
 def validate_analysis_integrity():
     """분석 결과 데이터 정합성 검증"""
@@ -154,8 +152,6 @@ def validate_analysis_integrity():
     except Exception as e:
         logger.error(f"데이터 정합성 검증 실패: {e}")
         return False
-    finally:
-        engine.dispose()
 
 if __name__ == "__main__":
     # 중복 레코드 정리
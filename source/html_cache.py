@@ -0,0 +1,234 @@
+"""
+HTML 응답 캐시 - 크롤링한 목록/게시글 페이지의 원본 HTML을 압축해 디스크에 보관
+
+게시글 본문은 한 번 작성되면 바뀌지 않으므로, 추출기를 고치거나 디버깅할 때마다 네이버에서 다시 받을 필요가 없습니다.
+- 키: 게시글 페이지는 (종목코드, 글 번호), 목록 페이지는 (종목코드, 페이지) - URL의 다른 쿼리 파라미터와 무관
+- 파일: 키의 SHA1 해시 경로(cache_dir/ab/abcdef....html.z), zstandard가 설치되어 있으면 zstd, 없으면 zlib 압축
+- 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 파일부터 삭제 (LRU, 파일 수정 시각을 사용 시각으로 갱신)
+- 목록 페이지는 새 글이 계속 올라오므로 list_ttl초가 지나면 캐시를 쓰지 않음
+
+HTML_CACHE_DIR이 설정된 경우에만 사용합니다 (get_html_cache()가 None이면 캐시 없음).
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+from config import HTML_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# zstandard 선택적 import (없으면 zlib)
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# 파일 헤더: 매직, 압축 방식(b'z' zstd / b'd' zlib), 저장 시각(epoch 초)
+_HEADER = struct.Struct('>4scd')
+_MAGIC = b'HTC1'
+_SUFFIX = '.html.z'
+
+# 손상되었거나 읽을 수 없는 캐시 파일 (캐시에 없는 것으로 처리)
+_READ_ERRORS = (OSError, ValueError, struct.error, zlib.error) + ((zstandard.ZstdError,) if HAS_ZSTD else ())
+
+
+def cache_key(url):
+    """URL의 캐시 키 - 게시글은 'post:종목:글번호', 목록은 'list:종목:페이지', 그 밖에는 URL 그대로"""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    code = query.get('code', [''])[0]
+    if parsed.path.endswith('board_read.naver') and query.get('nid'):
+        return post_key(code, query['nid'][0])
+    if parsed.path.endswith('board.naver') and code:
+        return f"list:{code}:{query.get('page', ['1'])[0]}"
+    return url
+
+
+def post_key(stock_code, nid):
+    """게시글 페이지의 캐시 키"""
+    return f"post:{stock_code}:{nid}"
+
+
+def _compress(data):
+    if HAS_ZSTD:
+        return b'z', zstandard.ZstdCompressor(level=HTML_CACHE_CONFIG['zstd_level']).compress(data)
+    return b'd', zlib.compress(data, 6)
+
+
+def _decompress(codec, data):
+    if codec == b'z':
+        if not HAS_ZSTD:
+            raise ValueError("zstd로 압축된 캐시지만 zstandard가 설치되어 있지 않음")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class HtmlCache:
+    """크기 제한이 있는 LRU 디스크 캐시 (스레드 안전)"""
+
+    def __init__(self, cache_dir, max_bytes, list_ttl):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.list_ttl = list_ttl
+        self._lock = threading.Lock()
+        self._entries = None  # 경로 -> 파일 크기 (오래 사용하지 않은 순서)
+        self._total = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0, 'evictions': 0, 'bytes_written': 0}
+
+    def path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + _SUFFIX)
+
+    def _load_entries(self):
+        """처음 사용할 때 캐시 디렉토리를 읽어 사용 시각 순서의 목록 생성 (lock 안에서 호출)"""
+        if self._entries is not None:
+            return
+        found = []
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith(_SUFFIX):
+                        path = os.path.join(root, name)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        found.append((st.st_mtime, path, st.st_size))
+        found.sort()
+        self._entries = OrderedDict((path, size) for _, path, size in found)
+        self._total = sum(size for _, _, size in found)
+        logger.debug(f"HTML 캐시 {len(self._entries)}개 파일, {self._total / 1024 / 1024:.1f}MB")
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, url, key=None):
+        """캐시된 HTML(str) 반환 - 없거나 목록 페이지 TTL이 지났으면 None"""
+        key = key or cache_key(url)
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, codec, stored_at = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError("캐시 파일 형식이 아님")
+            if key.startswith('list:') and time.time() - stored_at > self.list_ttl:
+                self._count('expired')
+                return None
+            html = _decompress(codec, data[_HEADER.size:]).decode('utf-8')
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        except _READ_ERRORS as e:
+            logger.warning(f"HTML 캐시 읽기 실패 ({key}): {e}")
+            self._count('misses')
+            return None
+
+        # 사용 시각 갱신 (다른 프로세스와 재시작 후에도 LRU 순서 유지)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.stats['hits'] += 1
+            if self._entries is not None and path in self._entries:
+                self._entries.move_to_end(path)
+        return html
+
+    def put(self, url, html, key=None):
+        """HTML 저장 후 크기 제한을 넘으면 오래된 파일 삭제"""
+        key = key or cache_key(url)
+        path = self.path(key)
+        codec, compressed = _compress(html.encode('utf-8'))
+        data = _HEADER.pack(_MAGIC, codec, time.time()) + compressed
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"HTML 캐시 저장 실패 ({key}): {e}")
+            return
+
+        with self._lock:
+            self._load_entries()
+            self._total += len(data) - self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self.stats['writes'] += 1
+            self.stats['bytes_written'] += len(data)
+            evicted = []
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_path, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old_path)
+            self.stats['evictions'] += len(evicted)
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def size(self):
+        """(파일 수, 전체 크기)"""
+        with self._lock:
+            self._load_entries()
+            return len(self._entries), self._total
+
+
+# 프로세스 전역 캐시 (get_html_cache()에서 최초 호출 시 생성)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_html_cache():
+    """설정된 HTML 캐시 반환 (HTML_CACHE_DIR이 비어 있으면 None)"""
+    global _cache
+    if _cache is not None or not HTML_CACHE_CONFIG['dir']:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HtmlCache(HTML_CACHE_CONFIG['dir'], HTML_CACHE_CONFIG['max_mb'] * 1024 * 1024,
+                               HTML_CACHE_CONFIG['list_ttl'])
+            logger.debug(f"HTML 캐시 사용: {HTML_CACHE_CONFIG['dir']} (최대 {HTML_CACHE_CONFIG['max_mb']}MB, "
+                         f"{'zstd' if HAS_ZSTD else 'zlib'})")
+        return _cache
+
+
+def get_cache_stats():
+    """HTML 캐시 적중/저장/삭제 통계 (캐시를 사용하지 않으면 빈 dict)"""
+    cache = _cache
+    if cache is None:
+        return {}
+    with cache._lock:
+        stats = dict(cache.stats)
+    lookups = stats['hits'] + stats['misses'] + stats['expired']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+    from config import setup_logging
+
+    setup_logging()
+
+    # 사용법: python html_cache.py [종목코드 글번호]  - 캐시 크기 확인, 글 번호를 주면 캐시된 HTML 출력
+    cache = get_html_cache()
+    if cache is None:
+        print("HTML_CACHE_DIR이 설정되어 있지 않습니다")
+        sys.exit(1)
+    if len(sys.argv) > 2:
+        html = cache.get(None, key=post_key(sys.argv[1], sys.argv[2]))
+        print(html if html is not None else "캐시에 없음")
+    else:
+        files, total = cache.size()
+        print(f"{cache.cache_dir}: {files}개 파일, {total / 1024 / 1024:.1f}MB ({'zstd' if HAS_ZSTD else 'zlib'})")
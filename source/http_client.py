@@ -0,0 +1,209 @@
+"""
+HTTP 클라이언트 - 크롤러의 모든 요청이 공유하는 requests.Session (keep-alive 커넥션 풀)
+
+요청마다 requests.get()을 호출하면 매번 새 TCP/TLS 연결을 맺기 때문에, 프로세스 전역 Session 하나를
+모든 작업 스레드가 공유해 호스트별 연결을 재사용합니다.
+- 연결/읽기 타임아웃을 명시하고, 연결 실패와 429/5xx 응답은 지터가 있는 지수 백오프로 재시도 (Retry-After 헤더 우선)
+- gzip/deflate 압축 응답 요청 (brotli 패키지가 설치되어 있으면 br도 요청)
+- conditional=True 요청은 ETag/Last-Modified를 기억해 두고 다음 요청에서 304 Not Modified면 이전 본문을 재사용
+- 요청별 지연 시간과 재시도/연결 재사용 통계 수집 (get_http_stats())
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import CRAWLING_CONFIG, HTTP_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 응답 코드
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 백분위 계산에 쓰는 최근 요청 지연 시간 개수
+LATENCY_WINDOW = 1000
+
+DEFAULT_HEADERS = {
+    'User-Agent': CRAWLING_CONFIG['user_agent'],
+    'Referer': 'https://finance.naver.com/',
+    # urllib3가 해제할 수 있는 압축 방식 (brotli/zstandard가 설치되어 있으면 br/zstd 포함)
+    'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING
+}
+
+# 프로세스 전역 세션 (get_http_session()에서 최초 호출 시 생성)
+_session = None
+_session_lock = threading.Lock()
+
+# conditional 요청용 URL별 (ETag, Last-Modified, 본문) - 최근 사용 순서
+_validators = OrderedDict()
+_validators_lock = threading.Lock()
+
+# 요청 통계
+_http_stats_lock = threading.Lock()
+_http_stats = {
+    'requests': 0,          # 응답을 받은 요청 수 (재시도는 한 번으로 계산)
+    'errors': 0,            # 연결 실패, 타임아웃, 4xx/5xx
+    'retries': 0,           # urllib3가 재시도한 횟수
+    'not_modified': 0,      # 304 응답으로 이전 본문을 재사용한 횟수
+    'bytes': 0,             # 압축 해제 후 본문 크기
+    'latency': 0.0,         # 요청 시작부터 본문 수신까지 누적 시간(초)
+    'max_latency': 0.0
+}
+_recent_latencies = deque(maxlen=LATENCY_WINDOW)
+
+
+def _make_retry():
+    options = dict(
+        total=HTTP_CONFIG['retries'],
+        backoff_factor=HTTP_CONFIG['backoff_factor'],
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False  # 재시도를 모두 쓰면 마지막 응답을 돌려주고 raise_for_status()에서 처리
+    )
+    try:
+        return Retry(backoff_jitter=HTTP_CONFIG['backoff_jitter'], **options)
+    except TypeError:
+        # urllib3 1.x에는 backoff_jitter가 없음
+        return Retry(**options)
+
+
+def get_http_session():
+    """공유 Session 반환 (프로세스 내 모든 스레드가 커넥션 풀과 함께 공유)"""
+    global _session
+    if _session is not None:
+        return _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_CONFIG['pool_connections'],
+                pool_maxsize=HTTP_CONFIG['pool_maxsize'],
+                max_retries=_make_retry()
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+            logger.debug(f"HTTP 세션 생성 (pool_maxsize={HTTP_CONFIG['pool_maxsize']}, 재시도 {HTTP_CONFIG['retries']}회)")
+        return _session
+
+
+def close_http_session():
+    """공유 세션과 풀의 연결을 모두 정리 (프로세스 종료 또는 fork 후 호출)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+    with _validators_lock:
+        _validators.clear()
+
+
+def _record(url, started, response=None, error=None, not_modified=False):
+    elapsed = time.perf_counter() - started
+    retries = 0
+    if response is not None and response.raw is not None and getattr(response.raw, 'retries', None) is not None:
+        retries = len(response.raw.retries.history)
+    with _http_stats_lock:
+        _http_stats['requests'] += 1
+        _http_stats['latency'] += elapsed
+        _http_stats['max_latency'] = max(_http_stats['max_latency'], elapsed)
+        _http_stats['retries'] += retries
+        if error is not None:
+            _http_stats['errors'] += 1
+        elif not_modified:
+            _http_stats['not_modified'] += 1
+        else:
+            _http_stats['bytes'] += len(response.content)
+        _recent_latencies.append(elapsed)
+
+    status = response.status_code if response is not None else type(error).__name__
+    logger.debug(f"GET {url} {status} {elapsed * 1000:.0f}ms" + (f" (재시도 {retries}회)" if retries else ""))
+
+
+def fetch(url, conditional=False):
+    """URL의 본문(str)을 가져옴 - 실패하면 requests 예외 발생 (4xx/5xx는 HTTPError)
+
+    conditional=True이면 이전 응답의 ETag/Last-Modified로 조건부 요청을 보내고 304이면 이전 본문을 반환합니다.
+    """
+    session = get_http_session()
+    request_headers = {}
+    cached = None
+    if conditional:
+        with _validators_lock:
+            cached = _validators.get(url)
+            if cached:
+                _validators.move_to_end(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+    started = time.perf_counter()
+    try:
+        response = session.get(url, headers=request_headers,
+                               timeout=(HTTP_CONFIG['connect_timeout'], HTTP_CONFIG['read_timeout']))
+        if response.status_code == 304 and cached:
+            _record(url, started, response, not_modified=True)
+            return cached[2]
+        response.raise_for_status()
+    except requests.RequestException as e:
+        _record(url, started, getattr(e, 'response', None), error=e)
+        raise
+
+    text = response.text
+    _record(url, started, response)
+
+    if conditional:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with _validators_lock:
+                _validators[url] = (etag, last_modified, text)
+                _validators.move_to_end(url)
+                while len(_validators) > HTTP_CONFIG['conditional_cache_size']:
+                    _validators.popitem(last=False)
+    return text
+
+
+def _pool_counts():
+    """호스트별 커넥션 풀의 (새로 맺은 연결 수, 요청 수) 합계"""
+    session = _session
+    if session is None:
+        return 0, 0
+    connections = requests_sent = 0
+    for adapter in set(session.adapters.values()):  # http/https에 같은 어댑터를 등록했으므로 한 번만
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+    return connections, requests_sent
+
+
+def get_http_stats():
+    """요청 수, 지연 시간(평균/p50/p95/최대), 재시도, 연결 재사용 통계 반환"""
+    with _http_stats_lock:
+        stats = dict(_http_stats)
+        latencies = sorted(_recent_latencies)
+
+    stats['avg_ms'] = stats['latency'] / stats['requests'] * 1000 if stats['requests'] else 0.0
+    stats['max_ms'] = stats.pop('max_latency') * 1000
+    del stats['latency']
+    if latencies:
+        stats['p50_ms'] = latencies[len(latencies) // 2] * 1000
+        stats['p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+
+    # 풀 통계는 현재 풀에 남아 있는 호스트 기준 (풀이 정리되면 초기화)
+    connections, requests_sent = _pool_counts()
+    stats['connections'] = connections
+    stats['reuse_ratio'] = 1 - connections / requests_sent if requests_sent else 0.0
+    return stats
@@ -0,0 +1,251 @@
+"""
+키워드 매처 - 감정 분석 사전의 모든 키워드를 한 번에 찾습니다.
+
+사전의 키워드 목록마다 `keyword in content`를 반복하는 대신, 사전을 한 번만 컴파일해 두고
+본문을 한 번 훑으면서 모든 카테고리의 키워드 출현 위치를 수집합니다.
+pyahocorasick이 설치되어 있으면 Aho-Corasick 오토마톤(C 확장)을 사용하고,
+없으면 중복을 제거한 고유 키워드만 검사합니다.
+
+키워드 사전과 임계값은 버전이 붙은 외부 파일(sentiment_lexicon.json)에서 읽으며,
+get_lexicon()은 파일이 바뀐 경우에만 매처를 다시 만듭니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+from config import ANALYSIS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# pyahocorasick 선택적 import
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+# 추출 키워드로 보고하는 카테고리 기본값 (순서대로 이어 붙임)
+KEYWORD_CATEGORIES = ('positive', 'negative')
+
+
+class KeywordMatcher:
+    """카테고리별 키워드 목록으로 만든 다중 패턴 매처"""
+
+    def __init__(self, lexicon, keyword_categories=KEYWORD_CATEGORIES):
+        self.lexicon = {category: list(words) for category, words in lexicon.items()}
+        self.keyword_categories = tuple(keyword_categories)
+        self.patterns = sorted({word for words in self.lexicon.values() for word in words if word})
+
+        # 패턴별 카테고리 가중치 (목록에 같은 단어가 두 번 있으면 2)
+        self._weights = {pattern: {} for pattern in self.patterns}
+        for category, words in self.lexicon.items():
+            for word in words:
+                if word:
+                    self._weights[word][category] = self._weights[word].get(category, 0) + 1
+
+        # 추출 키워드 목록에서 각 패턴이 차지하는 자리 (카테고리 순서대로 이어 붙인 목록 기준)
+        self._keyword_slots = {}
+        keyword_order = [word for category in self.keyword_categories for word in self.lexicon.get(category, [])]
+        for slot, word in enumerate(keyword_order):
+            if word:
+                self._keyword_slots.setdefault(word, []).append(slot)
+
+        # 배치 분석용: 패턴 인덱스와 (패턴 x 카테고리) 가중치 행렬
+        self.categories = list(self.lexicon)
+        self.pattern_index = {pattern: i for i, pattern in enumerate(self.patterns)}
+        self.weight_matrix = np.zeros((len(self.patterns), len(self.categories)), dtype=np.int32)
+        for pattern, weights in self._weights.items():
+            for category, weight in weights.items():
+                self.weight_matrix[self.pattern_index[pattern], self.categories.index(category)] = weight
+
+        self._automaton = None
+        if HAS_AHOCORASICK and self.patterns:
+            automaton = ahocorasick.Automaton()
+            for pattern in self.patterns:
+                automaton.add_word(pattern, pattern)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find_all(self, text):
+        """본문을 한 번 훑어 (시작 위치, 키워드) 목록 반환 (겹치는 매치 포함)"""
+        if not text:
+            return []
+
+        if self._automaton is not None:
+            return [(end - len(pattern) + 1, pattern) for end, pattern in self._automaton.iter(text)]
+
+        matches = []
+        for pattern in self.patterns:
+            start = text.find(pattern)
+            while start != -1:
+                matches.append((start, pattern))
+                start = text.find(pattern, start + 1)
+        matches.sort()
+        return matches
+
+    def matched_patterns(self, text):
+        """본문에 한 번 이상 등장한 키워드 집합"""
+        if not text:
+            return set()
+        if self._automaton is not None:
+            return {pattern for _, pattern in self._automaton.iter(text)}
+        return {pattern for pattern in self.patterns if pattern in text}
+
+    def hit_matrix(self, texts):
+        """(게시글 수 x 패턴 수) 불리언 행렬 - 각 게시글에 각 키워드가 등장했는지 여부"""
+        texts = ['' if text is None or text != text else str(text) for text in texts]
+        pattern_index = self.pattern_index
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for pattern in self.matched_patterns(text):
+                rows.append(row)
+                cols.append(pattern_index[pattern])
+
+        hits = np.zeros((len(texts), len(self.patterns)), dtype=bool)
+        hits[rows, cols] = True
+        return hits
+
+    def keywords(self, matched):
+        """등장한 키워드 집합을 추출 키워드 목록(사전 순서, 중복 항목 포함)으로 변환"""
+        slots = self._keyword_slots
+        return [word for _, word in sorted(
+            (slot, pattern) for pattern in matched if pattern in slots for slot in slots[pattern]
+        )]
+
+    def scan(self, text, with_positions=True):
+        """카테고리별 키워드 수, 키워드별 출현 위치, 추출 키워드 목록 반환
+
+        counts는 기존 `sum(1 for word in words if word in content)`와 같은 의미로,
+        본문에 한 번이라도 등장한 목록 항목의 수입니다.
+        """
+        positions = {}
+        if with_positions:
+            for start, pattern in self.find_all(text):
+                positions.setdefault(pattern, []).append(start)
+            matched = positions.keys()
+        else:
+            matched = self.matched_patterns(text)
+
+        counts = dict.fromkeys(self.lexicon, 0)
+        for pattern in matched:
+            for category, weight in self._weights[pattern].items():
+                counts[category] += weight
+
+        keywords = self.keywords(matched)
+
+        return {
+            'counts': counts,
+            'positions': positions,
+            'keywords': keywords
+        }
+
+
+class SentimentLexicon:
+    """버전이 붙은 감정 사전 - 키워드 목록, 임계값, 컴파일된 매처"""
+
+    def __init__(self, data, digest):
+        self.version = str(data.get('version', '0'))
+        self.model = data.get('model', 'keyword_based')
+        self.categories = data['categories']
+        self.thresholds = data['thresholds']
+        self.max_keywords = int(data.get('max_keywords', 10))
+        self.digest = digest
+        # post_analysis.analysis_version (VARCHAR(20))에 저장되는 값: 버전 + 사전 내용 해시
+        self.analysis_version = f"{self.version}-{digest[:8]}"[:20]
+        self.matcher = KeywordMatcher(self.categories, data.get('keyword_categories', KEYWORD_CATEGORIES))
+
+
+def load_lexicon(path):
+    """사전 파일을 읽어 SentimentLexicon 생성 (해시는 공백/키 순서와 무관한 내용 기준)"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    return SentimentLexicon(data, digest)
+
+
+_lexicon_lock = threading.Lock()
+_lexicon_cache = {}  # path -> {'lexicon', 'mtime', 'checked_at'}
+
+
+def get_lexicon(path=None):
+    """현재 감정 사전 반환 (파일이 바뀌었으면 다시 읽고, 내용이 바뀌었을 때만 매처를 새로 생성)
+
+    파일 변경 여부는 ANALYSIS_CONFIG['lexicon_reload_interval']초마다 한 번 확인합니다.
+    """
+    path = path or ANALYSIS_CONFIG['lexicon_path']
+    now = time.monotonic()
+    entry = _lexicon_cache.get(path)
+    if entry and now - entry['checked_at'] < ANALYSIS_CONFIG['lexicon_reload_interval']:
+        return entry['lexicon']
+
+    with _lexicon_lock:
+        entry = _lexicon_cache.get(path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError as e:
+            if entry:
+                logger.warning(f"감정 사전 파일 확인 실패, 기존 사전 유지: {e}")
+                entry['checked_at'] = now
+                return entry['lexicon']
+            raise
+
+        if entry and entry['mtime'] == mtime:
+            entry['checked_at'] = now
+            return entry['lexicon']
+
+        try:
+            lexicon = load_lexicon(path)
+        except (OSError, ValueError, KeyError) as e:
+            if entry:
+                logger.error(f"감정 사전 다시 읽기 실패, 기존 사전 유지: {e}")
+                entry.update(mtime=mtime, checked_at=now)
+                return entry['lexicon']
+            raise
+
+        if entry and entry['lexicon'].digest == lexicon.digest:
+            # 파일만 다시 저장되고 내용은 같으면 기존 매처 유지
+            lexicon = entry['lexicon']
+        else:
+            logger.info(f"감정 사전 로드: {path} (analysis_version={lexicon.analysis_version})")
+
+        _lexicon_cache[path] = {'lexicon': lexicon, 'mtime': mtime, 'checked_at': now}
+        return lexicon
+
+
+if __name__ == "__main__":
+    # 기존 부분 문자열 검사 방식과 결과가 같은지 확인 (테스트용 코드)
+    import random
+
+    lexicon = get_lexicon()
+    matcher = lexicon.matcher
+    print(f"사전 버전: {lexicon.analysis_version}")
+
+    vocabulary = matcher.patterns + ['주식', '오늘', '내일', '폭', '상', '하', ' ', '\n', '!!']
+    random.seed(0)
+
+    mismatches = 0
+    for _ in range(5000):
+        text = ''.join(random.choice(vocabulary) for _ in range(random.randint(0, 40)))
+        result = matcher.scan(text, with_positions=False)
+
+        for category, words in lexicon.categories.items():
+            expected = sum(1 for word in words if word in text)
+            if result['counts'][category] != expected:
+                mismatches += 1
+
+        expected_keywords = [word for category in KEYWORD_CATEGORIES for word in lexicon.categories[category] if word in text]
+        if result['keywords'] != expected_keywords:
+            mismatches += 1
+
+        result = matcher.scan(text, with_positions=True)
+        for pattern, starts in result['positions'].items():
+            expected_starts = [i for i in range(len(text)) if text.startswith(pattern, i)]
+            if starts != expected_starts:
+                mismatches += 1
+
+    backend = 'Aho-Corasick' if matcher._automaton is not None else '고유 키워드 검사'
+    print(f"패턴 {len(matcher.patterns)}개 ({backend}), 불일치 {mismatches}건")
@@ -11,9 +11,12 @@ import re
 import json
 from collections import Counter
 import numpy as np
-from database import test_database_connection, view_database_contents, get_existing_posts, save_posts_to_db,get_posts_count_from_db, get_db_connection, process_engine
-from crawler import crawl_stock_discussion
+from database import test_database_connection, view_database_contents, get_high_water_mark, save_high_water_mark, save_posts_to_db,get_posts_count_from_db, get_db_connection, process_engine, get_pool_stats
+from crawler import crawl_new_posts
+from html_cache import get_cache_stats
+from http_client import get_http_stats
 from sentiment_analyzer import analyze_posts_content
+from summary_rollup import refresh_daily_summary, refresh_hourly_cube
 
 # 로깅 설정 (디버깅 모드)
 logging.basicConfig(level=logging.DEBUG, 
@@ -37,8 +40,9 @@ if __name__ == "__main__":
     
     # 1단계: 게시글 목록 수집
     logger.info("=== 게시글 목록 수집 시작 ===")
-    existing_set = get_existing_posts(stock_code)
-    recent_posts = crawl_stock_discussion(stock_code, start_page=1, end_page=10, existing_set=existing_set)
+    # 마지막으로 저장한 게시글(nid)에 도달할 때까지 수집 (10페이지 안에 도달하지 못하면 페이지를 늘려 계속 수집)
+    mark = get_high_water_mark(stock_code)
+    recent_posts, new_mark = crawl_new_posts(stock_code, mark, start_page=1, end_page=10)
     keep_continue = True
     
     if not recent_posts.empty:
@@ -48,7 +52,7 @@ if __name__ == "__main__":
         for idx, row in recent_posts.head(3).iterrows():
             print(f"  - [{row['날짜']}] {row['제목'][:40]}... (작성자: {row['작성자']})")
         
-        saved_count = save_posts_to_db(recent_posts, stock_code)
+        saved_count = save_posts_to_db(recent_posts, stock_code, raise_on_error=True)
         total_count = get_posts_count_from_db(stock_code)
         logger.info(f"새로 수집된 게시글: {saved_count}개")
         logger.info(f"총 저장된 게시글: {total_count}개")
@@ -60,14 +64,24 @@ if __name__ == "__main__":
         logger.info("새로운 게시글이 없습니다.")
         # keep_continue = False
     
+    # 게시글을 저장한 뒤에 기준점 갱신
+    save_high_water_mark(stock_code, new_mark)
+    
     if keep_continue:
         # 2단계: 게시글 본문 크롤링 및 분석
         logger.info("=== 게시글 분석 시작 ===")
         analyzed_count = analyze_posts_content(stock_code)
         logger.info(f"분석 완료된 게시글: {analyzed_count}개")
         
+        # 새로 분석된 게시글이 속한 날짜만 일별 요약/시간대별 집계에 반영
+        refresh_daily_summary(stock_code)
+        refresh_hourly_cube(stock_code)
+        
         # 3단계: 분석 결과 요약 출력
         logger.info("=== 분석 결과 요약 ===")
         engine = get_db_connection()
         process_engine(engine, stock_code)
+    
+    logger.info(f"DB 커넥션 풀 통계: {get_pool_stats()}")
+    logger.info(f"HTTP 요청 통계: {get_http_stats()}, HTML 캐시 통계: {get_cache_stats()}")
         
\ No newline at end of file
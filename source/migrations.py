@@ -0,0 +1,283 @@
+"""
+스키마 마이그레이션 - init.sql 이후에 추가된 컬럼/테이블/인덱스를 기존 DB에 적용하는 스크립트
+
+init.sql은 컨테이너를 처음 만들 때만 실행되므로, 이미 운영 중인 DB에는 이 스크립트로 변경 사항을 반영합니다.
+각 마이그레이션은 schema_migrations 테이블에 기록되어 한 번만 실행되며,
+문장 자체도 IF NOT EXISTS를 사용하므로 init.sql로 새로 만든 DB에서 실행해도 안전합니다.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from database import get_db_connection
+from query_builder import QueryFilter, statement
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# (이름, SQL 문 목록) - 순서대로 적용
+MIGRATIONS = [
+    ('001_daily_summary_rollup_columns', [
+        """
+        ALTER TABLE daily_stock_summary
+            ADD COLUMN IF NOT EXISTS scored_posts INT DEFAULT 0 AFTER total_posts,
+            ADD COLUMN IF NOT EXISTS sentiment_sum DOUBLE DEFAULT 0 AFTER avg_sentiment_score,
+            ADD COLUMN IF NOT EXISTS sentiment_sumsq DOUBLE DEFAULT 0 AFTER sentiment_sum,
+            ADD COLUMN IF NOT EXISTS avg_confidence_score DECIMAL(5,4) AFTER sentiment_sumsq,
+            ADD COLUMN IF NOT EXISTS bullish_posts INT DEFAULT 0 AFTER avg_confidence_score,
+            ADD COLUMN IF NOT EXISTS bearish_posts INT DEFAULT 0 AFTER bullish_posts
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS rollup_state (
+            name VARCHAR(50) PRIMARY KEY,
+            watermark DATETIME NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_updated_at ON post_analysis (updated_at)"
+    ]),
+    ('002_hourly_sentiment_cube', [
+        """
+        CREATE TABLE IF NOT EXISTS hourly_sentiment_cube (
+            stock_code VARCHAR(20) NOT NULL,
+            date DATE NOT NULL,
+            hour TINYINT NOT NULL,
+            total_posts INT DEFAULT 0,
+            scored_posts INT DEFAULT 0,
+            sentiment_sum DOUBLE DEFAULT 0,
+            sentiment_sumsq DOUBLE DEFAULT 0,
+            bullish_posts INT DEFAULT 0,
+            bearish_posts INT DEFAULT 0,
+            neutral_outlook_posts INT DEFAULT 0,
+            positive_posts INT DEFAULT 0,
+            negative_posts INT DEFAULT 0,
+            neutral_posts INT DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (stock_code, date, hour),
+            INDEX idx_date (date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    ]),
+    ('003_report_range_indexes', [
+        # 종목 + 기간 조건을 한 인덱스로 처리 (단일 컬럼 idx_stock_code는 이 인덱스의 접두사라 제거)
+        "CREATE INDEX IF NOT EXISTS idx_stock_code_date ON stock_posts (stock_code, date)",
+        "DROP INDEX IF EXISTS idx_stock_code ON stock_posts",
+        # 집계에 쓰는 컬럼까지 포함해 인덱스만으로 조인/집계 (외래 키는 이 인덱스를 사용하므로 idx_post_id 제거)
+        """
+        CREATE INDEX IF NOT EXISTS idx_post_sentiment
+            ON post_analysis (post_id, sentiment_score, sentiment_label, bullish_bearish)
+        """,
+        "DROP INDEX IF EXISTS idx_post_id ON post_analysis"
+    ]),
+    ('004_crawl_state', [
+        """
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            stock_code VARCHAR(20) PRIMARY KEY,
+            last_crawled_at DATETIME,
+            next_crawl_at DATETIME,
+            velocity DOUBLE DEFAULT 0,
+            last_new_posts INT DEFAULT 0,
+            last_latency_ms INT DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_next_crawl_at (next_crawl_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+    ]),
+    ('005_crawl_high_water_mark', [
+        """
+        ALTER TABLE crawl_state
+            ADD COLUMN IF NOT EXISTS last_nid BIGINT AFTER stock_code,
+            ADD COLUMN IF NOT EXISTS last_post_at DATETIME AFTER last_nid,
+            ADD COLUMN IF NOT EXISTS gap_low_nid BIGINT AFTER last_post_at,
+            ADD COLUMN IF NOT EXISTS gap_high_nid BIGINT AFTER gap_low_nid
+        """
+    ]),
+    ('006_stock_posts_nid', [
+        "ALTER TABLE stock_posts ADD COLUMN IF NOT EXISTS nid BIGINT AFTER stock_code",
+        # 기존 게시글의 글 번호를 링크(board_read.naver?code=...&nid=...&...)에서 채움
+        """
+        UPDATE stock_posts
+        SET nid = CAST(SUBSTRING_INDEX(SUBSTRING_INDEX(link, 'nid=', -1), '&', 1) AS UNSIGNED)
+        WHERE nid IS NULL
+        AND link LIKE '%nid=%'
+        """,
+        # 같은 글이 (날짜/제목 차이로) 여러 번 저장된 경우 가장 먼저 저장된 행만 남기고 삭제
+        # (nid만 지우면 블라인드 글처럼 남아 요약/집계에서 두 번 셈, 분석 결과는 ON DELETE CASCADE로 함께 삭제)
+        """
+        DELETE sp FROM stock_posts sp
+        JOIN (
+            SELECT stock_code, nid, MIN(id) as keep_id
+            FROM stock_posts
+            WHERE nid IS NOT NULL
+            GROUP BY stock_code, nid
+            HAVING COUNT(*) > 1
+        ) dup ON sp.stock_code = dup.stock_code AND sp.nid = dup.nid
+        WHERE sp.id <> dup.keep_id
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS unique_stock_nid ON stock_posts (stock_code, nid)",
+        # 넓은 문자열 키 (stock_code, date, author, title(100))는 목록의 날짜만 있는 글을 중복으로 오인하므로 제거
+        "DROP INDEX IF EXISTS unique_post ON stock_posts"
+    ]),
+    ('007_content_strategy', [
+        # 본문 추출에 성공한 방법 (content_extractor.STRATEGIES, 방법별 적중률 확인용)
+        "ALTER TABLE stock_posts ADD COLUMN IF NOT EXISTS content_strategy VARCHAR(20) AFTER content"
+    ]),
+    ('008_post_analysis_unique_post_id', [
+        # 게시글당 분석 결과는 한 행 - 중복 행은 가장 최근에 저장된 행(id가 큰 행)만 남김 (fix_duplicates.py와 같은 기준)
+        """
+        DELETE pa1 FROM post_analysis pa1
+        JOIN post_analysis pa2 ON pa1.post_id = pa2.post_id AND pa1.id < pa2.id
+        """,
+        # 분석 결과 저장(INSERT ... ON DUPLICATE KEY UPDATE)이 이 키로 기존 행을 덮어씀
+        "CREATE UNIQUE INDEX IF NOT EXISTS unique_post_id ON post_analysis (post_id)"
+    ]),
+    ('009_stock_posts_blind_key', [
+        # 이전 006은 중복 글의 nid만 NULL로 바꿨으므로, 링크에 글 번호가 있는데 nid가 없는 중복 행을 삭제
+        """
+        DELETE sp FROM stock_posts sp
+        JOIN stock_posts keep
+            ON keep.stock_code = sp.stock_code
+            AND keep.nid = CAST(SUBSTRING_INDEX(SUBSTRING_INDEX(sp.link, 'nid=', -1), '&', 1) AS UNSIGNED)
+        WHERE sp.nid IS NULL
+        AND sp.link LIKE '%nid=%'
+        """,
+        # 글 번호가 없는 블라인드 글의 중복 판단 키 (nid가 있는 글은 NULL이라 unique_stock_nid만 적용)
+        # 알려진 한계: 목록 날짜는 분 단위이고 작성자는 마스킹(abc1****)되어 있어, 같은 분에 같은 마스킹 작성자가 쓴
+        # 서로 다른 블라인드 글은 한 글로 봄 (아래 정리에서 하나만 남고 이후 저장에서도 건너뜀).
+        # 날짜가 NULL인 블라인드 글은 키도 NULL이라 중복 판단하지 않음
+        """
+        ALTER TABLE stock_posts ADD COLUMN IF NOT EXISTS blind_key VARCHAR(130)
+            AS (IF(nid IS NULL, CONCAT(date, '|', author), NULL)) PERSISTENT AFTER nid
+        """,
+        # 이미 여러 번 저장된 블라인드 글은 가장 먼저 저장된 행만 남김 (분석 결과는 ON DELETE CASCADE로 함께 삭제)
+        """
+        DELETE sp1 FROM stock_posts sp1
+        JOIN stock_posts sp2
+            ON sp1.stock_code = sp2.stock_code AND sp1.blind_key = sp2.blind_key AND sp1.id > sp2.id
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS unique_stock_blind ON stock_posts (stock_code, blind_key)"
+    ]),
+]
+
+
+def apply_migrations():
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용하고 적용한 개수 반환 (DB 연결 실패 시 None)"""
+    engine = get_db_connection()
+    if engine is None:
+        logger.error("DB 연결 실패")
+        return None
+
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name VARCHAR(100) PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """))
+        conn.commit()
+        applied = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+        count = 0
+        for name, statements in MIGRATIONS:
+            if name in applied:
+                continue
+            logger.info(f"마이그레이션 적용: {name}")
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {'name': name})
+            conn.commit()
+            count += 1
+
+    logger.info(f"마이그레이션 {count}개 적용 (전체 {len(MIGRATIONS)}개)")
+    return count
+
+
+# 리포트 쿼리에서 post_analysis를 게시글 id로 찾을 때 허용하는 인덱스 (집계 컬럼을 포함한 인덱스 또는 UNIQUE 키)
+_POST_ANALYSIS_KEYS = ('idx_post_sentiment', 'unique_post_id')
+
+
+def _report_query_plans(stock_code, start, end):
+    """(이름, 쿼리, 바인딩 값, 테이블(별칭)별 허용 인덱스) - EXPLAIN으로 확인할 리포트/집계 쿼리 목록"""
+    from analysis_report import _KEYWORD_QUERY
+    from pattern_analyzer import _cells_query, _stream_query
+    from summary_rollup import _BUCKET_ROWS_QUERY, _CUBE_INSERT_QUERY, _TOUCHED_BUCKETS_QUERY
+
+    range_params = {'stock_code': stock_code, 'start': start, 'end': end}
+    range_keys = {'sp': ('idx_stock_code_date',), 'pa': _POST_ANALYSIS_KEYS}
+    cells_query, cells_params = _cells_query(stock_code, start, end)
+    stream_query, stream_params = _stream_query(
+        ['sp.date', 'pa.sentiment_score'], QueryFilter().where("sp.date IS NOT NULL").stocks(stock_code)
+    )
+    return [
+        # 워터마크 이후 분석 결과가 바뀐 날짜 (종목 지정)
+        ('touched_buckets', text(_TOUCHED_BUCKETS_QUERY + " AND sp.stock_code = :stock_code"),
+         {'stock_code': stock_code, 'since': start}, {'pa': ('idx_updated_at',), 'sp': ('PRIMARY',)}),
+        ('daily_summary_rows', _BUCKET_ROWS_QUERY, range_params, range_keys),
+        ('hourly_cube_insert', _CUBE_INSERT_QUERY, range_params, range_keys),
+        ('keyword_analysis', _KEYWORD_QUERY, range_params, range_keys),
+        ('hourly_cube_select', cells_query, cells_params, {'hourly_sentiment_cube': ('PRIMARY',)}),
+        # pa.id 순서 keyset 페이지: post_analysis 기본키 순서로 읽고 게시글은 기본키로 찾거나, 종목 인덱스로 거름
+        ('stream_posts', stream_query, stream_params,
+         {'pa': ('PRIMARY',) + _POST_ANALYSIS_KEYS, 'sp': ('PRIMARY', 'idx_stock_code_date')}),
+    ]
+
+
+def explain_report_queries(stock_code=None, days=7):
+    """리포트/집계 쿼리의 실행 계획(EXPLAIN)을 확인해 기대한 인덱스를 사용하지 않는 쿼리 목록 반환
+
+    쿼리마다 테이블(별칭)별로 허용하는 인덱스를 정해 두고, 접근 방식이 ALL(전체 스캔)이거나
+    사용 인덱스가 허용 목록에 없거나 기대한 테이블이 실행 계획에 없으면 실패로 봅니다.
+    """
+    engine = get_db_connection()
+    if engine is None:
+        logger.error("DB 연결 실패")
+        return None
+
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    start = end - timedelta(days=days)
+
+    with engine.connect() as conn:
+        if stock_code is None:
+            stock_code = conn.execute(text("SELECT stock_code FROM stock_posts LIMIT 1")).scalar() or '005930'
+        plans = _report_query_plans(stock_code, start, end)
+
+        failures = []
+        for name, query, params, expected in plans:
+            # 여러 종목 조건(IN :stock_codes)은 목록 값이므로 EXPLAIN 문에서도 expanding 파라미터로 바인딩
+            expanding = tuple(sorted(key for key, value in params.items() if isinstance(value, list)))
+            rows = conn.execute(statement(f"EXPLAIN {query.text}", expanding), params).mappings().all()
+            problems = []
+            for row in rows:
+                table, access, key = row.get('table'), row.get('type'), row.get('key')
+                logger.info(
+                    f"[{name}] table={table} type={access} key={key} "
+                    f"rows={row.get('rows')} extra={row.get('Extra')}"
+                )
+                if access == 'ALL' and not str(table).startswith('<'):
+                    problems.append(f"{table}: 전체 스캔 (type=ALL)")
+                elif table in expected and key not in expected[table]:
+                    problems.append(f"{table}: 인덱스 {key} 사용 (기대값 {'/'.join(expected[table])})")
+            missing = set(expected) - {row.get('table') for row in rows}
+            problems += [f"{table}: 실행 계획에 없음" for table in sorted(missing)]
+            if problems:
+                logger.warning(f"[{name}] {'; '.join(problems)}")
+                failures.append(name)
+        conn.rollback()
+
+    if failures:
+        logger.warning(f"기대한 인덱스를 사용하지 않는 쿼리: {failures}")
+    else:
+        logger.info(f"리포트 쿼리 {len(plans)}개 모두 기대한 인덱스 사용")
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+    from config import setup_logging
+
+    setup_logging()
+    if len(sys.argv) > 1 and sys.argv[1] == 'explain':
+        # 사용법: python migrations.py explain [stock_code]
+        failures = explain_report_queries(sys.argv[2] if len(sys.argv) > 2 else None)
+        sys.exit(1 if failures is None or failures else 0)
+    # 사용법: python migrations.py (DB 연결 실패 시 종료 코드 1)
+    sys.exit(1 if apply_migrations() is None else 0)
@@ -0,0 +1,255 @@
+"""
+크롤링 오케스트레이터 - 관심 종목 목록(watchlist.json)의 모든 종목을 한 프로세스에서 수집/분석
+
+종목마다 cron으로 main.py를 따로 실행하면 매번 Python 시작, pandas import, DB 연결 비용이 들기 때문에
+하나의 프로세스에서 여러 종목을 동시에 처리합니다.
+- 모든 요청은 crawler.rate_limiter(호스트당 초당 요청 수)를 공유하므로 종목 수와 관계없이 전체 요청량이 제한됩니다.
+- 종목별 폴링 주기는 최근 새 게시글 증가 속도(시간당 글 수)에 맞춰 조정됩니다 (활발한 종목은 자주, 조용한 종목은 드물게).
+- 종목별 수집 상태(마지막/다음 수집 시각, 속도, 새 글 수, 소요 시간)는 crawl_state 테이블에 저장됩니다.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from config import CRAWLING_CONFIG
+from crawler import crawl_new_posts
+from database import get_db_connection, get_high_water_mark, save_high_water_mark, save_posts_to_db, get_pool_stats
+from html_cache import get_cache_stats
+from http_client import get_http_stats
+from query_builder import QueryFilter
+from sentiment_analyzer import analyze_posts_content
+from summary_rollup import refresh_daily_summary, refresh_hourly_cube
+
+logger = logging.getLogger(__name__)
+
+# 속도 지수이동평균에서 이번 수집 결과의 비중
+VELOCITY_SMOOTHING = 0.5
+
+# 처음 수집하는 종목의 속도를 추정할 때 보는 기간
+VELOCITY_LOOKBACK = timedelta(hours=24)
+
+_STATE_UPSERT_QUERY = text("""
+    INSERT INTO crawl_state
+    (stock_code, last_crawled_at, next_crawl_at, velocity, last_new_posts, last_latency_ms)
+    VALUES
+    (:stock_code, :last_crawled_at, :next_crawl_at, :velocity, :last_new_posts, :last_latency_ms)
+    ON DUPLICATE KEY UPDATE
+    last_crawled_at = VALUES(last_crawled_at),
+    next_crawl_at = VALUES(next_crawl_at),
+    velocity = VALUES(velocity),
+    last_new_posts = VALUES(last_new_posts),
+    last_latency_ms = VALUES(last_latency_ms)
+""")
+
+
+def load_watchlist(path=None):
+    """관심 종목 파일을 읽어 종목코드 목록 반환 (순서 유지, 중복 제거)"""
+    path = path or CRAWLING_CONFIG['watchlist_path']
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return list(dict.fromkeys(str(code).strip() for code in data.get('stocks', []) if str(code).strip()))
+
+
+def poll_interval(velocity):
+    """시간당 새 글 수로 다음 폴링까지의 간격(초) 계산 - 새 글이 target_posts_per_poll개 정도 쌓이는 주기"""
+    min_interval = CRAWLING_CONFIG['min_poll_interval']
+    max_interval = CRAWLING_CONFIG['max_poll_interval']
+    if not velocity or velocity <= 0:
+        return max_interval
+    interval = CRAWLING_CONFIG['target_posts_per_poll'] / velocity * 3600
+    return min(max_interval, max(min_interval, interval))
+
+
+def update_velocity(previous, new_posts, elapsed_hours):
+    """이번 수집에서 관측한 속도(새 글 수 / 경과 시간)를 지수이동평균으로 반영"""
+    if elapsed_hours <= 0:
+        return previous or 0.0
+    observed = new_posts / elapsed_hours
+    if previous is None:
+        return observed
+    return VELOCITY_SMOOTHING * observed + (1 - VELOCITY_SMOOTHING) * previous
+
+
+class CrawlOrchestrator:
+    """관심 종목을 동시에 수집하고 종목별 폴링 주기를 관리"""
+
+    def __init__(self, stock_codes=None, watchlist_path=None, max_workers=None):
+        self.fixed_stock_codes = list(stock_codes) if stock_codes else None
+        self.watchlist_path = watchlist_path
+        self.max_workers = max(1, max_workers or CRAWLING_CONFIG['stock_concurrency'])
+        self.state = {}  # stock_code -> {'last_crawled_at', 'next_crawl_at', 'velocity'}
+
+    def stock_codes(self):
+        """수집 대상 종목 (watchlist 파일은 매 주기 다시 읽으므로 재시작 없이 종목 추가/삭제 가능)"""
+        if self.fixed_stock_codes:
+            return self.fixed_stock_codes
+        try:
+            return load_watchlist(self.watchlist_path)
+        except (OSError, ValueError) as e:
+            if self.state:
+                logger.error(f"관심 종목 파일 읽기 실패, 기존 목록 유지: {e}")
+                return list(self.state)
+            raise
+
+    def _load_state(self, stock_codes):
+        """crawl_state에 없는 종목의 상태를 불러오고, 기록이 없으면 최근 게시글 수로 속도 추정"""
+        missing = [code for code in stock_codes if code not in self.state]
+        if not missing:
+            return
+
+        engine = get_db_connection()
+        if engine is None:
+            return
+
+        state_query, params = QueryFilter().stocks(missing, column='stock_code').build(
+            "SELECT stock_code, last_crawled_at, next_crawl_at, velocity FROM crawl_state"
+        )
+        recent_query, recent_params = (
+            QueryFilter()
+            .stocks(missing)
+            .window(datetime.now() - VELOCITY_LOOKBACK, column='sp.date')
+            .build("SELECT sp.stock_code, COUNT(*) as posts\nFROM stock_posts sp", "GROUP BY sp.stock_code")
+        )
+        with engine.connect() as conn:
+            rows = conn.execute(state_query, params).mappings().all()
+            recent = dict(conn.execute(recent_query, recent_params).fetchall())
+
+        for row in rows:
+            self.state[row['stock_code']] = {
+                'last_crawled_at': row['last_crawled_at'],
+                'next_crawl_at': row['next_crawl_at'],
+                'velocity': float(row['velocity'] or 0.0)
+            }
+        for code in missing:
+            if code not in self.state:
+                velocity = recent.get(code, 0) / (VELOCITY_LOOKBACK.total_seconds() / 3600)
+                self.state[code] = {'last_crawled_at': None, 'next_crawl_at': None, 'velocity': velocity}
+                logger.info(f"[{code}] 수집 기록 없음, 최근 게시글로 추정한 속도 {velocity:.1f}건/시간")
+
+    def _save_state(self, result):
+        engine = get_db_connection()
+        if engine is None:
+            return
+        with engine.connect() as conn:
+            conn.execute(_STATE_UPSERT_QUERY, {
+                'stock_code': result['stock_code'],
+                'last_crawled_at': result['crawled_at'],
+                'next_crawl_at': result['next_crawl_at'],
+                'velocity': result['velocity'],
+                'last_new_posts': result['new_posts'],
+                'last_latency_ms': int(result['latency_ms'])
+            })
+            conn.commit()
+
+    def crawl_stock(self, stock_code):
+        """한 종목 수집 → 저장 → 분석 → 요약 갱신 후 종목별 결과(새 글 수, 소요 시간, 다음 수집 시각) 반환"""
+        state = self.state.setdefault(stock_code, {'last_crawled_at': None, 'next_crawl_at': None, 'velocity': 0.0})
+        crawled_at = datetime.now()
+        started = time.perf_counter()
+        result = {'stock_code': stock_code, 'crawled_at': crawled_at, 'new_posts': 0, 'analyzed': 0,
+                  'crawl_ms': 0.0, 'analyze_ms': 0.0, 'error': None}
+
+        try:
+            mark = get_high_water_mark(stock_code)
+            posts, new_mark = crawl_new_posts(stock_code, mark, start_page=1, end_page=CRAWLING_CONFIG['max_pages'])
+            if not posts.empty:
+                result['new_posts'] = save_posts_to_db(posts, stock_code, raise_on_error=True)
+            # 게시글이 저장된 뒤에만 기준점을 올림 (저장 실패 시 다음 수집에서 같은 구간을 다시 수집)
+            save_high_water_mark(stock_code, new_mark)
+            result['crawl_ms'] = (time.perf_counter() - started) * 1000
+
+            analyze_started = time.perf_counter()
+            result['analyzed'] = analyze_posts_content(stock_code)
+            refresh_daily_summary(stock_code)
+            refresh_hourly_cube(stock_code)
+            result['analyze_ms'] = (time.perf_counter() - analyze_started) * 1000
+        except Exception as e:
+            logger.error(f"[{stock_code}] 수집 실패: {e}")
+            result['error'] = str(e)
+        result['latency_ms'] = (time.perf_counter() - started) * 1000
+
+        if result['error'] is None:
+            if state['last_crawled_at'] is not None:
+                elapsed_hours = (crawled_at - state['last_crawled_at']).total_seconds() / 3600
+                state['velocity'] = update_velocity(state['velocity'], result['new_posts'], elapsed_hours)
+            state['last_crawled_at'] = crawled_at
+            interval = poll_interval(state['velocity'])
+        else:
+            # 실패하면 속도는 그대로 두고 최소 간격 후 다시 시도
+            interval = CRAWLING_CONFIG['min_poll_interval']
+        state['next_crawl_at'] = crawled_at + timedelta(seconds=interval)
+
+        result['velocity'] = state['velocity']
+        result['next_crawl_at'] = state['next_crawl_at']
+        try:
+            self._save_state(result)
+        except Exception as e:
+            logger.error(f"[{stock_code}] 수집 상태 저장 실패: {e}")
+        return result
+
+    def due_stocks(self, now=None, force=False):
+        """다음 수집 시각이 지난 종목 목록"""
+        now = now or datetime.now()
+        stock_codes = self.stock_codes()
+        self._load_state(stock_codes)
+        if force:
+            return stock_codes
+        return [code for code in stock_codes
+                if self.state.get(code, {}).get('next_crawl_at') is None or self.state[code]['next_crawl_at'] <= now]
+
+    def run_once(self, force=False):
+        """수집 시각이 된 종목을 max_workers개씩 동시에 처리하고 종목별 결과 목록 반환"""
+        due = self.due_stocks(force=force)
+        if not due:
+            return []
+
+        logger.info(f"수집 대상 {len(due)}개 종목: {', '.join(due)}")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as executor:
+            results = list(executor.map(self.crawl_stock, due))
+
+        for r in results:
+            status = f"실패: {r['error']}" if r['error'] else "완료"
+            logger.info(
+                f"[{r['stock_code']}] {status} - 새 글 {r['new_posts']}건, 분석 {r['analyzed']}건, "
+                f"수집 {r['crawl_ms']:.0f}ms, 분석 {r['analyze_ms']:.0f}ms, 전체 {r['latency_ms']:.0f}ms, "
+                f"속도 {r['velocity']:.1f}건/시간, 다음 수집 {r['next_crawl_at'].strftime('%H:%M:%S')}"
+            )
+        logger.info(f"{len(results)}개 종목 처리 완료 ({time.perf_counter() - started:.1f}초), DB 커넥션 풀 통계: {get_pool_stats()}")
+        logger.info(f"HTTP 요청 통계: {get_http_stats()}, HTML 캐시 통계: {get_cache_stats()}")
+        return results
+
+    def run_forever(self):
+        """가장 이른 다음 수집 시각까지 대기하면서 계속 수집"""
+        while True:
+            self.run_once()
+            pending = [self.state[code]['next_crawl_at'] for code in self.stock_codes()
+                       if code in self.state and self.state[code]['next_crawl_at'] is not None]
+            wait = min(pending) - datetime.now() if pending else timedelta(seconds=CRAWLING_CONFIG['min_poll_interval'])
+            # 관심 종목 파일 변경을 반영하도록 최대 최소 간격만큼만 대기
+            time.sleep(min(max(wait.total_seconds(), 1.0), CRAWLING_CONFIG['min_poll_interval']))
+
+
+if __name__ == "__main__":
+    import sys
+    from config import setup_logging
+
+    setup_logging()
+
+    # 사용법: python orchestrator.py [once|loop] [stock_code,...]
+    #   once: 수집 시각과 관계없이 모든 종목을 한 번 수집하고 종료 (cron용)
+    #   loop: 종목별 폴링 주기에 맞춰 계속 수집 (기본값)
+    args = sys.argv[1:]
+    mode = args[0] if args else 'loop'
+    orchestrator = CrawlOrchestrator(stock_codes=args[1].split(',') if len(args) > 1 else None)
+
+    if mode == 'once':
+        results = orchestrator.run_once(force=True)
+        sys.exit(1 if any(r['error'] for r in results) else 0)
+    elif mode == 'loop':
+        orchestrator.run_forever()
+    else:
+        print("사용법: python orchestrator.py [once|loop] [stock_code,...]")
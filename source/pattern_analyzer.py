@@ -7,6 +7,10 @@ from datetime import datetime, timedelta
 import numpy as np
 import os
 from database import get_db_connection
+from summary_rollup import refresh_hourly_cube
+from query_builder import POSTS_JOIN, QueryFilter, stock_codes
+import json
+from collections import Counter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -27,10 +31,202 @@ except ImportError:
     HAS_SEABORN = False
     print("Warning: seaborn not installed. Some visualizations will use matplotlib only.")
 
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# 스트리밍 조회 시 한 번에 읽는 행 수
+STREAM_CHUNK_SIZE = 5000
+
+
+# 집계 셀 컬럼 (hourly_sentiment_cube 컬럼을 리포트용 이름으로 읽음)
+CELL_COLUMNS = ['posts', 'scored', 'sentiment_sum', 'sentiment_sumsq',
+                'bullish', 'bearish', 'neutral_outlook', 'positive', 'negative', 'neutral']
+
+_CUBE_SELECT = """
+SELECT
+    date,
+    hour as hour_of_day,
+    SUM(total_posts) as posts,
+    SUM(scored_posts) as scored,
+    SUM(sentiment_sum) as sentiment_sum,
+    SUM(sentiment_sumsq) as sentiment_sumsq,
+    SUM(bullish_posts) as bullish,
+    SUM(bearish_posts) as bearish,
+    SUM(neutral_outlook_posts) as neutral_outlook,
+    SUM(positive_posts) as positive,
+    SUM(negative_posts) as negative,
+    SUM(neutral_posts) as neutral
+FROM hourly_sentiment_cube
+"""
+
+
+def _stream_query(columns, query_filter=None, chunk_size=STREAM_CHUNK_SIZE):
+    """stock_posts JOIN post_analysis를 pa.id 기준 keyset 페이지로 읽는 쿼리와 바인딩 값 (첫 페이지 기준)"""
+    keyset = query_filter.copy() if query_filter is not None else QueryFilter()
+    query, params = keyset.where("pa.id > :last_id", last_id=0).build(
+        f"SELECT pa.id AS row_id, {', '.join(columns)}\nFROM {POSTS_JOIN}",
+        "ORDER BY pa.id\nLIMIT :chunk_size"
+    )
+    params['chunk_size'] = chunk_size
+    return query, params
+
+
+def _cells_query(stock_code=None, start=None, end=None):
+    """hourly_sentiment_cube에서 [start, end)가 걸친 날짜의 (날짜, 시간) 셀을 읽는 쿼리와 바인딩 값"""
+    # 셀 테이블도 반개구간으로 조회 (end가 자정이면 그 날짜는 제외)
+    return (
+        QueryFilter()
+        .stocks(stock_code, column='stock_code')
+        .window(
+            start.date() if start is not None else None,
+            pd.Timestamp(end).ceil('D').date() if end is not None else None,
+            column='date'
+        )
+        .build(_CUBE_SELECT, "GROUP BY date, hour ORDER BY date, hour")
+    )
+
+
+def _stock_label(stock_code, sep=', '):
+    """리포트 제목/파일명에 쓰는 종목 표기 (여러 종목이면 sep로 연결)"""
+    return sep.join(stock_codes(stock_code))
+
+
+def _cell_frame(cells):
+    """(date, hour_of_day) 집계 셀에 리포트에서 쓰는 파생 컬럼 (day_name, market_session, week_start 등) 추가"""
+    cells = cells.copy()
+    cells['date'] = pd.to_datetime(cells['date'])
+    for column in CELL_COLUMNS:
+        cells[column] = pd.to_numeric(cells[column]).fillna(0)
+        if column not in ('sentiment_sum', 'sentiment_sumsq'):
+            cells[column] = cells[column].astype(int)
+    cells['hour_of_day'] = cells['hour_of_day'].astype(int)
+    cells['day_name'] = cells['date'].dt.day_name()
+    cells['day_of_week'] = (cells['date'].dt.weekday + 1) % 7 + 1  # MySQL DAYOFWEEK (일요일=1)
+    cells['day_of_month'] = cells['date'].dt.day
+    cells['week_start'] = cells['date'].dt.to_period('W').dt.start_time
+    cells['month'] = cells['date'].dt.to_period('M')
+    cells['market_session'] = np.where(
+        (cells['hour_of_day'] >= 9) & (cells['hour_of_day'] <= 15), 'Market Hours', 'After Hours'
+    )
+    return cells
+
+
+def _sentiment_moments(sums):
+    """합계(scored, sentiment_sum, sentiment_sumsq)에서 평균과 표본 표준편차(ddof=1) 계산"""
+    n = sums['scored']
+    mean = sums['sentiment_sum'] / n.where(n > 0)
+    variance = (sums['sentiment_sumsq'] - sums['sentiment_sum'] ** 2 / n.where(n > 0)) / (n - 1).where(n > 1)
+    return mean, np.sqrt(variance.clip(lower=0))
+
+
+def _group_stats(cells, keys, stats=('count', 'mean', 'std')):
+    """셀을 keys로 묶어 기존 groupby().agg() 결과와 같은 모양의 통계표 생성
+
+    컬럼: ('sentiment_score', 'count'|'mean'|'std'), ('bullish_bearish', '<lambda>') = 강세 비율
+    """
+    sums = cells.groupby(keys)[CELL_COLUMNS].sum()
+    mean, std = _sentiment_moments(sums)
+    columns = {'count': sums['scored'], 'mean': mean, 'std': std}
+
+    stats_table = pd.DataFrame({('sentiment_score', stat): columns[stat] for stat in stats})
+    stats_table[('bullish_bearish', '<lambda>')] = sums['bullish'] / sums['posts']
+    stats_table.columns = pd.MultiIndex.from_tuples(stats_table.columns)
+    return stats_table.round(4)
+
+
+def _posts_by(cells, keys):
+    """keys별 게시글 수"""
+    return cells.groupby(keys)['posts'].sum()
+
+
+def _sentiment_by(cells, keys):
+    """keys별 평균 감정 점수"""
+    sums = cells.groupby(keys)[['scored', 'sentiment_sum']].sum()
+    return sums['sentiment_sum'] / sums['scored'].where(sums['scored'] > 0)
+
+
+def _ratio_by(cells, keys, column):
+    """keys별 전체 게시글 대비 column(bullish 등) 비율"""
+    sums = cells.groupby(keys)[[column, 'posts']].sum()
+    return sums[column] / sums['posts']
+
+
+def _overall(cells):
+    """전체 게시글 수, 평균 감정, 감정 표준편차, 강세/약세/중립 비율"""
+    sums = cells[CELL_COLUMNS].sum().to_frame().T
+    mean, std = (value.iloc[0] for value in _sentiment_moments(sums))
+    sums = sums.iloc[0]
+    total = int(sums['posts'])
+    return {
+        'total_posts': total,
+        'avg_sentiment': mean,
+        'sentiment_std': std,
+        'bullish_ratio': sums['bullish'] / total if total else np.nan,
+        'bearish_ratio': sums['bearish'] / total if total else np.nan,
+        'neutral_ratio': sums['neutral_outlook'] / total if total else np.nan
+    }
+
+
+def _label_counts(cells):
+    """감정 레이블별 게시글 수 (value_counts()처럼 많은 순)"""
+    counts = cells[['positive', 'negative', 'neutral']].sum()
+    return counts[counts > 0].sort_values(ascending=False)
+
+
+class StreamingCorrelation:
+    """행 chunk를 받아 컬럼 쌍별 합계만 누적하는 피어슨 상관계수 계산기
+
+    DataFrame.corr()처럼 각 컬럼 쌍마다 두 값이 모두 있는 행만 사용합니다.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self._n = np.zeros((k, k))
+        self._sum = np.zeros((k, k))     # [i, j]: j가 있는 행에서 i의 합
+        self._sumsq = np.zeros((k, k))   # [i, j]: j가 있는 행에서 i의 제곱합
+        self._cross = np.zeros((k, k))   # [i, j]: 두 값이 모두 있는 행에서 i*j의 합
+
+    def add(self, chunk):
+        values = chunk[self.columns].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        mask = valid.astype(float)
+        values = np.where(valid, values, 0.0)
+
+        self._n += mask.T @ mask
+        self._sum += values.T @ mask
+        self._sumsq += (values ** 2).T @ mask
+        self._cross += values.T @ values
+
+    def observed(self, column):
+        """column에 값이 있는 행 수"""
+        i = self.columns.index(column)
+        return int(self._n[i, i])
+
+    def corr(self, columns=None):
+        columns = columns or self.columns
+        idx = [self.columns.index(column) for column in columns]
+        n = self._n[np.ix_(idx, idx)]
+        sum_x = self._sum[np.ix_(idx, idx)]
+        sum_y = sum_x.T
+        sumsq_x = self._sumsq[np.ix_(idx, idx)]
+        sumsq_y = sumsq_x.T
+        cross = self._cross[np.ix_(idx, idx)]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = n * cross - sum_x * sum_y
+            scale = np.sqrt((n * sumsq_x - sum_x ** 2) * (n * sumsq_y - sum_y ** 2))
+            matrix = np.where((n > 1) & (scale > 0), covariance / scale, np.nan)
+        diagonal = np.diag(matrix).copy()
+        np.fill_diagonal(matrix, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(np.clip(matrix, -1.0, 1.0), index=columns, columns=columns)
+
+
 class PatternAnalyzer:
-    def __init__(self, auto_update_readme=True):
+    def __init__(self, auto_update_readme=True, refresh_cube=False):
         self.connection = get_db_connection()
         self.auto_update_readme = auto_update_readme
+        # True이면 리포트가 셀을 읽기 전에 hourly_sentiment_cube를 증분 갱신 (쓰기 권한 필요)
+        self.refresh_cube = refresh_cube
         self._readme_manager = ReadmeManager() if HAS_README_MANAGER else None
     
     def _create_output_directory(self, date_for_dir=None):
@@ -48,59 +244,65 @@ class PatternAnalyzer:
         os.makedirs(output_dir, exist_ok=True)
         return output_dir
 
+    def _stream_posts(self, columns, query_filter=None, chunk_size=STREAM_CHUNK_SIZE):
+        """stock_posts JOIN post_analysis 결과를 pa.id 기준 keyset 페이지로 나누어 DataFrame chunk로 반환
+
+        결과 전체를 한 번에 읽지 않으므로, 호출하는 쪽에서 chunk를 집계에 누적하면
+        테이블 크기와 관계없이 chunk_size 행만 메모리에 올라갑니다.
+        """
+        query, params = _stream_query(columns, query_filter, chunk_size)
+
+        while True:
+            chunk = pd.read_sql(query, self.connection, params=params)
+            if chunk.empty:
+                return
+            params['last_id'] = int(chunk['row_id'].iloc[-1])
+            yield chunk.drop(columns='row_id')
+            if len(chunk) < chunk_size:
+                return
+
+    def _load_cells(self, stock_code=None, start=None, end=None, refresh=None):
+        """hourly_sentiment_cube에서 [start, end) 시간 구간의 (날짜, 시간) 셀을 읽음 (종목을 지정하지 않으면 전체 합산)
+
+        셀은 분석 후 main.py/orchestrator.py가 갱신하므로 기본적으로 읽기만 합니다.
+        refresh=True이면(기본값은 생성자의 refresh_cube) 읽기 전에 새로 분석된 날짜의 셀을 증분 갱신합니다.
+        """
+        if self.refresh_cube if refresh is None else refresh:
+            for code in stock_codes(stock_code) or (None,):
+                refresh_hourly_cube(code)
+
+        query, params = _cells_query(stock_code, start, end)
+        cells = _cell_frame(pd.read_sql(query, self.connection, params=params))
+
+        # 날짜 단위로 읽은 셀을 시간 단위 경계로 다시 자름
+        cell_start = cells['date'] + pd.to_timedelta(cells['hour_of_day'], unit='h')
+        keep = pd.Series(True, index=cells.index)
+        if start is not None:
+            keep &= cell_start >= pd.Timestamp(start).floor('h')
+        if end is not None:
+            keep &= cell_start < pd.Timestamp(end)
+        return cells[keep].reset_index(drop=True)
+
     def analyze_temporal_patterns(self, stock_code=None, target_date=None):
         """시간적 패턴 분석"""
         
-        # 기본 쿼리
-        base_query = """
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            pa.sentiment_score,
-            pa.sentiment_label,
-            pa.bullish_bearish,
-            HOUR(sp.date) as hour_of_day,
-            DAYOFWEEK(sp.date) as day_of_week,
-            DAYNAME(sp.date) as day_name
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE sp.date IS NOT NULL
-        """
-        
-        if stock_code:
-            base_query += f" AND sp.stock_code = '{stock_code}'"
-            
-        df = pd.read_sql(base_query, self.connection)
-        df['date'] = pd.to_datetime(df['date'])
+        cells = self._load_cells(stock_code)
         
-        return self._generate_temporal_reports(df, stock_code, target_date)
+        return self._generate_temporal_reports(cells, stock_code, target_date)
     
-    def _generate_temporal_reports(self, df, stock_code=None, target_date=None):
+    def _generate_temporal_reports(self, cells, stock_code=None, target_date=None):
         """시간적 패턴 리포트 생성"""
         
         results = {}
         
         # 1. 시간대별 패턴
-        hourly_pattern = df.groupby('hour_of_day').agg({
-            'sentiment_score': ['count', 'mean', 'std'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        hourly_pattern = _group_stats(cells, 'hour_of_day')
         
         # 2. 요일별 패턴
-        daily_pattern = df.groupby(['day_of_week', 'day_name']).agg({
-            'sentiment_score': ['count', 'mean', 'std'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        daily_pattern = _group_stats(cells, ['day_of_week', 'day_name'])
         
         # 3. 장시간 vs 장외시간
-        df['market_session'] = df['hour_of_day'].apply(
-            lambda x: 'Market Hours' if 9 <= x <= 15 else 'After Hours'
-        )
-        
-        session_pattern = df.groupby('market_session').agg({
-            'sentiment_score': ['count', 'mean', 'std'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        session_pattern = _group_stats(cells, 'market_session')
         
         results['hourly'] = hourly_pattern
         results['daily'] = daily_pattern
@@ -108,7 +310,7 @@ class PatternAnalyzer:
         
         # 시각화
         output_dir = self._create_output_directory(target_date)
-        generated_file = self._plot_patterns(df, stock_code, output_dir)
+        generated_file = self._plot_patterns(cells, stock_code, output_dir)
 
         # README 업데이트 (실제 생성된 파일만 반영)
         if generated_file:
@@ -116,23 +318,23 @@ class PatternAnalyzer:
         
         return results
     
-    def _plot_patterns(self, df, stock_code=None, output_dir=None):
+    def _plot_patterns(self, cells, stock_code=None, output_dir=None):
         """패턴 시각화"""
         
-        title_suffix = f" - {stock_code}" if stock_code else ""
+        title_suffix = f" - {_stock_label(stock_code)}" if stock_code else ""
         
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle(f'Post Pattern Analysis{title_suffix}', fontsize=16)
         
         # 1. 시간대별 게시글 수
-        hourly_counts = df.groupby('hour_of_day').size()
+        hourly_counts = _posts_by(cells, 'hour_of_day')
         axes[0, 0].bar(hourly_counts.index, hourly_counts.values)
         axes[0, 0].set_title('Posts by Hour')
         axes[0, 0].set_xlabel('Hour of Day')
         axes[0, 0].set_ylabel('Number of Posts')
         
         # 2. 시간대별 감정 점수
-        hourly_sentiment = df.groupby('hour_of_day')['sentiment_score'].mean()
+        hourly_sentiment = _sentiment_by(cells, 'hour_of_day')
         axes[0, 1].plot(hourly_sentiment.index, hourly_sentiment.values, marker='o')
         axes[0, 1].set_title('Average Sentiment by Hour')
         axes[0, 1].set_xlabel('Hour of Day')
@@ -140,9 +342,8 @@ class PatternAnalyzer:
         axes[0, 1].axhline(y=0, color='r', linestyle='--', alpha=0.5)
         
         # 3. 요일별 게시글 수
-        daily_counts = df.groupby('day_name').size()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        daily_counts = daily_counts.reindex([day for day in day_order if day in daily_counts.index])
+        daily_counts = _posts_by(cells, 'day_name')
+        daily_counts = daily_counts.reindex([day for day in DAY_ORDER if day in daily_counts.index])
         
         axes[1, 0].bar(range(len(daily_counts)), daily_counts.values)
         axes[1, 0].set_title('Posts by Day of Week')
@@ -152,7 +353,7 @@ class PatternAnalyzer:
         axes[1, 0].set_xticklabels([day[:3] for day in daily_counts.index], rotation=45)
         
         # 4. 감정 분포
-        sentiment_counts = df['sentiment_label'].value_counts()
+        sentiment_counts = _label_counts(cells)
         axes[1, 1].pie(sentiment_counts.values, labels=sentiment_counts.index, autopct='%1.1f%%')
         axes[1, 1].set_title('Sentiment Distribution')
         
@@ -164,7 +365,7 @@ class PatternAnalyzer:
         # 파일명 저장 날짜를 output_dir 기준 폴더명(YYYYMMDD)으로 맞춤
         folder_date = os.path.basename(output_dir)
 
-        filename = f"pattern_analysis_{stock_code}_{folder_date}.png" if stock_code else f"pattern_analysis_all_{folder_date}.png"
+        filename = f"pattern_analysis_{_stock_label(stock_code, '_')}_{folder_date}.png" if stock_code else f"pattern_analysis_all_{folder_date}.png"
         filepath = os.path.join(output_dir, filename)
         plt.savefig(filepath, dpi=300, bbox_inches='tight')
         plt.close()
@@ -190,39 +391,44 @@ class PatternAnalyzer:
                 print(f"⚠️ Auto README update failed: {e}")
 
     def analyze_correlation_patterns(self, stock_code=None):
-        """상관관계 패턴 분석"""
-        
-        query = """
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            sp.views,
-            sp.likes,
-            sp.dislikes,
-            pa.sentiment_score,
-            pa.confidence_score,
-            pa.bullish_bearish,
-            COUNT(*) OVER (PARTITION BY sp.stock_code, DATE(sp.date)) as daily_post_count
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE sp.date IS NOT NULL
+        """상관관계 패턴 분석
+
+        일별 게시글 수를 먼저 GROUP BY로 구한 뒤, 게시글 행은 스트리밍으로 읽으면서
+        컬럼 쌍별 합계만 누적해 상관계수를 계산합니다.
         """
         
-        if stock_code:
-            query += f" AND sp.stock_code = '{stock_code}'"
-            
-        df = pd.read_sql(query, self.connection)
+        query_filter = QueryFilter().where("sp.date IS NOT NULL").stocks(stock_code)
+        
+        # 1차: (종목, 날짜)별 게시글 수 - 행 수가 아닌 일 수만큼의 작은 결과
+        daily_query, params = query_filter.build(
+            f"SELECT sp.stock_code, DATE(sp.date) as day, COUNT(*) as daily_post_count\nFROM {POSTS_JOIN}",
+            "GROUP BY sp.stock_code, DATE(sp.date)"
+        )
+        daily_counts = pd.read_sql(daily_query, self.connection, params=params)
+        daily_counts['day'] = pd.to_datetime(daily_counts['day'])
+        daily_counts = daily_counts.set_index(['stock_code', 'day'])['daily_post_count']
         
         # 숫자형 컬럼만 선택하여 상관관계 분석
         numeric_cols = ['sentiment_score', 'confidence_score', 'daily_post_count']
-        
-        # views, likes, dislikes를 숫자로 변환 (가능한 경우)
-        for col in ['views', 'likes', 'dislikes']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            if not df[col].isna().all():
-                numeric_cols.append(col)
-        
-        correlation_matrix = df[numeric_cols].corr()
+        optional_cols = ['views', 'likes', 'dislikes']
+        correlation = StreamingCorrelation(numeric_cols + optional_cols)
+        
+        columns = ['sp.date', 'sp.stock_code', 'sp.views', 'sp.likes', 'sp.dislikes',
+                   'pa.sentiment_score', 'pa.confidence_score']
+        for chunk in self._stream_posts(columns, query_filter):
+            days = pd.to_datetime(chunk['date']).dt.normalize()
+            chunk['daily_post_count'] = daily_counts.reindex(
+                pd.MultiIndex.from_arrays([chunk['stock_code'], days])
+            ).to_numpy()
+            # views, likes, dislikes 등을 숫자로 변환 (가능한 경우)
+            for col in ['sentiment_score', 'confidence_score'] + optional_cols:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+            correlation.add(chunk)
+        
+        # views, likes, dislikes는 숫자로 변환된 값이 하나라도 있을 때만 포함
+        numeric_cols += [col for col in optional_cols if correlation.observed(col) > 0]
+        
+        correlation_matrix = correlation.corr(numeric_cols)
         
         # # 상관관계 히트맵
         # plt.figure(figsize=(10, 8))
@@ -249,33 +455,35 @@ class PatternAnalyzer:
         return correlation_matrix
     
     def analyze_keyword_trends(self, stock_code=None, top_n=20):
-        """키워드 트렌드 분석"""
-        
-        query = """
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            pa.keywords,
-            pa.sentiment_score
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE pa.keywords IS NOT NULL
-        """
-        
-        if stock_code:
-            query += f" AND sp.stock_code = '{stock_code}'"
-            
-        df = pd.read_sql(query, self.connection)
-        
-        # JSON 키워드 파싱 및 분석
-        # 이 부분은 실제 키워드 JSON 구조에 따라 수정 필요
-        
-        return df
+        """키워드 트렌드 분석 - 키워드별 등장 게시글 수와 평균 감정 점수 (상위 top_n개)"""
+        
+        query_filter = QueryFilter().where("pa.keywords IS NOT NULL").stocks(stock_code)
+        
+        keyword_counts = Counter()
+        keyword_sentiment = Counter()
+        for chunk in self._stream_posts(['pa.keywords', 'pa.sentiment_score'], query_filter):
+            scores = pd.to_numeric(chunk['sentiment_score'], errors='coerce').fillna(0.0)
+            for keywords, score in zip(chunk['keywords'], scores):
+                try:
+                    keywords = json.loads(keywords) if isinstance(keywords, (str, bytes)) else keywords
+                except ValueError:
+                    continue
+                # 게시글 하나에서 같은 키워드는 한 번만 집계
+                for keyword in set(keywords or []):
+                    keyword_counts[keyword] += 1
+                    keyword_sentiment[keyword] += score
+        
+        top_keywords = keyword_counts.most_common(top_n)
+        return pd.DataFrame({
+            'keyword': [keyword for keyword, _ in top_keywords],
+            'count': [count for _, count in top_keywords],
+            'avg_sentiment': [round(keyword_sentiment[keyword] / count, 4) for keyword, count in top_keywords]
+        })
 
     def generate_summary_report(self, stock_code=None, target_date=None):
         """종합 분석 리포트 생성"""
         
-        print(f"=== Post Pattern Analysis Report{' - ' + stock_code if stock_code else ''} ===\n")
+        print(f"=== Post Pattern Analysis Report{' - ' + _stock_label(stock_code) if stock_code else ''} ===\n")
         
         # 시간적 패턴 분석
         temporal_results = self.analyze_temporal_patterns(stock_code, target_date=target_date)
@@ -323,50 +531,37 @@ class PatternAnalyzer:
         if start_dt > end_dt:
             start_dt = start_dt - timedelta(days=1)
 
-        print(f"=== 📈 Pre-Market Analysis Report{' - ' + stock_code if stock_code else ''} ===")
+        print(f"=== 📈 Pre-Market Analysis Report{' - ' + _stock_label(stock_code) if stock_code else ''} ===")
         print(f"분석 구간: {start_dt.strftime('%Y-%m-%d %H:%M')} ~ {end_dt.strftime('%Y-%m-%d %H:%M')}")
         print(f"Generated at: {target_date.strftime('%Y-%m-%d 09:00:00')}")
         print("=" * 60)
 
-        # 쿼리: 해당 구간의 글만 추출
-        query = f"""
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            pa.sentiment_score,
-            pa.sentiment_label,
-            pa.bullish_bearish,
-            HOUR(sp.date) as hour_of_day
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE sp.date >= '{start_dt.strftime('%Y-%m-%d %H:%M:%S')}'
-          AND sp.date <= '{end_dt.strftime('%Y-%m-%d %H:%M:%S')}'
-        """
-        if stock_code:
-            query += f" AND sp.stock_code = '{stock_code}'"
-
-        df = pd.read_sql(query, self.connection)
+        # 해당 구간의 시간대별 집계 셀 (end_dt 시각의 셀은 제외)
+        cells = self._load_cells(stock_code, start_dt, end_dt)
 
-        if df.empty:
+        if cells.empty:
             print("⚠️  No data available for the specified pre-market period.")
             return None
 
         # 요약 통계
-        total_posts = len(df)
-        avg_sentiment = df['sentiment_score'].mean()
-        bullish_ratio = (df['bullish_bearish'] == 'bullish').mean()
-        after_hours = df[df['hour_of_day'] >= 16]
-        early_morning = df[df['hour_of_day'] <= 8]
+        overall = _overall(cells)
+        total_posts = overall['total_posts']
+        avg_sentiment = overall['avg_sentiment']
+        bullish_ratio = overall['bullish_ratio']
+        after_hours = cells[cells['hour_of_day'] >= 16]
+        early_morning = cells[cells['hour_of_day'] <= 8]
+        after_hours_posts = int(after_hours['posts'].sum())
+        early_morning_posts = int(early_morning['posts'].sum())
 
         print(f"\n📊 Pre-Market Summary:")
         print(f"   • Total Posts: {total_posts}")
         print(f"   • Average Sentiment: {avg_sentiment:.4f}")
         print(f"   • Bullish Ratio: {bullish_ratio:.2%}")
-        print(f"   • After Hours Posts (16~23시): {len(after_hours)}")
-        print(f"   • Early Morning Posts (0~8시): {len(early_morning)}")
+        print(f"   • After Hours Posts (16~23시): {after_hours_posts}")
+        print(f"   • Early Morning Posts (0~8시): {early_morning_posts}")
 
         # 감정 분포
-        sentiment_dist = df['sentiment_label'].value_counts()
+        sentiment_dist = _label_counts(cells)
         print(f"\n🎯 Sentiment Distribution:")
         for sentiment, count in sentiment_dist.items():
             print(f"   • {sentiment.capitalize()}: {count} ({count/total_posts:.1%})")
@@ -384,8 +579,8 @@ class PatternAnalyzer:
                 'total_posts': total_posts,
                 'avg_sentiment': avg_sentiment,
                 'bullish_ratio': bullish_ratio,
-                'after_hours_posts': len(after_hours),
-                'early_morning_posts': len(early_morning)
+                'after_hours_posts': after_hours_posts,
+                'early_morning_posts': early_morning_posts
             }
         }
     
@@ -399,45 +594,28 @@ class PatternAnalyzer:
         report_date = target_date.strftime('%Y-%m-%d')
         date_desc = f" ({report_date})"
 
-        print(f"=== 📉 Post-Market Analysis Report{' - ' + stock_code if stock_code else ''}{date_desc} ===")
+        print(f"=== 📉 Post-Market Analysis Report{' - ' + _stock_label(stock_code) if stock_code else ''}{date_desc} ===")
         print(f"Generated at: {target_date.strftime('%Y-%m-%d 15:30:00')}")
         print("=" * 60)
 
         # 대상 날짜 장시간 데이터 분석
         today = report_date
 
-        query = f"""
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            pa.sentiment_score,
-            pa.sentiment_label,
-            pa.bullish_bearish,
-            HOUR(sp.date) as hour_of_day
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE DATE(sp.date) = '{today}' AND HOUR(sp.date) BETWEEN 9 AND 15
-        """
-
-        if stock_code:
-            query += f" AND sp.stock_code = '{stock_code}'"
-
-        df = pd.read_sql(query, self.connection)
+        market_open = datetime.strptime(today, '%Y-%m-%d') + timedelta(hours=9)
+        cells = self._load_cells(stock_code, market_open, market_open + timedelta(hours=7))
 
-        if df.empty:
+        if cells.empty:
             print(f"⚠️  No trading hours data available for {report_date}.")
             return None
 
         # 장시간 요약 통계
-        total_posts = len(df)
-        avg_sentiment = df['sentiment_score'].mean()
-        bullish_ratio = (df['bullish_bearish'] == 'bullish').mean()
+        overall = _overall(cells)
+        total_posts = overall['total_posts']
+        avg_sentiment = overall['avg_sentiment']
+        bullish_ratio = overall['bullish_ratio']
 
         # 시간대별 분석
-        hourly_stats = df.groupby('hour_of_day').agg({
-            'sentiment_score': ['count', 'mean'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        hourly_stats = _group_stats(cells, 'hour_of_day', stats=('count', 'mean'))
 
         print(f"\n📈 Trading Hours Summary ({report_date}):")
         print(f"   • Total Posts: {total_posts}")
@@ -445,15 +623,16 @@ class PatternAnalyzer:
         print(f"   • Bullish Ratio: {bullish_ratio:.2%}")
 
         # 가장 활발한 시간대
-        peak_hour = df.groupby('hour_of_day').size().idxmax()
-        peak_posts = df.groupby('hour_of_day').size().max()
+        hourly_posts = _posts_by(cells, 'hour_of_day')
+        peak_hour = hourly_posts.idxmax()
+        peak_posts = hourly_posts.max()
 
         print(f"\n⏰ Peak Activity:")
         print(f"   • Peak Hour: {peak_hour}:00")
         print(f"   • Posts in Peak Hour: {peak_posts}")
 
         # 감정 변화 추이
-        hourly_sentiment = df.groupby('hour_of_day')['sentiment_score'].mean()
+        hourly_sentiment = _sentiment_by(cells, 'hour_of_day')
         sentiment_trend = "📈 Improving" if hourly_sentiment.iloc[-1] > hourly_sentiment.iloc[0] else "📉 Declining"
 
         print(f"\n💭 Sentiment Trend: {sentiment_trend}")
@@ -471,7 +650,7 @@ class PatternAnalyzer:
 
         # 시각화
         output_dir = self._create_output_directory(target_date)
-        generated_file = self._plot_post_market_patterns(df, stock_code, output_dir=output_dir)
+        generated_file = self._plot_post_market_patterns(cells, stock_code, output_dir=output_dir)
 
         # README 업데이트 (실제 생성된 파일만 반영)
         if generated_file:
@@ -499,7 +678,7 @@ class PatternAnalyzer:
         report_date = target_date.strftime('%Y-%m-%d')
         date_desc = f" ({report_date})"
         
-        print(f"=== 📅 Weekly Analysis Report{' - ' + stock_code if stock_code else ''}{date_desc} ===")
+        print(f"=== 📅 Weekly Analysis Report{' - ' + _stock_label(stock_code) if stock_code else ''}{date_desc} ===")
         print(f"Generated at: {target_date.strftime('%Y-%m-%d 24:00:00')}")
         print("=" * 60)
         
@@ -507,34 +686,17 @@ class PatternAnalyzer:
         end_date = target_date
         start_date = end_date - timedelta(days=7)
         
-        query = f"""
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            pa.sentiment_score,
-            pa.sentiment_label,
-            pa.bullish_bearish,
-            DAYNAME(sp.date) as day_name,
-            HOUR(sp.date) as hour_of_day
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE sp.date >= '{start_date.strftime('%Y-%m-%d')}'
-        AND sp.date <= '{end_date.strftime('%Y-%m-%d')}'
-        """
+        cells = self._load_cells(stock_code, start_date, end_date)
         
-        if stock_code:
-            query += f" AND sp.stock_code = '{stock_code}'"
-            
-        df = pd.read_sql(query, self.connection)
-        
-        if df.empty:
+        if cells.empty:
             print("⚠️  No data available for the past week.")
             return None
         
         # 주간 요약 통계
-        total_posts = len(df)
-        avg_sentiment = df['sentiment_score'].mean()
-        bullish_ratio = (df['bullish_bearish'] == 'bullish').mean()
+        overall = _overall(cells)
+        total_posts = overall['total_posts']
+        avg_sentiment = overall['avg_sentiment']
+        bullish_ratio = overall['bullish_ratio']
         
         print(f"\n📊 Weekly Summary ({start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}):")
         print(f"   • Total Posts: {total_posts}")
@@ -542,14 +704,10 @@ class PatternAnalyzer:
         print(f"   • Bullish Ratio: {bullish_ratio:.2%}")
         
         # 요일별 분석
-        daily_stats = df.groupby('day_name').agg({
-            'sentiment_score': ['count', 'mean'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        daily_stats = _group_stats(cells, 'day_name', stats=('count', 'mean'))
         
         # 요일 순서 정렬
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        daily_stats = daily_stats.reindex([day for day in day_order if day in daily_stats.index])
+        daily_stats = daily_stats.reindex([day for day in DAY_ORDER if day in daily_stats.index])
         
         print(f"\n📅 Daily Breakdown:")
         for day in daily_stats.index:
@@ -565,14 +723,7 @@ class PatternAnalyzer:
         print(f"\n🔥 Most Active Day: {most_active_day} ({int(most_posts)} posts)")
         
         # 장시간 vs 장외시간 비교
-        df['market_session'] = df['hour_of_day'].apply(
-            lambda x: 'Market Hours' if 9 <= x <= 15 else 'After Hours'
-        )
-        
-        session_stats = df.groupby('market_session').agg({
-            'sentiment_score': ['count', 'mean', 'std'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        session_stats = _group_stats(cells, 'market_session')
         
         print(f"\n🕐 Session Comparison:")
         for session in session_stats.index:
@@ -582,7 +733,7 @@ class PatternAnalyzer:
             print(f"   • {session}: Posts: {posts:3d} | Sentiment: {sentiment:6.3f} | Bullish: {bullish:.1%}")
         
         # 감정 트렌드 분석
-        daily_sentiment = df.groupby(df['date'].dt.date)['sentiment_score'].mean()
+        daily_sentiment = _sentiment_by(cells, 'date')
         if len(daily_sentiment) > 1:
             trend = "📈 Improving" if daily_sentiment.iloc[-1] > daily_sentiment.iloc[0] else "📉 Declining"
             print(f"\n📈 Weekly Sentiment Trend: {trend}")
@@ -591,7 +742,7 @@ class PatternAnalyzer:
         
         # 시각화
         output_dir = self._create_output_directory(target_date)
-        generated_file = self._plot_weekly_patterns(df, stock_code, output_dir=output_dir)
+        generated_file = self._plot_weekly_patterns(cells, stock_code, output_dir=output_dir)
 
         # README 업데이트 (실제 생성된 파일만 반영)
         if generated_file:
@@ -622,81 +773,48 @@ class PatternAnalyzer:
                 else:
                     raise ValueError("target_date 문자열 포맷이 올바르지 않습니다. (YYYY-MM 또는 YYYY-MM-DD)")
             # 해당 월의 첫째 날과 마지막 날
-            start_date = target_date.replace(day=1)
+            start_date = target_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             if target_date.month == 12:
-                end_date = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
+                end_date = start_date.replace(year=target_date.year + 1, month=1) - timedelta(days=1)
             else:
-                end_date = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
+                end_date = start_date.replace(month=target_date.month + 1) - timedelta(days=1)
             period_desc = f"{target_date.strftime('%Y년 %m월')}"
         else:
-            # 지난 30일
-            end_date = datetime.now()
+            # 지난 30일 (오늘 포함)
+            end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             start_date = end_date - timedelta(days=30)
             period_desc = "Last 30 Days"
         
-        print(f"=== 📆 Monthly Analysis Report{' - ' + stock_code if stock_code else ''} ===")
+        print(f"=== 📆 Monthly Analysis Report{' - ' + _stock_label(stock_code) if stock_code else ''} ===")
         print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Period: {period_desc} ({start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')})")
         print("=" * 70)
         
         # 월간 데이터 분석
-        query = f"""
-        SELECT 
-            sp.date,
-            sp.stock_code,
-            pa.sentiment_score,
-            pa.sentiment_label,
-            pa.bullish_bearish,
-            DAYNAME(sp.date) as day_name,
-            WEEK(sp.date) as week_number,
-            DAY(sp.date) as day_of_month,
-            HOUR(sp.date) as hour_of_day
-        FROM stock_posts sp
-        JOIN post_analysis pa ON sp.id = pa.post_id
-        WHERE sp.date >= '{start_date.strftime('%Y-%m-%d')}'
-        AND sp.date <= '{end_date.strftime('%Y-%m-%d')}'
-        """
+        # 마지막 날까지 포함하도록 다음 날 0시를 끝으로 하는 반개구간 [start_date, end_date + 1일)
+        cells = self._load_cells(stock_code, start_date, end_date + timedelta(days=1))
         
-        if stock_code:
-            query += f" AND sp.stock_code = '{stock_code}'"
-            
-        df = pd.read_sql(query, self.connection)
-        
-        if df.empty:
+        if cells.empty:
             print("⚠️  No data available for the specified period.")
             return None
         
         # 월간 요약 통계
-        total_posts = len(df)
-        avg_sentiment = df['sentiment_score'].mean()
-        bullish_ratio = (df['bullish_bearish'] == 'bullish').mean()
-        bearish_ratio = (df['bullish_bearish'] == 'bearish').mean()
-        neutral_ratio = (df['bullish_bearish'] == 'neutral').mean()
+        overall = _overall(cells)
+        total_posts = overall['total_posts']
+        avg_sentiment = overall['avg_sentiment']
+        bullish_ratio = overall['bullish_ratio']
+        bearish_ratio = overall['bearish_ratio']
+        neutral_ratio = overall['neutral_ratio']
         
         # 주별 분석
-        df['week_start'] = df['date'].dt.to_period('W').dt.start_time
-        weekly_stats = df.groupby('week_start').agg({
-            'sentiment_score': ['count', 'mean'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        weekly_stats = _group_stats(cells, 'week_start', stats=('count', 'mean'))
         
         # 요일별 종합 분석
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        daily_comprehensive = df.groupby('day_name').agg({
-            'sentiment_score': ['count', 'mean', 'std'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
-        daily_comprehensive = daily_comprehensive.reindex([day for day in day_order if day in daily_comprehensive.index])
+        daily_comprehensive = _group_stats(cells, 'day_name')
+        daily_comprehensive = daily_comprehensive.reindex([day for day in DAY_ORDER if day in daily_comprehensive.index])
         
         # 장시간 vs 장외시간 월간 비교
-        df['market_session'] = df['hour_of_day'].apply(
-            lambda x: 'Market Hours' if 9 <= x <= 15 else 'After Hours'
-        )
-        
-        session_comprehensive = df.groupby('market_session').agg({
-            'sentiment_score': ['count', 'mean', 'std'],
-            'bullish_bearish': lambda x: (x == 'bullish').mean()
-        }).round(4)
+        session_comprehensive = _group_stats(cells, 'market_session')
         
         print(f"\n📊 Monthly Summary:")
         print(f"   • Total Posts: {total_posts:,}")
@@ -746,8 +864,8 @@ class PatternAnalyzer:
             print(f"   • {session}: {posts:4d}개 ({ratio:.1%}) | Sentiment: {sentiment:6.3f}±{std_dev:.3f} | Bullish: {bullish:.1%}")
         
         # 감정 변동성 분석
-        sentiment_volatility = df['sentiment_score'].std()
-        daily_sentiment_avg = df.groupby(df['date'].dt.date)['sentiment_score'].mean()
+        sentiment_volatility = overall['sentiment_std']
+        daily_sentiment_avg = _sentiment_by(cells, 'date')
         
         if len(daily_sentiment_avg) > 1:
             overall_trend = "📈 Improving" if daily_sentiment_avg.iloc[-1] > daily_sentiment_avg.iloc[0] else "📉 Declining"
@@ -759,25 +877,24 @@ class PatternAnalyzer:
             print(f"   • Lowest Daily Avg: {daily_sentiment_avg.min():.4f}")
         
         # 시간대별 활동 패턴
-        hourly_activity = df.groupby('hour_of_day').size()
+        hourly_activity = _posts_by(cells, 'hour_of_day')
         peak_hour = hourly_activity.idxmax()
         quiet_hour = hourly_activity.idxmin()
+        market_hours_posts = cells.loc[cells['market_session'] == 'Market Hours', 'posts'].sum()
         
         print(f"\n⏰ Activity Patterns:")
         print(f"   • Peak Hour: {peak_hour}:00 ({hourly_activity[peak_hour]} posts)")
         print(f"   • Quiet Hour: {quiet_hour}:00 ({hourly_activity[quiet_hour]} posts)")
-        print(f"   • Market Hours Activity: {(df['market_session'] == 'Market Hours').mean():.1%}")
+        print(f"   • Market Hours Activity: {market_hours_posts / total_posts:.1%}")
         
         # 월말 vs 월초 비교 (30일 이상 데이터가 있는 경우)
         if (end_date - start_date).days >= 29:
-            df['period_section'] = df['day_of_month'].apply(
-                lambda x: 'Month Start' if x <= 10 else 'Month End' if x >= 21 else 'Month Middle'
+            cells['period_section'] = np.select(
+                [cells['day_of_month'] <= 10, cells['day_of_month'] >= 21],
+                ['Month Start', 'Month End'], default='Month Middle'
             )
             
-            section_stats = df.groupby('period_section').agg({
-                'sentiment_score': ['count', 'mean'],
-                'bullish_bearish': lambda x: (x == 'bullish').mean()
-            }).round(4)
+            section_stats = _group_stats(cells, 'period_section', stats=('count', 'mean'))
             
             if len(section_stats) > 1:
                 print(f"\n📅 Month Period Analysis:")
@@ -790,7 +907,7 @@ class PatternAnalyzer:
         
         # 시각화
         output_dir = self._create_output_directory(target_date)
-        generated_file = self._plot_monthly_patterns(df, stock_code, period_desc, output_dir=output_dir)
+        generated_file = self._plot_monthly_patterns(cells, stock_code, period_desc, output_dir=output_dir)
 
         # README 업데이트 (실제 생성된 파일만 반영)
         if generated_file:
@@ -809,17 +926,17 @@ class PatternAnalyzer:
             'session_analysis': session_comprehensive
         }
     
-    def _plot_pre_market_patterns(self, yesterday_df, early_df, stock_code=None, output_dir=None):
+    def _plot_pre_market_patterns(self, yesterday_cells, early_cells, stock_code=None, output_dir=None):
         """장시작 전 리포트 시각화"""
         
-        title_suffix = f" - {stock_code}" if stock_code else ""
+        title_suffix = f" - {_stock_label(stock_code)}" if stock_code else ""
         
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         fig.suptitle(f'🌅 Pre-Market Analysis{title_suffix}', fontsize=16)
         
         # 1. 전일 시간대별 활동
-        if not yesterday_df.empty:
-            hourly_counts = yesterday_df.groupby('hour_of_day').size()
+        if not yesterday_cells.empty:
+            hourly_counts = _posts_by(yesterday_cells, 'hour_of_day')
             axes[0, 0].bar(hourly_counts.index, hourly_counts.values, alpha=0.7, color='skyblue')
             axes[0, 0].set_title("Yesterday's Hourly Activity")
             axes[0, 0].set_xlabel('Hour of Day')
@@ -828,8 +945,8 @@ class PatternAnalyzer:
             axes[0, 0].legend()
         
         # 2. 전일 감정 분포
-        if not yesterday_df.empty:
-            sentiment_counts = yesterday_df['sentiment_label'].value_counts()
+        if not yesterday_cells.empty:
+            sentiment_counts = _label_counts(yesterday_cells)
             colors = ['#ff9999', '#66b3ff', '#99ff99']
             axes[0, 1].pie(sentiment_counts.values, labels=sentiment_counts.index, 
                           autopct='%1.1f%%', colors=colors[:len(sentiment_counts)])
@@ -839,13 +956,13 @@ class PatternAnalyzer:
         comparison_data = []
         comparison_labels = []
         
-        if not yesterday_df.empty:
-            after_hours = yesterday_df[yesterday_df['hour_of_day'] >= 16]
-            comparison_data.append(len(after_hours))
+        if not yesterday_cells.empty:
+            after_hours = yesterday_cells[yesterday_cells['hour_of_day'] >= 16]
+            comparison_data.append(int(after_hours['posts'].sum()))
             comparison_labels.append('After Hours\n(Yesterday)')
         
-        if not early_df.empty:
-            comparison_data.append(len(early_df))
+        if not early_cells.empty:
+            comparison_data.append(int(early_cells['posts'].sum()))
             comparison_labels.append('Early Morning\n(Today)')
         
         if comparison_data:
@@ -857,12 +974,12 @@ class PatternAnalyzer:
         sentiment_data = []
         sentiment_labels = []
         
-        if not yesterday_df.empty:
-            sentiment_data.append(yesterday_df['sentiment_score'].mean())
+        if not yesterday_cells.empty:
+            sentiment_data.append(_overall(yesterday_cells)['avg_sentiment'])
             sentiment_labels.append('Yesterday\nOverall')
         
-        if not early_df.empty:
-            sentiment_data.append(early_df['sentiment_score'].mean())
+        if not early_cells.empty:
+            sentiment_data.append(_overall(early_cells)['avg_sentiment'])
             sentiment_labels.append('Early Morning\n(Today)')
         
         if sentiment_data:
@@ -884,23 +1001,23 @@ class PatternAnalyzer:
         # 파일명 저장 날짜를 output_dir 기준 폴더명(YYYYMMDD)으로 맞춤
         folder_date = os.path.basename(output_dir)
 
-        filename = f"pre_market_report_{stock_code}_{folder_date}.png" if stock_code else f"pre_market_report_{folder_date}.png"
+        filename = f"pre_market_report_{_stock_label(stock_code, '_')}_{folder_date}.png" if stock_code else f"pre_market_report_{folder_date}.png"
         filepath = os.path.join(output_dir, filename)
         plt.savefig(filepath, dpi=300, bbox_inches='tight')
         plt.close()
         print(f"📊 Pre-market chart saved: {filepath}")
         return filename
     
-    def _plot_post_market_patterns(self, df, stock_code=None, output_dir=None):
+    def _plot_post_market_patterns(self, cells, stock_code=None, output_dir=None):
         """장마감 후 리포트 시각화"""
         
-        title_suffix = f" - {stock_code}" if stock_code else ""
+        title_suffix = f" - {_stock_label(stock_code)}" if stock_code else ""
         
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         fig.suptitle(f'🌆 Post-Market Analysis{title_suffix}', fontsize=16)
         
         # 1. 장시간 시간대별 활동
-        hourly_counts = df.groupby('hour_of_day').size()
+        hourly_counts = _posts_by(cells, 'hour_of_day')
         bars = axes[0, 0].bar(hourly_counts.index, hourly_counts.values, alpha=0.7, color='lightcoral')
         axes[0, 0].set_title("Trading Hours Activity")
         axes[0, 0].set_xlabel('Hour of Day')
@@ -914,7 +1031,7 @@ class PatternAnalyzer:
         bars[peak_bar_idx].set_alpha(1.0)
         
         # 2. 시간대별 감정 변화
-        hourly_sentiment = df.groupby('hour_of_day')['sentiment_score'].mean()
+        hourly_sentiment = _sentiment_by(cells, 'hour_of_day')
         axes[0, 1].plot(hourly_sentiment.index, hourly_sentiment.values, 
                        marker='o', linewidth=2, markersize=8, color='blue')
         axes[0, 1].fill_between(hourly_sentiment.index, hourly_sentiment.values, 
@@ -926,9 +1043,10 @@ class PatternAnalyzer:
         axes[0, 1].set_xticks(range(9, 16))
         
         # 3. 강세/약세 비율
-        bullish_ratio = (df['bullish_bearish'] == 'bullish').mean()
-        bearish_ratio = (df['bullish_bearish'] == 'bearish').mean()
-        neutral_ratio = (df['bullish_bearish'] == 'neutral').mean()
+        overall = _overall(cells)
+        bullish_ratio = overall['bullish_ratio']
+        bearish_ratio = overall['bearish_ratio']
+        neutral_ratio = overall['neutral_ratio']
         
         ratios = [bullish_ratio, bearish_ratio, neutral_ratio]
         labels = ['Bullish', 'Bearish', 'Neutral']
@@ -962,25 +1080,24 @@ class PatternAnalyzer:
             output_dir = self._create_output_directory()
         # 파일명 저장 날짜를 output_dir 기준 폴더명(YYYYMMDD)으로 맞춤
         folder_date = os.path.basename(output_dir)
-        filename = f"post_market_report_{stock_code}_{folder_date}.png" if stock_code else f"post_market_report_{folder_date}.png"
+        filename = f"post_market_report_{_stock_label(stock_code, '_')}_{folder_date}.png" if stock_code else f"post_market_report_{folder_date}.png"
         filepath = os.path.join(output_dir, filename)
         plt.savefig(filepath, dpi=300, bbox_inches='tight')
         plt.close()
         print(f"📊 Post-market chart saved: {filepath}")
         return filename
     
-    def _plot_weekly_patterns(self, df, stock_code=None, output_dir=None):
+    def _plot_weekly_patterns(self, cells, stock_code=None, output_dir=None):
         """주간 리포트 시각화"""
         
-        title_suffix = f" - {stock_code}" if stock_code else ""
+        title_suffix = f" - {_stock_label(stock_code)}" if stock_code else ""
         
         fig, axes = plt.subplots(3, 3, figsize=(18, 15))
         fig.suptitle(f'📅 Weekly Analysis{title_suffix}', fontsize=16)
         
         # 1. 요일별 게시글 수
-        daily_counts = df.groupby('day_name').size()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        daily_counts = daily_counts.reindex([day for day in day_order if day in daily_counts.index])
+        daily_counts = _posts_by(cells, 'day_name')
+        daily_counts = daily_counts.reindex([day for day in DAY_ORDER if day in daily_counts.index])
         
         bars = axes[0, 0].bar(range(len(daily_counts)), daily_counts.values, color='lightblue')
         axes[0, 0].set_title('Posts by Day of Week')
@@ -995,8 +1112,7 @@ class PatternAnalyzer:
             bars[max_idx].set_color('red')
         
         # 2. 요일별 평균 감정 점수
-        df['week_start'] = df['date'].dt.to_period('W').dt.start_time
-        weekly_sentiment = df.groupby('week_start')['sentiment_score'].mean()
+        weekly_sentiment = _sentiment_by(cells, 'week_start')
         
         colors = ['green' if x > 0 else 'red' for x in weekly_sentiment.values]
         axes[0, 1].bar(range(len(weekly_sentiment)), weekly_sentiment.values, color=colors, alpha=0.7)
@@ -1009,8 +1125,8 @@ class PatternAnalyzer:
         axes[0, 1].set_xticklabels(week_labels)
         
         # 3. 요일별 감정 점수
-        daily_sentiment = df.groupby('day_name')['sentiment_score'].mean()
-        daily_sentiment = daily_sentiment.reindex([day for day in day_order if day in daily_sentiment.index])
+        daily_sentiment = _sentiment_by(cells, 'day_name')
+        daily_sentiment = daily_sentiment.reindex([day for day in DAY_ORDER if day in daily_sentiment.index])
         
         colors = ['green' if x > 0 else 'red' for x in daily_sentiment.values]
         axes[0, 2].bar(range(len(daily_sentiment)), daily_sentiment.values, color=colors, alpha=0.7)
@@ -1022,7 +1138,7 @@ class PatternAnalyzer:
         axes[0, 2].set_xticklabels([day[:3] for day in daily_sentiment.index], rotation=45)
         
         # 4. 일별 감정 점수 변화 (전체 기간)
-        daily_sentiment_trend = df.groupby(df['date'].dt.date)['sentiment_score'].mean()
+        daily_sentiment_trend = _sentiment_by(cells, 'date')
         
         axes[1, 0].plot(daily_sentiment_trend.index, daily_sentiment_trend.values, 
                        marker='.', linewidth=1, markersize=4, alpha=0.8)
@@ -1035,8 +1151,8 @@ class PatternAnalyzer:
         axes[1, 0].axhline(y=0, color='red', linestyle='--', alpha=0.5)
         
         # 5. 시간대별 활동 히트맵 (요일별)
-        activity_matrix = df.groupby(['day_name', 'hour_of_day']).size().unstack(fill_value=0)
-        activity_matrix = activity_matrix.reindex([day for day in day_order if day in activity_matrix.index])
+        activity_matrix = _posts_by(cells, ['day_name', 'hour_of_day']).unstack(fill_value=0)
+        activity_matrix = activity_matrix.reindex([day for day in DAY_ORDER if day in activity_matrix.index])
         
         if HAS_SEABORN:
             sns.heatmap(activity_matrix, ax=axes[1, 1], cmap='YlOrRd', 
@@ -1054,18 +1170,14 @@ class PatternAnalyzer:
         axes[1, 1].set_ylabel('Day of Week')
         
         # 6. 감정 분포 파이차트
-        sentiment_dist = df['sentiment_label'].value_counts()
+        sentiment_dist = _label_counts(cells)
         colors = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99']
         axes[1, 2].pie(sentiment_dist.values, labels=sentiment_dist.index, 
                       autopct='%1.1f%%', colors=colors[:len(sentiment_dist)])
         axes[1, 2].set_title('Overall Sentiment Distribution')
         
         # 7. 장시간 vs 장외시간 비교
-        df['market_session'] = df['hour_of_day'].apply(
-            lambda x: 'Market Hours' if 9 <= x <= 15 else 'After Hours'
-        )
-        
-        session_counts = df.groupby('market_session').size()
+        session_counts = _posts_by(cells, 'market_session')
         
         # 게시글 수 비교
         axes[2, 0].bar(session_counts.index, session_counts.values, 
@@ -1080,9 +1192,7 @@ class PatternAnalyzer:
                            ha='center', va='bottom')
         
         # 8. 강세/약세 비율 트렌드 (주별)
-        weekly_bullish = df.groupby('week_start').apply(
-            lambda x: (x['bullish_bearish'] == 'bullish').mean()
-        )
+        weekly_bullish = _ratio_by(cells, 'week_start', 'bullish')
         
         axes[2, 1].plot(range(len(weekly_bullish)), weekly_bullish.values, 
                        marker='o', linewidth=2, markersize=8, color='green')
@@ -1097,7 +1207,7 @@ class PatternAnalyzer:
         axes[2, 1].set_ylim(0, 1)
         
         # 9. 시간대별 평균 감정 점수
-        hourly_sentiment = df.groupby('hour_of_day')['sentiment_score'].mean()
+        hourly_sentiment = _sentiment_by(cells, 'hour_of_day')
         
         colors = ['green' if x > 0 else 'red' for x in hourly_sentiment.values]
         bars = axes[2, 2].bar(hourly_sentiment.index, hourly_sentiment.values, 
@@ -1119,23 +1229,23 @@ class PatternAnalyzer:
         # 파일명 저장 날짜를 output_dir 기준 폴더명(YYYYMMDD)으로 맞춤
         folder_date = os.path.basename(output_dir)
 
-        filename = f"weekly_report_{stock_code}_{folder_date}.png" if stock_code else f"weekly_report_{folder_date}.png"
+        filename = f"weekly_report_{_stock_label(stock_code, '_')}_{folder_date}.png" if stock_code else f"weekly_report_{folder_date}.png"
         filepath = os.path.join(output_dir, filename)
         plt.savefig(filepath, dpi=300, bbox_inches='tight')
         plt.close()
         print(f"📊 Weekly chart saved: {filepath}")
         return filename
     
-    def _plot_monthly_patterns(self, df, stock_code=None, period_desc="", output_dir=None):
+    def _plot_monthly_patterns(self, cells, stock_code=None, period_desc="", output_dir=None):
         """월간 리포트 시각화"""
         
-        title_suffix = f" - {stock_code}" if stock_code else ""
+        title_suffix = f" - {_stock_label(stock_code)}" if stock_code else ""
         
         fig, axes = plt.subplots(3, 3, figsize=(18, 15))
         fig.suptitle(f'📆 Monthly Analysis{title_suffix}', fontsize=16)
         
         # 1. 일별 게시글 수
-        daily_counts = df.groupby('date').size()
+        daily_counts = _posts_by(cells, 'date')
         axes[0, 0].bar(daily_counts.index, daily_counts.values, color='lightblue')
         axes[0, 0].set_title('Posts by Date')
         axes[0, 0].set_xlabel('Date')
@@ -1143,7 +1253,7 @@ class PatternAnalyzer:
         axes[0, 0].tick_params(axis='x', rotation=45)
         
         # 2. 일별 평균 감정 점수
-        daily_sentiment = df.groupby('date')['sentiment_score'].mean()
+        daily_sentiment = _sentiment_by(cells, 'date')
         axes[0, 1].plot(daily_sentiment.index, daily_sentiment.values, marker='o', color='blue')
         axes[0, 1].set_title('Average Sentiment by Date')
         axes[0, 1].set_xlabel('Date')
@@ -1152,7 +1262,7 @@ class PatternAnalyzer:
         axes[0, 1].tick_params(axis='x', rotation=45)
         
         # 3. 월별 게시글 수
-        monthly_counts = df.groupby(df['date'].dt.to_period("M")).size()
+        monthly_counts = _posts_by(cells, 'month')
         axes[0, 2].bar(monthly_counts.index.astype(str), monthly_counts.values, color='lightgreen')
         axes[0, 2].set_title('Posts by Month')
         axes[0, 2].set_xlabel('Month')
@@ -1160,7 +1270,7 @@ class PatternAnalyzer:
         axes[0, 2].tick_params(axis='x', rotation=45)
         
         # 4. 월별 평균 감정 점수
-        monthly_sentiment = df.groupby(df['date'].dt.to_period("M"))['sentiment_score'].mean()
+        monthly_sentiment = _sentiment_by(cells, 'month')
         axes[1, 0].plot(monthly_sentiment.index.astype(str), monthly_sentiment.values, marker='o', color='green')
         axes[1, 0].set_title('Average Sentiment by Month')
         axes[1, 0].set_xlabel('Month')
@@ -1169,7 +1279,7 @@ class PatternAnalyzer:
         axes[1, 0].tick_params(axis='x', rotation=45)
         
         # 5. 주별 게시글 수
-        weekly_counts = df.groupby(df['date'].dt.to_period("W")).size()
+        weekly_counts = _posts_by(cells, cells['date'].dt.to_period("W"))
         axes[1, 1].bar(weekly_counts.index.astype(str), weekly_counts.values, color='salmon')
         axes[1, 1].set_title('Posts by Week')
         axes[1, 1].set_xlabel('Week')
@@ -1177,7 +1287,7 @@ class PatternAnalyzer:
         axes[1, 1].tick_params(axis='x', rotation=45)
         
         # 6. 주별 평균 감정 점수
-        weekly_sentiment = df.groupby(df['date'].dt.to_period("W"))['sentiment_score'].mean()
+        weekly_sentiment = _sentiment_by(cells, cells['date'].dt.to_period("W"))
         axes[1, 2].plot(weekly_sentiment.index.astype(str), weekly_sentiment.values, marker='o', color='orange')
         axes[1, 2].set_title('Average Sentiment by Week')
         axes[1, 2].set_xlabel('Week')
@@ -1186,18 +1296,14 @@ class PatternAnalyzer:
         axes[1, 2].tick_params(axis='x', rotation=45)
         
         # 7. 감정 분포 파이차트
-        sentiment_dist = df['sentiment_label'].value_counts()
+        sentiment_dist = _label_counts(cells)
         colors = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99']
         axes[2, 0].pie(sentiment_dist.values, labels=sentiment_dist.index, 
                       autopct='%1.1f%%', colors=colors[:len(sentiment_dist)])
         axes[2, 0].set_title('Overall Sentiment Distribution')
         
         # 8. 장시간 vs 장외시간 비교
-        df['market_session'] = df['hour_of_day'].apply(
-            lambda x: 'Market Hours' if 9 <= x <= 15 else 'After Hours'
-        )
-        
-        session_counts = df.groupby('market_session').size()
+        session_counts = _posts_by(cells, 'market_session')
         
         # 게시글 수 비교
         axes[2, 1].bar(session_counts.index, session_counts.values, 
@@ -1212,9 +1318,7 @@ class PatternAnalyzer:
                            ha='center', va='bottom')
         
         # 9. 강세/약세 비율 트렌드 (월별)
-        monthly_bullish = df.groupby(df['date'].dt.to_period("M")).apply(
-            lambda x: (x['bullish_bearish'] == 'bullish').mean()
-        )
+        monthly_bullish = _ratio_by(cells, 'month', 'bullish')
         
         axes[2, 2].plot(monthly_bullish.index.astype(str), monthly_bullish.values, 
                        marker='o', linewidth=2, markersize=8, color='green')
@@ -1236,7 +1340,7 @@ class PatternAnalyzer:
         # 파일명 저장 날짜를 output_dir 기준 폴더명(YYYYMMDD)으로 맞춤
         folder_date = os.path.basename(output_dir)
 
-        filename = f"monthly_report_{stock_code}_{folder_date}.png" if stock_code else f"monthly_report_{folder_date}.png"
+        filename = f"monthly_report_{_stock_label(stock_code, '_')}_{folder_date}.png" if stock_code else f"monthly_report_{folder_date}.png"
         filepath = os.path.join(output_dir, filename)
         plt.savefig(filepath, dpi=300, bbox_inches='tight')
         plt.close()
@@ -1275,15 +1379,17 @@ class PatternAnalyzer:
 if __name__ == "__main__":
     import sys
 
-    analyzer = PatternAnalyzer()
-
     # 파라미터 파싱
-    args = sys.argv[1:]
-    # 사용법: python pattern_analyzer.py [report_type] [date]
+    args = [arg for arg in sys.argv[1:] if arg != '--refresh']
+    # 사용법: python pattern_analyzer.py [report_type] [date] [stock_code,...] [--refresh]
     # 예시: python pattern_analyzer.py pre_market 20250706
+    #       python pattern_analyzer.py weekly 20250706 005930,000660  (여러 종목 합산)
+    #       --refresh: 리포트 전에 hourly_sentiment_cube 증분 갱신 (분석 직후가 아니면 summary_rollup.py 대신 사용)
+    analyzer = PatternAnalyzer(refresh_cube='--refresh' in sys.argv)
 
     report_type = args[0] if len(args) > 0 else None
     date_arg = args[1] if len(args) > 1 else None
+    stock_arg = args[2].split(',') if len(args) > 2 else None
 
     # 날짜 파싱
     target_date = None
@@ -1299,19 +1405,19 @@ if __name__ == "__main__":
 
     if report_type == "pre_market":
         print(f"\n🌅 Generating Pre-Market Report for {target_date}")
-        analyzer.generate_pre_market_report(target_date=target_date)
+        analyzer.generate_pre_market_report(stock_arg, target_date=target_date)
     elif report_type == "post_market":
         print(f"\n🌆 Generating Post-Market Report for {target_date}")
-        analyzer.generate_post_market_report(target_date=target_date)
+        analyzer.generate_post_market_report(stock_arg, target_date=target_date)
     elif report_type == "weekly":
         print(f"\n📅 Generating Weekly Report for {target_date}")
-        analyzer.generate_weekly_report(target_date=target_date)
+        analyzer.generate_weekly_report(stock_arg, target_date=target_date)
     elif report_type == "monthly":
         print(f"\n📆 Generating Monthly Report for {target_date}")
-        analyzer.generate_monthly_report(target_date=target_date)
+        analyzer.generate_monthly_report(stock_arg, target_date=target_date)
     elif report_type == "summary":
         print(f"\n📊 Generating General Analysis Report for {target_date}")
-        analyzer.generate_summary_report(target_date=target_date)
+        analyzer.generate_summary_report(stock_arg, target_date=target_date)
     else:
         # 파라미터 없으면 기존 전체 실행
         print("📊 Starting comprehensive pattern analysis...")
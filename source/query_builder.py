@@ -0,0 +1,84 @@
+"""
+쿼리 빌더 - 리포트/분석 쿼리에서 공통으로 쓰는 조건(종목, 기간)과 조인을 바인딩 파라미터 text() 문으로 생성
+
+조건 값은 SQL 문자열에 넣지 않고 항상 :파라미터로 바인딩하므로, 모양이 같은 쿼리는 값과 관계없이
+같은 문장이 되어 statement() 캐시에서 재사용됩니다 (SQLAlchemy 컴파일 캐시와 서버 쪽 문장 통계도 공유).
+여러 종목은 expanding 파라미터로 하나의 IN (...) 조건에 묶어 한 번에 조회합니다.
+"""
+
+from functools import lru_cache
+from sqlalchemy import bindparam, text
+
+# 게시글 + 분석 결과 조인
+POSTS_JOIN = "stock_posts sp JOIN post_analysis pa ON sp.id = pa.post_id"
+
+
+def stock_codes(stock_code):
+    """종목 지정값(None, 문자열, 목록)을 중복 없는 종목코드 튜플로 변환 (빈 튜플이면 전체 종목)"""
+    if not stock_code:
+        return ()
+    if isinstance(stock_code, str):
+        return (stock_code,)
+    return tuple(sorted(set(stock_code)))
+
+
+@lru_cache(maxsize=256)
+def statement(sql, expanding=()):
+    """SQL 문자열로 text() 문 생성 (같은 문자열이면 캐시된 객체를 그대로 반환)"""
+    query = text(sql)
+    if expanding:
+        query = query.bindparams(*(bindparam(name, expanding=True) for name in expanding))
+    return query
+
+
+class QueryFilter:
+    """WHERE 조건과 바인딩 값을 함께 모으는 빌더 (메서드는 체이닝 가능)"""
+
+    def __init__(self):
+        self.conditions = []
+        self.params = {}
+        self.expanding = []
+
+    def copy(self):
+        """조건을 더 붙여도 원본이 바뀌지 않도록 복사"""
+        other = QueryFilter()
+        other.conditions = list(self.conditions)
+        other.params = dict(self.params)
+        other.expanding = list(self.expanding)
+        return other
+
+    def where(self, condition, **params):
+        """임의 조건 추가 (값은 반드시 :이름 파라미터로 전달)"""
+        self.conditions.append(condition)
+        self.params.update(params)
+        return self
+
+    def stocks(self, stock_code, column='sp.stock_code', name='stock_codes'):
+        """종목 조건 - 하나 또는 여러 종목을 IN (...)으로 조회 (지정하지 않으면 조건 없음)"""
+        codes = stock_codes(stock_code)
+        if codes:
+            self.conditions.append(f"{column} IN :{name}")
+            self.params[name] = list(codes)
+            self.expanding.append(name)
+        return self
+
+    def window(self, start=None, end=None, column='sp.date', start_name='start', end_name='end'):
+        """기간 조건 - 반개구간 [start, end) (인덱스 컬럼을 함수로 감싸지 않고 비교)"""
+        if start is not None:
+            self.where(f"{column} >= :{start_name}", **{start_name: start})
+        if end is not None:
+            self.where(f"{column} < :{end_name}", **{end_name: end})
+        return self
+
+    def sql(self, base, suffix=''):
+        """base(SELECT ... FROM ...) 뒤에 WHERE 조건과 suffix(GROUP BY/ORDER BY/LIMIT)를 붙인 SQL"""
+        parts = [base]
+        if self.conditions:
+            parts.append("WHERE " + " AND ".join(self.conditions))
+        if suffix:
+            parts.append(suffix)
+        return "\n".join(parts)
+
+    def build(self, base, suffix=''):
+        """(캐시된 text() 문, 바인딩 값 dict) 반환"""
+        return statement(self.sql(base, suffix), tuple(self.expanding)), dict(self.params)
@@ -0,0 +1,263 @@
+"""
+본문 재추출 - HTML 캐시(html_cache.py)에 보관된 게시글 페이지에서 본문을 다시 추출
+
+추출기(content_extractor.py)를 고친 뒤 과거 게시글에 적용하거나, 바뀐 추출 결과를 확인할 때 사용합니다.
+네이버에 요청하지 않고 캐시된 원본 HTML만 읽으며, 추출은 CPU 작업이므로 multiprocessing 풀에서 병렬로 처리합니다.
+- apply: 본문이 바뀐 게시글의 content/content_strategy를 chunk 단위로 저장하고 바뀐 본문으로 감정 분석도 다시 저장
+  (post_analysis.post_id UNIQUE 키가 있어야 실행되며, 분석 행이 게시글당 한 행을 넘게 늘어나면 중단)
+- diff: 저장하지 않고 바뀐 게시글과 본문 차이만 보고 (회귀 확인용, 바뀐 게시글이 있으면 종료 코드 1)
+
+새 추출 결과가 빈 본문이면 기존 본문을 덮어쓰지 않고 'emptied'로 따로 집계합니다.
+"""
+
+import difflib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from sqlalchemy import bindparam, text
+from config import HTML_CACHE_CONFIG
+from content_extractor import extract_post_content
+from database import get_db_connection
+from html_cache import HtmlCache, post_key
+from query_builder import QueryFilter, stock_codes
+from sentiment_analyzer import AnalysisResultWriter, analyze_post_texts, has_unique_post_id
+
+logger = logging.getLogger(__name__)
+
+_STRATEGY_UPDATE_QUERY = text("UPDATE stock_posts SET content_strategy = :content_strategy WHERE id = :post_id")
+
+_ANALYSIS_ROWS_QUERY = text(
+    "SELECT COUNT(*), COUNT(DISTINCT post_id) FROM post_analysis WHERE post_id IN :post_ids"
+).bindparams(bindparam('post_ids', expanding=True))
+
+# 작업 프로세스의 캐시 (_init_worker()에서 생성)
+_worker_cache = None
+
+
+def _init_worker(cache_dir):
+    global _worker_cache
+    _worker_cache = HtmlCache(cache_dir, HTML_CACHE_CONFIG['max_mb'] * 1024 * 1024, HTML_CACHE_CONFIG['list_ttl'])
+
+
+def _extract_archived(task):
+    """작업 프로세스: (post_id, 종목코드, 글 번호) -> (post_id, 본문, 추출 방법) - 캐시에 없으면 본문 None"""
+    post_id, stock_code, nid = task
+    html = _worker_cache.get(None, key=post_key(stock_code, nid))
+    if html is None:
+        return post_id, None, None
+    content, strategy = extract_post_content(html, stats=None)
+    return post_id, content, strategy
+
+
+def _posts_filter(stock_code, since=None, until=None):
+    return (
+        QueryFilter()
+        .where("sp.nid IS NOT NULL")
+        .stocks(stock_code)
+        .window(since, until)
+    )
+
+
+def _count_posts(engine, query_filter):
+    query, params = query_filter.build("SELECT COUNT(*)\nFROM stock_posts sp")
+    with engine.connect() as conn:
+        return conn.execute(query, params).scalar() or 0
+
+
+def _iter_chunks(engine, query_filter, chunk_size):
+    """게시글을 id 순서로 chunk_size건씩 읽음 (keyset)"""
+    query, params = query_filter.copy().where("sp.id > :last_id", last_id=0).build(
+        "SELECT sp.id, sp.stock_code, sp.nid, sp.title, sp.content, sp.content_strategy\nFROM stock_posts sp",
+        "ORDER BY sp.id\nLIMIT :chunk_size"
+    )
+    params['chunk_size'] = chunk_size
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(query, params).mappings().all()
+        if not rows:
+            return
+        yield rows
+        params['last_id'] = rows[-1]['id']
+
+
+def _content_diff(old, new, context=1):
+    """본문 줄 단위 차이 (unified diff)"""
+    return '\n'.join(difflib.unified_diff(
+        (old or '').split('\n'), (new or '').split('\n'), 'stored', 'replayed', n=context, lineterm=''
+    ))
+
+
+def replay_extraction(stock_code=None, apply=False, since=None, until=None, workers=None, chunk_size=2000,
+                      cache_dir=None, show=20, out_path=None):
+    """캐시된 HTML에서 본문을 다시 추출해 저장된 본문과 비교하고, apply=True이면 바뀐 본문을 저장
+
+    since/until: 게시글 날짜 범위 [since, until), workers: 추출 프로세스 수 (기본값 CPU 수),
+    show: 차이를 출력할 게시글 수, out_path: 바뀐 게시글 전체를 JSON Lines로 저장할 파일.
+    처리 건수/결과별 건수/추출 방법 변화/처리 속도를 담은 dict를 반환합니다.
+    """
+    cache_dir = cache_dir or HTML_CACHE_CONFIG['dir']
+    if not cache_dir or not os.path.isdir(cache_dir):
+        raise ValueError(f"HTML 캐시 디렉토리가 없습니다: {cache_dir or '(HTML_CACHE_DIR 미설정)'}")
+
+    engine = get_db_connection()
+    if engine is None:
+        raise RuntimeError("데이터베이스 연결 실패")
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    # 작업 프로세스가 DB 연결을 물려받지 않도록 연결을 열기 전에 풀 생성
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(cache_dir,))
+
+    query_filter = _posts_filter(stock_code, since, until)
+    results = Counter()
+    transitions = Counter()
+    shown = 0
+    started = time.monotonic()
+    out = open(out_path, 'w', encoding='utf-8') if out_path else None
+    writer = AnalysisResultWriter(batch_size=chunk_size, flush_interval=float('inf')) if apply else None
+
+    try:
+        with pool:
+            if apply:
+                with engine.connect() as conn:
+                    if not has_unique_post_id(conn):
+                        raise RuntimeError("post_analysis.post_id UNIQUE 키가 없습니다 (python migrations.py 실행 후 apply)")
+            total = _count_posts(engine, query_filter)
+            logger.info(f"본문 재추출 {'(저장)' if apply else '(비교만)'}: "
+                        f"{', '.join(stock_codes(stock_code)) or '전체 종목'}, 게시글 {total}건, "
+                        f"추출 프로세스 {workers}개, 캐시 {cache_dir}")
+
+            for rows in _iter_chunks(engine, query_filter, chunk_size):
+                by_id = {row['id']: row for row in rows}
+                tasks = [(row['id'], row['stock_code'], row['nid']) for row in rows]
+                changed, strategy_only = [], []
+
+                for post_id, content, strategy in pool.imap_unordered(_extract_archived, tasks, chunksize=64):
+                    row = by_id[post_id]
+                    old = row['content'] or ''
+                    if content is None:
+                        results['missing'] += 1
+                        continue
+                    transitions[(row['content_strategy'], strategy)] += 1
+                    if content == old:
+                        results['unchanged'] += 1
+                        if strategy != row['content_strategy']:
+                            strategy_only.append({'post_id': post_id, 'content_strategy': strategy})
+                        continue
+                    if not content:
+                        results['emptied'] += 1
+                        continue
+
+                    results['changed'] += 1
+                    changed.append((row, content, strategy))
+                    if shown < show:
+                        shown += 1
+                        logger.info(
+                            f"[{row['stock_code']}] 게시글 {post_id} (nid {row['nid']}) "
+                            f"{row['content_strategy']} -> {strategy}, {len(old)}자 -> {len(content)}자\n"
+                            f"{_content_diff(old, content)}"
+                        )
+                    if out:
+                        out.write(json.dumps({
+                            'post_id': post_id, 'stock_code': row['stock_code'], 'nid': row['nid'],
+                            'old_strategy': row['content_strategy'], 'new_strategy': strategy,
+                            'old_content': old, 'new_content': content
+                        }, ensure_ascii=False) + '\n')
+
+                if apply:
+                    _save_chunk(engine, writer, changed, strategy_only)
+
+                scanned = sum(results.values())
+                elapsed = time.monotonic() - started
+                rate = scanned / elapsed if elapsed > 0 else 0
+                eta = (total - scanned) / rate if rate > 0 else 0
+                logger.info(
+                    f"진행: {scanned}/{total}건 ({scanned / total if total else 1:.0%}), {rate:.0f}건/초, "
+                    f"남은 시간 약 {eta:.0f}초 - 변경 {results['changed']}, 동일 {results['unchanged']}, "
+                    f"빈 본문 {results['emptied']}, 캐시 없음 {results['missing']}"
+                )
+    finally:
+        if writer is not None:
+            writer.close()
+        if out:
+            out.close()
+
+    elapsed = time.monotonic() - started
+    scanned = sum(results.values())
+    summary = {
+        'scanned': scanned,
+        'changed': results['changed'],
+        'unchanged': results['unchanged'],
+        'emptied': results['emptied'],
+        'missing': results['missing'],
+        'written': writer.written if writer else 0,
+        'failed': writer.failed if writer else 0,
+        'elapsed_sec': round(elapsed, 2),
+        'posts_per_sec': round(scanned / elapsed, 1) if elapsed > 0 else 0.0,
+        'strategy_transitions': {f"{old} -> {new}": count for (old, new), count in transitions.most_common()}
+    }
+    logger.info(f"본문 재추출 완료: {json.dumps(summary, ensure_ascii=False)}")
+    return summary
+
+
+def _save_chunk(engine, writer, changed, strategy_only):
+    """바뀐 본문은 감정 분석과 함께 (AnalysisResultWriter), 추출 방법만 바뀐 게시글은 추출 방법만 저장
+
+    분석 결과는 기존 행을 덮어써야 하므로, 저장 전후 post_analysis 행 수를 비교해
+    분석 행이 없던 게시글의 새 행 외에 행이 늘어나면 RuntimeError를 발생시킵니다.
+    """
+    if changed:
+        post_ids = {'post_ids': [row['id'] for row, _, _ in changed]}
+        with engine.connect() as conn:
+            rows_before, posts_before = conn.execute(_ANALYSIS_ROWS_QUERY, post_ids).one()
+
+        texts = [f"{row['title'] or ''} {content}".strip() for row, content, _ in changed]
+        for (row, content, strategy), analysis in zip(changed, analyze_post_texts(texts)):
+            writer.add(row['id'], analysis, content=content, content_strategy=strategy)
+        writer.flush()
+
+        with engine.connect() as conn:
+            rows_after = conn.execute(_ANALYSIS_ROWS_QUERY, post_ids).one()[0]
+        added = rows_after - rows_before
+        if added > len(changed) - posts_before:
+            raise RuntimeError(
+                f"재분석 후 post_analysis 행이 {added}건 늘어남 (분석 행이 없던 게시글 "
+                f"{len(changed) - posts_before}건) - 기존 분석 행이 덮어써지지 않았습니다"
+            )
+    if strategy_only:
+        with engine.connect() as conn:
+            conn.execute(_STRATEGY_UPDATE_QUERY, strategy_only)
+            conn.commit()
+
+
+if __name__ == "__main__":
+    import sys
+    from config import setup_logging
+
+    setup_logging()
+
+    # 사용법: python replay_extraction.py [diff|apply] [stock_code,...] [--since=YYYY-MM-DD] [--until=YYYY-MM-DD]
+    #                                     [--workers=N] [--show=N] [--out=changes.jsonl] [--cache-dir=DIR]
+    #   diff: 저장하지 않고 바뀐 본문만 보고 (기본값, 바뀐 게시글이 있으면 종료 코드 1)
+    #   apply: 바뀐 본문과 감정 분석 결과 저장
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+    mode = args[0] if args else 'diff'
+    if mode not in ('diff', 'apply'):
+        print("사용법: python replay_extraction.py [diff|apply] [stock_code,...] [--since=YYYY-MM-DD] "
+              "[--until=YYYY-MM-DD] [--workers=N] [--show=N] [--out=changes.jsonl] [--cache-dir=DIR]")
+        sys.exit(1)
+
+    summary = replay_extraction(
+        args[1].split(',') if len(args) > 1 else None,
+        apply=(mode == 'apply'),
+        since=options.get('since'),
+        until=options.get('until'),
+        workers=int(options['workers']) if 'workers' in options else None,
+        show=int(options.get('show', 20)),
+        out_path=options.get('out'),
+        cache_dir=options.get('cache-dir')
+    )
+    sys.exit(1 if mode == 'diff' and summary['changed'] else 0)
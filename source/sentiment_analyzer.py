@@ -1,56 +1,58 @@
+import numpy as np
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+import atexit
 import json
-import time
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from database import get_db_connection
 from crawler import get_post_content
+from content_extractor import extraction_stats
+from keyword_matcher import get_lexicon
+from config import CRAWLING_CONFIG
+from query_builder import QueryFilter, stock_codes
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-def analyze_post_sentiment(content):
-    """게시글 감정 분석"""
+# analyze_posts_batch가 반환하는 레이블 코드의 의미 (코드 = 배열 인덱스)
+SENTIMENT_LABELS = np.array(['neutral', 'positive', 'negative'])
+BULLISH_BEARISH_LABELS = np.array(['neutral', 'bullish', 'bearish'])
+RISK_LEVELS = np.array(['low', 'medium', 'high'])
+
+def _empty_analysis(lexicon):
+    """키워드가 없거나 분석할 수 없는 게시글의 기본 결과"""
+    return {
+        'sentiment_score': 0.0,
+        'sentiment_label': 'neutral',
+        'confidence_score': 0.0,
+        'keywords': [],
+        'bullish_bearish': 'neutral',
+        'risk_level': 'low',
+        'analysis_model': lexicon.model,
+        'analysis_version': lexicon.analysis_version
+    }
+
+def analyze_post_sentiment(content, lexicon=None):
+    """게시글 감정 분석 (lexicon을 주지 않으면 설정된 사전 파일의 현재 버전 사용)"""
+    lexicon = lexicon or get_lexicon()
+    thresholds = lexicon.thresholds
     if not content:
-        return {
-            'sentiment_score': 0.0,
-            'sentiment_label': 'neutral',
-            'confidence_score': 0.0,
-            'keywords': [],
-            'bullish_bearish': 'neutral',
-            'risk_level': 'low'
-        }
+        return _empty_analysis(lexicon)
     
     try:
-        # 키워드 기반 감정 분석 - 더 많은 키워드 추가
-        positive_keywords = [
-            '상승', '급등', '호재', '좋다', '매수', '추천', '긍정', '성장', '이익', '수익',
-            '올라', '오를', '상승세', '강세', '반등', '회복', '개선', '기대', '전망', '투자',
-            '목표가', '상향', '돌파', '지지', '우상향', '플러스', '수혜', '성과'
-        ]
-        negative_keywords = [
-            '하락', '급락', '악재', '나쁘다', '매도', '손실', '위험', '부정', '하락세', '손해',
-            '떨어', '내려', '약세', '조정', '하락폭', '우하향', '저조', '부진', '위축',
-            '마이너스', '적자', '손실', '리스크', '불안', '걱정', '우려', '경고'
-        ]
-        bullish_keywords = [
-            '상승', '급등', '매수', '호재', '성장', '오를', '상승세', '강세', '반등',
-            '돌파', '목표가', '상향', '투자', '기대', '전망', '수혜'
-        ]
-        bearish_keywords = [
-            '하락', '급락', '매도', '악재', '떨어', '하락세', '약세', '조정',
-            '손실', '위험', '우려', '경고', '부진'
-        ]
+        # 키워드 기반 감정 분석 - 사전 전체를 한 번에 훑는 매처 사용
+        match = lexicon.matcher.scan(content, with_positions=False)
+        counts = match['counts']
         
         # 키워드 추출
-        keywords = []
-        for keyword in positive_keywords + negative_keywords:
-            if keyword in content:
-                keywords.append(keyword)
+        keywords = match['keywords']
         
         # 감정 점수 계산
-        positive_count = sum(1 for word in positive_keywords if word in content)
-        negative_count = sum(1 for word in negative_keywords if word in content)
+        positive_count = counts['positive']
+        negative_count = counts['negative']
         total_count = positive_count + negative_count
         
         if total_count == 0:
@@ -59,18 +61,18 @@ def analyze_post_sentiment(content):
             confidence_score = 0.0
         else:
             sentiment_score = (positive_count - negative_count) / total_count
-            confidence_score = min(total_count / 10.0, 1.0)  # 최대 1.0
+            confidence_score = min(total_count / thresholds['confidence_divisor'], 1.0)  # 최대 1.0
             
-            if sentiment_score > 0.2:
+            if sentiment_score > thresholds['sentiment_label']:
                 sentiment_label = 'positive'
-            elif sentiment_score < -0.2:
+            elif sentiment_score < -thresholds['sentiment_label']:
                 sentiment_label = 'negative'
             else:
                 sentiment_label = 'neutral'
         
         # 상승/하락 전망 분석
-        bullish_count = sum(1 for word in bullish_keywords if word in content)
-        bearish_count = sum(1 for word in bearish_keywords if word in content)
+        bullish_count = counts['bullish']
+        bearish_count = counts['bearish']
         
         if bullish_count > bearish_count:
             bullish_bearish = 'bullish'
@@ -80,12 +82,11 @@ def analyze_post_sentiment(content):
             bullish_bearish = 'neutral'
         
         # 위험도 계산
-        risk_keywords = ['위험', '손실', '급락', '폭락', '주의']
-        risk_count = sum(1 for word in risk_keywords if word in content)
+        risk_count = counts['risk']
         
-        if risk_count >= 3:
+        if risk_count >= thresholds['risk_high']:
             risk_level = 'high'
-        elif risk_count >= 1:
+        elif risk_count >= thresholds['risk_medium']:
             risk_level = 'medium'
         else:
             risk_level = 'low'
@@ -94,21 +95,69 @@ def analyze_post_sentiment(content):
             'sentiment_score': round(sentiment_score, 4),
             'sentiment_label': sentiment_label,
             'confidence_score': round(confidence_score, 4),
-            'keywords': keywords[:10],  # 상위 10개 키워드만
+            'keywords': keywords[:lexicon.max_keywords],  # 상위 N개 키워드만
             'bullish_bearish': bullish_bearish,
-            'risk_level': risk_level
+            'risk_level': risk_level,
+            'analysis_model': lexicon.model,
+            'analysis_version': lexicon.analysis_version
         }
         
     except Exception as e:
         logger.error(f"감정 분석 실패: {e}")
-        return {
-            'sentiment_score': 0.0,
-            'sentiment_label': 'neutral',
-            'confidence_score': 0.0,
-            'keywords': [],
-            'bullish_bearish': 'neutral',
-            'risk_level': 'low'
-        }
+        return _empty_analysis(lexicon)
+
+def analyze_posts_batch(texts, lexicon=None):
+    """여러 게시글을 한 번에 감정 분석하여 컬럼 단위 결과 반환
+
+    analyze_post_sentiment와 같은 규칙을 NumPy 배열 연산으로 적용하며, 게시글별 dict를 만들지 않습니다.
+    레이블은 int8 코드로 반환되므로 SENTIMENT_LABELS[codes]처럼 변환해서 사용합니다.
+    keyword_hits는 (게시글 수 x lexicon.matcher.patterns) 불리언 행렬입니다.
+    """
+    lexicon = lexicon or get_lexicon()
+    thresholds = lexicon.thresholds
+    matcher = lexicon.matcher
+    hits = matcher.hit_matrix(texts)
+    counts = hits.astype(np.int32) @ matcher.weight_matrix
+    column = {category: counts[:, i] for i, category in enumerate(matcher.categories)}
+    
+    positive_count = column['positive']
+    negative_count = column['negative']
+    total_count = positive_count + negative_count
+    has_keywords = total_count > 0
+    
+    # 감정 점수 및 신뢰도 계산
+    sentiment_score = np.zeros(len(hits), dtype=np.float64)
+    np.divide(positive_count - negative_count, total_count, out=sentiment_score, where=has_keywords)
+    confidence_score = np.minimum(total_count / thresholds['confidence_divisor'], 1.0)
+    
+    label_threshold = thresholds['sentiment_label']
+    sentiment_label = np.select(
+        [sentiment_score > label_threshold, sentiment_score < -label_threshold], [1, 2], default=0
+    ).astype(np.int8)
+    
+    # 상승/하락 전망 분석
+    bullish_count = column['bullish']
+    bearish_count = column['bearish']
+    bullish_bearish = np.select(
+        [bullish_count > bearish_count, bearish_count > bullish_count], [1, 2], default=0
+    ).astype(np.int8)
+    
+    # 위험도 계산
+    risk_count = column['risk']
+    risk_level = np.select(
+        [risk_count >= thresholds['risk_high'], risk_count >= thresholds['risk_medium']], [2, 1], default=0
+    ).astype(np.int8)
+    
+    return {
+        'sentiment_score': np.round(sentiment_score, 4),
+        'sentiment_label': sentiment_label,
+        'confidence_score': np.round(confidence_score, 4),
+        'bullish_bearish': bullish_bearish,
+        'risk_level': risk_level,
+        'keyword_hits': hits,
+        'analysis_model': lexicon.model,
+        'analysis_version': lexicon.analysis_version
+    }
 
 def get_unanalyzed_posts(stock_code, limit=100): # limit=100, 1 = 테스트용
     """분석되지 않은 게시글 조회"""
@@ -134,8 +183,6 @@ def get_unanalyzed_posts(stock_code, limit=100): # limit=100, 1 = 테스트용
     except Exception as e:
         logger.error(f"미분석 게시글 조회 실패: {e}")
         return pd.DataFrame()
-    finally:
-        engine.dispose()
 
 def update_post_content(post_id, content):
     """게시글 본문 내용 업데이트"""
@@ -152,62 +199,231 @@ def update_post_content(post_id, content):
     except Exception as e:
         logger.error(f"게시글 본문 업데이트 실패: {e}")
         return False
-    finally:
-        engine.dispose()
 
-def save_analysis_result(post_id, analysis_result):
-    """분석 결과를 데이터베이스에 저장"""
+_ANALYSIS_UPSERT_QUERY = text("""
+    INSERT INTO post_analysis 
+    (post_id, sentiment_score, sentiment_label, confidence_score, 
+     keywords, bullish_bearish, risk_level, analysis_model, analysis_version)
+    VALUES 
+    (:post_id, :sentiment_score, :sentiment_label, :confidence_score,
+     :keywords, :bullish_bearish, :risk_level, :analysis_model, :analysis_version)
+    ON DUPLICATE KEY UPDATE
+    sentiment_score = VALUES(sentiment_score),
+    sentiment_label = VALUES(sentiment_label),
+    confidence_score = VALUES(confidence_score),
+    keywords = VALUES(keywords),
+    bullish_bearish = VALUES(bullish_bearish),
+    risk_level = VALUES(risk_level),
+    analysis_model = VALUES(analysis_model),
+    analysis_version = VALUES(analysis_version),
+    updated_at = CURRENT_TIMESTAMP
+""")
+
+_CONTENT_UPDATE_QUERY = text(
+    "UPDATE stock_posts SET content = :content, content_strategy = :content_strategy WHERE id = :post_id"
+)
+
+_MARK_ANALYZED_QUERY = text(
+    "UPDATE stock_posts SET is_analyzed = TRUE WHERE id IN :post_ids"
+).bindparams(bindparam('post_ids', expanding=True))
+
+_ANALYSIS_DELETE_QUERY = text(
+    "DELETE FROM post_analysis WHERE post_id IN :post_ids"
+).bindparams(bindparam('post_ids', expanding=True))
+
+_UNIQUE_POST_ID_QUERY = text("""
+    SELECT 1 FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'post_analysis' AND INDEX_NAME = 'unique_post_id'
+    LIMIT 1
+""")
+
+# unique_post_id 키 확인 결과 (키가 있으면 다시 확인하지 않음)
+_unique_post_id = False
+
+def has_unique_post_id(conn):
+    """post_analysis.post_id에 UNIQUE 키(unique_post_id, 마이그레이션 008)가 있는지 확인"""
+    global _unique_post_id
+    if not _unique_post_id:
+        _unique_post_id = conn.execute(_UNIQUE_POST_ID_QUERY).scalar() is not None
+        if not _unique_post_id:
+            logger.warning("post_analysis.post_id UNIQUE 키가 없어 기존 분석 행을 지우고 저장합니다 (python migrations.py 실행 필요)")
+    return _unique_post_id
+
+def _write_analysis_batch(batch):
+    """본문/분석 결과 목록을 하나의 트랜잭션으로 저장
+
+    batch: [{'post_id', 'content'(새로 크롤링한 본문, 없으면 None), 'content_strategy', 'analysis'}, ...]
+    """
     engine = get_db_connection()
     if engine is None:
         return False
     
-    try:
-        with engine.connect() as conn:
-            # 분석 결과 저장
-            analysis_query = text("""
-                INSERT INTO post_analysis 
-                (post_id, sentiment_score, sentiment_label, confidence_score, 
-                 keywords, bullish_bearish, risk_level, analysis_model, analysis_version)
-                VALUES 
-                (:post_id, :sentiment_score, :sentiment_label, :confidence_score,
-                 :keywords, :bullish_bearish, :risk_level, :analysis_model, :analysis_version)
-                ON DUPLICATE KEY UPDATE
-                sentiment_score = VALUES(sentiment_score),
-                sentiment_label = VALUES(sentiment_label),
-                confidence_score = VALUES(confidence_score),
-                keywords = VALUES(keywords),
-                bullish_bearish = VALUES(bullish_bearish),
-                risk_level = VALUES(risk_level),
-                updated_at = CURRENT_TIMESTAMP
-            """)
-            
-            conn.execute(analysis_query, {
-                'post_id': post_id,
-                'sentiment_score': analysis_result['sentiment_score'],
-                'sentiment_label': analysis_result['sentiment_label'],
-                'confidence_score': analysis_result['confidence_score'],
-                'keywords': json.dumps(analysis_result['keywords'], ensure_ascii=False),
-                'bullish_bearish': analysis_result['bullish_bearish'],
-                'risk_level': analysis_result['risk_level'],
-                'analysis_model': 'keyword_based',
-                'analysis_version': '1.0'
-            })
-            
-            # 게시글 분석 완료 표시
-            update_query = text("UPDATE stock_posts SET is_analyzed = TRUE WHERE id = :post_id")
-            conn.execute(update_query, {'post_id': post_id})
-            
-            conn.commit()
+    with engine.connect() as conn:
+        content_params = [
+            {'content': item['content'], 'content_strategy': item.get('content_strategy'), 'post_id': item['post_id']}
+            for item in batch if item.get('content')
+        ]
+        if content_params:
+            conn.execute(_CONTENT_UPDATE_QUERY, content_params)
         
-        return True
+        # UNIQUE 키가 없으면 ON DUPLICATE KEY UPDATE가 동작하지 않아 행이 계속 늘어나므로 기존 행을 먼저 삭제
+        if not has_unique_post_id(conn):
+            batch = list({item['post_id']: item for item in batch}.values())
+            conn.execute(_ANALYSIS_DELETE_QUERY, {'post_ids': [item['post_id'] for item in batch]})
+        
+        # executemany: PyMySQL이 하나의 multi-row INSERT ... ON DUPLICATE KEY UPDATE 문으로 전송
+        conn.execute(_ANALYSIS_UPSERT_QUERY, [
+            {
+                'post_id': item['post_id'],
+                'sentiment_score': item['analysis']['sentiment_score'],
+                'sentiment_label': item['analysis']['sentiment_label'],
+                'confidence_score': item['analysis']['confidence_score'],
+                'keywords': json.dumps(item['analysis']['keywords'], ensure_ascii=False),
+                'bullish_bearish': item['analysis']['bullish_bearish'],
+                'risk_level': item['analysis']['risk_level'],
+                'analysis_model': item['analysis'].get('analysis_model', 'keyword_based'),
+                'analysis_version': item['analysis'].get('analysis_version', '1.0')
+            }
+            for item in batch
+        ])
+        
+        # 게시글 분석 완료 표시
+        conn.execute(_MARK_ANALYZED_QUERY, {'post_ids': [item['post_id'] for item in batch]})
+        
+        conn.commit()
+    return True
+
+def save_analysis_result(post_id, analysis_result):
+    """분석 결과를 데이터베이스에 저장"""
+    try:
+        return _write_analysis_batch([{'post_id': post_id, 'analysis': analysis_result}])
     except Exception as e:
         logger.error(f"분석 결과 저장 실패: {e}")
         return False
-    finally:
-        engine.dispose()
 
-def analyze_posts_content(stock_code):
-    """게시글 본문 크롤링 및 분석 수행"""
+class AnalysisResultWriter:
+    """분석 결과를 모아 batch_size건 또는 flush_interval초마다 한 트랜잭션으로 저장
+
+    결과가 더 들어오지 않아도 백그라운드 스레드가 flush_interval초가 지난 버퍼를 저장합니다
+    (flush_interval이 무한대이면 스레드 없이 batch_size와 flush()/close()로만 저장).
+    with 블록을 벗어나거나 close()를 호출하면 남은 결과를 저장하며,
+    닫지 않고 프로세스가 종료되는 경우에도 atexit에서 한 번 더 flush합니다.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=5.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 저장 순서 유지 (같은 게시글의 결과가 뒤바뀌지 않도록)
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        self._flusher = None
+        if 0 < flush_interval < float('inf'):
+            self._flusher = threading.Thread(target=self._flush_periodically, name='analysis-writer-flush', daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def add(self, post_id, analysis_result, content=None, content_strategy=None):
+        """분석 결과 추가 (content: 새로 크롤링한 본문이 있으면 추출 방법과 함께 저장)"""
+        with self._lock:
+            self._buffer.append({'post_id': post_id, 'content': content, 'content_strategy': content_strategy,
+                                 'analysis': analysis_result})
+            due = (len(self._buffer) >= self.batch_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def _flush_periodically(self):
+        """마지막 저장 후 flush_interval초가 지나면 버퍼에 남은 결과를 저장 (백그라운드 스레드)"""
+        timeout = self.flush_interval
+        while not self._closed.wait(timeout):
+            with self._lock:
+                waited = time.monotonic() - self._last_flush
+                due = bool(self._buffer) and waited >= self.flush_interval
+            if due:
+                self.flush()
+                timeout = self.flush_interval
+            else:
+                timeout = self.flush_interval - waited if waited < self.flush_interval else self.flush_interval
+
+    def flush(self):
+        """버퍼에 쌓인 결과를 저장하고 저장된 건수 반환"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+            if not batch:
+                return 0
+            
+            try:
+                if not _write_analysis_batch(batch):
+                    raise RuntimeError("데이터베이스 연결 실패")
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"분석 결과 일괄 저장 실패 ({len(batch)}건): {e}")
+                return 0
+            
+            self.written += len(batch)
+            logger.debug(f"분석 결과 {len(batch)}건 저장 (누적 {self.written}건)")
+            return len(batch)
+
+    def close(self):
+        """백그라운드 저장 스레드를 멈추고 남은 결과를 저장한 뒤 종료 훅 해제"""
+        self._closed.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _fetch_and_analyze(post):
+    """게시글 본문을 크롤링하고 감정 분석 (작업 스레드에서 실행)"""
+    post_id = post['id']
+    link = post['link']
+    content = post['content']
+    title = post['title']
+    crawled_content = None
+    content_strategy = None
+    
+    # 본문이 없으면 크롤링
+    if not content and link:
+        logger.debug(f"게시글 본문 크롤링 중: {link}")
+        crawled_content, content_strategy = get_post_content(link, with_strategy=True)
+        if crawled_content:
+            content = crawled_content
+            logger.debug(f"본문 크롤링 완료: {len(content)}자")
+        else:
+            logger.warning(f"본문 크롤링 실패: {link}")
+    
+    # 제목과 본문을 합쳐서 분석 (제목도 중요한 감정 정보 포함)
+    full_text = f"{title or ''} {content or ''}".strip()
+    if not full_text:
+        # 제목과 본문이 모두 없는 경우
+        logger.warning(f"게시글 {post_id}: 제목과 본문이 모두 비어있음")
+    
+    return {
+        'post_id': post_id,
+        'content': crawled_content,
+        'content_strategy': content_strategy,
+        'analysis': analyze_post_sentiment(full_text)
+    }
+
+def analyze_posts_content(stock_code, max_workers=None, batch_size=20):
+    """게시글 본문 크롤링 및 분석 수행
+
+    max_workers개의 작업 스레드가 공유 rate limiter 아래에서 본문을 동시에 수집/분석하고,
+    결과는 AnalysisResultWriter에 모아 batch_size건씩 DB에 저장합니다. 저장은 호출 스레드(add()에서
+    batch_size에 도달한 경우)와 writer의 백그라운드 스레드(analysis-writer-flush, flush_interval 경과 시)가
+    모두 할 수 있으며, writer의 _flush_lock이 두 저장을 순서대로 실행합니다.
+    """
     # 먼저 제목/링크가 없는 게시글들을 분석 완료로 표시
     mark_empty_posts_as_analyzed(stock_code)
     
@@ -218,59 +434,120 @@ def analyze_posts_content(stock_code):
         logger.info("분석할 게시글이 없습니다.")
         return 0
     
-    logger.info(f"분석 대상 게시글: {len(unanalyzed_posts)}개")
-    analyzed_count = 0
+    if max_workers is None:
+        max_workers = CRAWLING_CONFIG['concurrency']
     
-    for idx, post in unanalyzed_posts.iterrows():
-        try:
-            post_id = post['id']
-            link = post['link']
-            
-            logger.info(f"게시글 분석 중: {post_id} ({idx + 1}/{len(unanalyzed_posts)})")
-            
-            # 본문이 없으면 크롤링
-            content = post['content']
-            title = post['title']
-            
-            if not content and link:
-                logger.debug(f"게시글 본문 크롤링 중: {link}")
-                crawled_content = get_post_content(link)
-                if crawled_content:
-                    content = crawled_content  # 변수에도 업데이트
-                    update_post_content(post_id, content)
-                    logger.debug(f"본문 크롤링 완료: {len(content)}자")
-                else:
-                    logger.warning(f"본문 크롤링 실패: {link}")
-            
-            # 제목과 본문을 합쳐서 분석 (제목도 중요한 감정 정보 포함)
-            full_text = f"{title} {content}".strip()
+    total = len(unanalyzed_posts)
+    logger.info(f"분석 대상 게시글: {total}개 (작업 스레드 {max_workers}개)")
+    
+    with AnalysisResultWriter(batch_size=batch_size) as writer, \
+            ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_fetch_and_analyze, post): post['id']
+            for post in unanalyzed_posts.to_dict('records')
+        }
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            post_id = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"게시글 {post_id} 분석 실패: {e}")
+                continue
             
-            # 감정 분석 수행
-            if full_text:
-                analysis_result = analyze_post_sentiment(full_text)
-                if save_analysis_result(post_id, analysis_result):
-                    analyzed_count += 1
-                    logger.info(f"분석 완료: 감정={analysis_result['sentiment_label']}, 전망={analysis_result['bullish_bearish']}")
-            else:
-                # 제목과 본문이 모두 없는 경우
-                logger.warning(f"게시글 {post_id}: 제목과 본문이 모두 비어있음")
-                save_analysis_result(post_id, {
-                    'sentiment_score': 0.0,
-                    'sentiment_label': 'neutral',
-                    'confidence_score': 0.0,
-                    'keywords': [],
-                    'bullish_bearish': 'neutral',
-                    'risk_level': 'low'
-                })
+            logger.info(f"분석 완료 ({done}/{total}): {post_id} 감정={result['analysis']['sentiment_label']}, 전망={result['analysis']['bullish_bearish']}")
+            writer.add(result['post_id'], result['analysis'], content=result['content'],
+                       content_strategy=result['content_strategy'])
+    
+    logger.info(f"본문 추출 통계 (프로세스 누적): {extraction_stats.summary()}")
+    return writer.written
+
+def _stale_posts_query(stock_code, analysis_version, chunk_size):
+    """현재 사전 버전과 다른 analysis_version으로 분석된 게시글을 post_id 순서로 조회하는 keyset 쿼리와 바인딩 값"""
+    query, params = (
+        QueryFilter()
+        .where("pa.post_id > :last_id", last_id=0)
+        .where("(pa.analysis_version IS NULL OR pa.analysis_version <> :analysis_version)",
+               analysis_version=analysis_version)
+        .stocks(stock_code)
+        .build(
+            "SELECT pa.post_id, sp.title, sp.content\n"
+            "FROM post_analysis pa\n"
+            "JOIN stock_posts sp ON sp.id = pa.post_id",
+            "ORDER BY pa.post_id\nLIMIT :chunk_size"
+        )
+    )
+    params['chunk_size'] = chunk_size
+    return query, params
+
+def _batch_results(batch, lexicon):
+    """analyze_posts_batch의 컬럼 결과를 게시글별 분석 결과 dict로 변환"""
+    matcher = lexicon.matcher
+    patterns = np.array(matcher.patterns, dtype=object)
+    sentiment_labels = SENTIMENT_LABELS[batch['sentiment_label']].tolist()
+    bullish_bearish = BULLISH_BEARISH_LABELS[batch['bullish_bearish']].tolist()
+    risk_levels = RISK_LEVELS[batch['risk_level']].tolist()
+    
+    for i, (score, confidence) in enumerate(zip(batch['sentiment_score'].tolist(), batch['confidence_score'].tolist())):
+        keywords = matcher.keywords(patterns[batch['keyword_hits'][i]])
+        yield {
+            'sentiment_score': score,
+            'sentiment_label': sentiment_labels[i],
+            'confidence_score': confidence,
+            'keywords': keywords[:lexicon.max_keywords],
+            'bullish_bearish': bullish_bearish[i],
+            'risk_level': risk_levels[i],
+            'analysis_model': batch['analysis_model'],
+            'analysis_version': batch['analysis_version']
+        }
+
+def analyze_post_texts(texts, lexicon=None):
+    """여러 게시글을 한 번에 분석해 게시글별 분석 결과 dict 목록 반환 (AnalysisResultWriter.add()에 그대로 사용)"""
+    lexicon = lexicon or get_lexicon()
+    return list(_batch_results(analyze_posts_batch(texts, lexicon), lexicon))
+
+def reanalyze_stale_posts(stock_code=None, chunk_size=1000):
+    """사전 버전이 바뀐 게시글만 저장된 제목/본문으로 다시 분석 (네트워크 요청 없음, 종목은 하나 또는 목록)
+
+    post_analysis.analysis_version이 현재 사전 버전과 다른 행을 post_id 기준 keyset 방식으로
+    chunk_size건씩 읽어 analyze_posts_batch로 일괄 채점하고 결과를 덮어씁니다.
+    실행 중 사전 파일이 바뀌어도 시작 시점의 사전 하나로 끝까지 처리합니다.
+    """
+    engine = get_db_connection()
+    if engine is None:
+        return 0
+    
+    lexicon = get_lexicon()
+    query, params = _stale_posts_query(stock_code, lexicon.analysis_version, chunk_size)
+    
+    logger.info(f"재분석 시작: {', '.join(stock_codes(stock_code)) or '전체 종목'} (analysis_version={lexicon.analysis_version})")
+    started = time.monotonic()
+    scanned = 0
+    
+    with AnalysisResultWriter(batch_size=chunk_size, flush_interval=float('inf')) as writer:
+        while True:
+            with engine.connect() as conn:
+                rows = conn.execute(query, params).fetchall()
+            if not rows:
+                break
             
-            # 서버 부하 방지
-            time.sleep(0.5)
+            texts = [f"{title or ''} {content or ''}".strip() for _, title, content in rows]
+            batch = analyze_posts_batch(texts, lexicon)
+            for (post_id, _, _), analysis in zip(rows, _batch_results(batch, lexicon)):
+                writer.add(post_id, analysis)
+            writer.flush()
             
-        except Exception as e:
-            logger.error(f"게시글 {post_id} 분석 실패: {e}")
-            continue
+            scanned += len(rows)
+            params['last_id'] = rows[-1][0]
+            elapsed = time.monotonic() - started
+            logger.info(f"재분석 진행: {scanned}건 ({scanned / elapsed if elapsed > 0 else 0:.0f}건/초)")
     
-    return analyzed_count
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"재분석 완료: {writer.written}건 저장, {writer.failed}건 실패, "
+        f"{elapsed:.1f}초 ({writer.written / elapsed if elapsed > 0 else 0:.0f}건/초)"
+    )
+    return writer.written
 
 def mark_empty_posts_as_analyzed(stock_code):
     """제목이 없거나 링크가 없는 게시글을 분석 완료로 표시"""
@@ -305,8 +582,14 @@ def mark_empty_posts_as_analyzed(stock_code):
     except Exception as e:
         logger.error(f"빈 게시글 처리 실패: {e}")
         return 0
-    finally:
-        engine.dispose()
 
 if __name__ == "__main__":
-    print("hi")
\ No newline at end of file
+    import sys
+
+    # 사용법: python sentiment_analyzer.py reanalyze [stock_code,...]
+    args = sys.argv[1:]
+    if args and args[0] == "reanalyze":
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        reanalyze_stale_posts(args[1].split(',') if len(args) > 1 else None)
+    else:
+        print("사용법: python sentiment_analyzer.py reanalyze [stock_code,...]")
\ No newline at end of file
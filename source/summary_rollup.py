@@ -0,0 +1,291 @@
+"""
+요약 집계 - daily_stock_summary(일별)와 hourly_sentiment_cube(시간대별) 테이블을 증분 방식으로 유지
+
+마지막 실행 이후 분석 결과가 새로 저장/갱신된(post_analysis.updated_at) 게시글이 속한
+(종목, 날짜) 구간만 다시 계산해서 덮어씁니다. 리포트는 원본 게시글 대신 이 집계 행을 읽으므로
+한 달 리포트도 종목당 약 30행(시간대별은 30 x 24셀)만 읽으면 됩니다.
+"""
+
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import text
+from database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = 'daily_stock_summary'
+CUBE_NAME = 'hourly_sentiment_cube'
+
+# 워터마크 직전에 시작해 늦게 커밋된 행을 놓치지 않도록 이 시간만큼 겹쳐서 다시 확인 (재계산은 멱등)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# 한 번에 읽는 최대 일 수 (전체 재계산 시 메모리 사용량 제한)
+MAX_RANGE_DAYS = 31
+
+TOP_KEYWORDS = 10
+
+_TOUCHED_BUCKETS_QUERY = """
+    SELECT DISTINCT sp.stock_code, DATE(sp.date) as day
+    FROM post_analysis pa
+    JOIN stock_posts sp ON sp.id = pa.post_id
+    WHERE pa.updated_at >= :since
+    AND sp.date IS NOT NULL
+"""
+
+_BUCKET_ROWS_QUERY = text("""
+    SELECT sp.date, pa.sentiment_score, pa.sentiment_label, pa.confidence_score,
+           pa.bullish_bearish, pa.risk_level, pa.keywords
+    FROM stock_posts sp
+    JOIN post_analysis pa ON sp.id = pa.post_id
+    WHERE sp.stock_code = :stock_code
+    AND sp.date >= :start
+    AND sp.date < :end
+""")
+
+_SUMMARY_UPSERT_QUERY = text("""
+    INSERT INTO daily_stock_summary
+    (stock_code, date, total_posts, scored_posts, positive_posts, negative_posts, neutral_posts,
+     avg_sentiment_score, sentiment_sum, sentiment_sumsq, avg_confidence_score,
+     bullish_posts, bearish_posts, bullish_ratio, bearish_ratio, high_risk_posts, top_keywords)
+    VALUES
+    (:stock_code, :date, :total_posts, :scored_posts, :positive_posts, :negative_posts, :neutral_posts,
+     :avg_sentiment_score, :sentiment_sum, :sentiment_sumsq, :avg_confidence_score,
+     :bullish_posts, :bearish_posts, :bullish_ratio, :bearish_ratio, :high_risk_posts, :top_keywords)
+    ON DUPLICATE KEY UPDATE
+    total_posts = VALUES(total_posts),
+    scored_posts = VALUES(scored_posts),
+    positive_posts = VALUES(positive_posts),
+    negative_posts = VALUES(negative_posts),
+    neutral_posts = VALUES(neutral_posts),
+    avg_sentiment_score = VALUES(avg_sentiment_score),
+    sentiment_sum = VALUES(sentiment_sum),
+    sentiment_sumsq = VALUES(sentiment_sumsq),
+    avg_confidence_score = VALUES(avg_confidence_score),
+    bullish_posts = VALUES(bullish_posts),
+    bearish_posts = VALUES(bearish_posts),
+    bullish_ratio = VALUES(bullish_ratio),
+    bearish_ratio = VALUES(bearish_ratio),
+    high_risk_posts = VALUES(high_risk_posts),
+    top_keywords = VALUES(top_keywords),
+    updated_at = CURRENT_TIMESTAMP
+""")
+
+_SUMMARY_DELETE_QUERY = text(
+    "DELETE FROM daily_stock_summary WHERE stock_code = :stock_code AND date = :date"
+)
+
+
+_CUBE_DELETE_QUERY = text("""
+    DELETE FROM hourly_sentiment_cube
+    WHERE stock_code = :stock_code
+    AND date >= :start
+    AND date < :end
+""")
+
+_CUBE_INSERT_QUERY = text("""
+    INSERT INTO hourly_sentiment_cube
+    (stock_code, date, hour, total_posts, scored_posts, sentiment_sum, sentiment_sumsq,
+     bullish_posts, bearish_posts, neutral_outlook_posts, positive_posts, negative_posts, neutral_posts)
+    SELECT
+        sp.stock_code,
+        DATE(sp.date),
+        HOUR(sp.date),
+        COUNT(*),
+        COUNT(pa.sentiment_score),
+        COALESCE(SUM(pa.sentiment_score), 0),
+        COALESCE(SUM(pa.sentiment_score * pa.sentiment_score), 0),
+        SUM(CASE WHEN pa.bullish_bearish = 'bullish' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN pa.bullish_bearish = 'bearish' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN pa.bullish_bearish = 'neutral' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN pa.sentiment_label = 'positive' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN pa.sentiment_label = 'negative' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN pa.sentiment_label = 'neutral' THEN 1 ELSE 0 END)
+    FROM stock_posts sp
+    JOIN post_analysis pa ON sp.id = pa.post_id
+    WHERE sp.stock_code = :stock_code
+    AND sp.date >= :start
+    AND sp.date < :end
+    GROUP BY sp.stock_code, DATE(sp.date), HOUR(sp.date)
+""")
+
+
+def _get_watermark(conn, name):
+    row = conn.execute(text("SELECT watermark FROM rollup_state WHERE name = :name"), {'name': name}).fetchone()
+    return row[0] if row else None
+
+
+def _set_watermark(conn, name, watermark):
+    conn.execute(text("""
+        INSERT INTO rollup_state (name, watermark) VALUES (:name, :watermark)
+        ON DUPLICATE KEY UPDATE watermark = VALUES(watermark)
+    """), {'name': name, 'watermark': watermark})
+
+
+def _day_ranges(days):
+    """정렬된 날짜 목록을 연속 구간 [start, end)로 묶음 (구간 길이는 MAX_RANGE_DAYS 이하)"""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] and (day - ranges[-1][0]).days < MAX_RANGE_DAYS:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return ranges
+
+
+def _summarize_days(stock_code, rows):
+    """게시글 행을 날짜별 daily_stock_summary 행(파라미터 dict)으로 집계"""
+    if rows.empty:
+        return []
+
+    day = pd.to_datetime(rows['date']).dt.normalize()
+    score = pd.to_numeric(rows['sentiment_score'], errors='coerce')
+    confidence = pd.to_numeric(rows['confidence_score'], errors='coerce')
+    frame = pd.DataFrame({
+        'day': day,
+        'posts': 1,
+        'scored': score.notna().astype(int),
+        'sentiment_sum': score.fillna(0.0),
+        'sentiment_sumsq': score.fillna(0.0) ** 2,
+        'confidence_sum': confidence.fillna(0.0),
+        'confidence_n': confidence.notna().astype(int),
+        'positive': (rows['sentiment_label'] == 'positive').astype(int),
+        'negative': (rows['sentiment_label'] == 'negative').astype(int),
+        'neutral': (rows['sentiment_label'] == 'neutral').astype(int),
+        'bullish': (rows['bullish_bearish'] == 'bullish').astype(int),
+        'bearish': (rows['bullish_bearish'] == 'bearish').astype(int),
+        'high_risk': (rows['risk_level'] == 'high').astype(int)
+    })
+    sums = frame.groupby('day').sum()
+
+    # 날짜별 키워드 빈도
+    keyword_counts = {}
+    for bucket, keywords in zip(day, rows['keywords']):
+        try:
+            keywords = json.loads(keywords) if isinstance(keywords, (str, bytes)) else keywords
+        except ValueError:
+            continue
+        if isinstance(keywords, list):
+            keyword_counts.setdefault(bucket, Counter()).update(keywords)
+
+    summaries = []
+    for bucket, row in sums.iterrows():
+        total = int(row['posts'])
+        scored = int(row['scored'])
+        confidence_n = int(row['confidence_n'])
+        top_keywords = dict(keyword_counts.get(bucket, Counter()).most_common(TOP_KEYWORDS))
+        summaries.append({
+            'stock_code': stock_code,
+            'date': bucket.to_pydatetime(),
+            'total_posts': total,
+            'scored_posts': scored,
+            'positive_posts': int(row['positive']),
+            'negative_posts': int(row['negative']),
+            'neutral_posts': int(row['neutral']),
+            'avg_sentiment_score': round(float(row['sentiment_sum']) / scored, 4) if scored else None,
+            'sentiment_sum': float(row['sentiment_sum']),
+            'sentiment_sumsq': float(row['sentiment_sumsq']),
+            'avg_confidence_score': round(float(row['confidence_sum']) / confidence_n, 4) if confidence_n else None,
+            'bullish_posts': int(row['bullish']),
+            'bearish_posts': int(row['bearish']),
+            'bullish_ratio': round(int(row['bullish']) / total, 4),
+            'bearish_ratio': round(int(row['bearish']) / total, 4),
+            'high_risk_posts': int(row['high_risk']),
+            'top_keywords': json.dumps(top_keywords, ensure_ascii=False)
+        })
+    return summaries
+
+
+def _refresh_touched_ranges(state_name, stock_code, full, refresh_range):
+    """워터마크 이후 분석 결과가 바뀐 (종목, 날짜)를 연속 구간으로 묶어 refresh_range(conn, code, start, end, days) 호출
+
+    refresh_range는 갱신한 행 수를 반환하며, 모든 구간 처리 후 워터마크를 이번 실행 시작 시각으로 옮깁니다.
+    """
+    engine = get_db_connection()
+    if engine is None:
+        return 0
+
+    touched_query = _TOUCHED_BUCKETS_QUERY
+    params = {}
+    if stock_code:
+        state_name = f"{state_name}:{stock_code}"
+        touched_query += " AND sp.stock_code = :stock_code"
+        params['stock_code'] = stock_code
+
+    with engine.connect() as conn:
+        # 이번 실행 시작 시각(DB 기준)을 다음 워터마크로 사용
+        started_at = conn.execute(text("SELECT NOW()")).scalar()
+        watermark = None if full else _get_watermark(conn, state_name)
+        params['since'] = watermark - WATERMARK_OVERLAP if watermark else datetime(1970, 1, 1)
+
+        touched = pd.read_sql(text(touched_query), conn, params=params)
+        refreshed = 0
+        for code, group in touched.groupby('stock_code'):
+            days = {pd.Timestamp(day).to_pydatetime() for day in group['day']}
+            for start, end in _day_ranges(days):
+                refreshed += refresh_range(conn, code, start, end, days)
+
+        _set_watermark(conn, state_name, started_at)
+        conn.commit()
+
+    return refreshed
+
+
+def _refresh_daily_range(conn, stock_code, start, end, days):
+    """[start, end) 구간의 daily_stock_summary 행 재계산"""
+    rows = pd.read_sql(_BUCKET_ROWS_QUERY, conn, params={'stock_code': stock_code, 'start': start, 'end': end})
+    summaries = _summarize_days(stock_code, rows)
+    if summaries:
+        conn.execute(_SUMMARY_UPSERT_QUERY, summaries)
+
+    # 구간 안의 게시글이 모두 사라진 날짜는 요약 행도 삭제
+    summarized = {summary['date'] for summary in summaries}
+    empty_days = [{'stock_code': stock_code, 'date': day} for day in days
+                  if start <= day < end and day not in summarized]
+    if empty_days:
+        conn.execute(_SUMMARY_DELETE_QUERY, empty_days)
+    return len(summaries) + len(empty_days)
+
+
+def _refresh_hourly_range(conn, stock_code, start, end, days):
+    """[start, end) 구간의 hourly_sentiment_cube 셀을 지우고 DB 안에서 다시 집계"""
+    params = {'stock_code': stock_code, 'start': start, 'end': end}
+    conn.execute(_CUBE_DELETE_QUERY, params)
+    return conn.execute(_CUBE_INSERT_QUERY, params).rowcount
+
+
+def refresh_daily_summary(stock_code=None, full=False):
+    """새로 분석된 게시글이 속한 (종목, 날짜) 구간만 daily_stock_summary에 다시 집계
+
+    full=True이면 워터마크를 무시하고 모든 구간을 다시 계산합니다.
+    갱신한 (종목, 날짜) 구간 수를 반환합니다.
+    """
+    refreshed = _refresh_touched_ranges(ROLLUP_NAME, stock_code, full, _refresh_daily_range)
+    logger.info(f"일별 요약 갱신: {refreshed}개 (종목, 날짜) 구간{' (전체 재계산)' if full else ''}")
+    return refreshed
+
+
+def refresh_hourly_cube(stock_code=None, full=False):
+    """새로 분석된 게시글이 속한 날짜의 hourly_sentiment_cube 셀만 다시 집계
+
+    full=True이면 워터마크를 무시하고 모든 셀을 다시 계산합니다.
+    갱신한 (종목, 날짜, 시간) 셀 수를 반환합니다.
+    """
+    refreshed = _refresh_touched_ranges(CUBE_NAME, stock_code, full, _refresh_hourly_range)
+    logger.info(f"시간대별 집계 갱신: {refreshed}개 (종목, 날짜, 시간) 셀{' (전체 재계산)' if full else ''}")
+    return refreshed
+
+
+if __name__ == "__main__":
+    import sys
+    from config import setup_logging
+
+    setup_logging()
+
+    # 사용법: python summary_rollup.py [stock_code] [--full]
+    args = [arg for arg in sys.argv[1:] if arg != '--full']
+    full = '--full' in sys.argv
+    refresh_daily_summary(args[0] if args else None, full=full)
+    refresh_hourly_cube(args[0] if args else None, full=full)
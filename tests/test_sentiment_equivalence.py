@@ -0,0 +1,167 @@
+"""
+감정 분석 동등성 테스트 - 사전 매처(keyword_matcher.py) 기반 analyze_post_sentiment()가
+기존 부분 문자열 검사 구현과 같은 결과를 내는지 고정 시드 말뭉치로 비교합니다.
+
+pyahocorasick 오토마톤 경로와 고유 키워드별 str.find 경로를 모두 검사하며,
+pyahocorasick이 설치되어 있지 않으면 오토마톤 경로는 건너뜁니다.
+
+사용법:
+    python -m pytest tests/test_sentiment_equivalence.py
+    python -m unittest tests/test_sentiment_equivalence.py
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source'))
+
+import keyword_matcher
+from config import ANALYSIS_CONFIG
+from sentiment_analyzer import analyze_post_sentiment, analyze_post_texts
+
+CORPUS_SIZE = 20000
+CORPUS_SEED = 20250706
+
+# 기존 analyze_post_sentiment()가 비교한 결과 항목 (analysis_model/analysis_version은 이후에 추가된 항목)
+BASELINE_FIELDS = ('sentiment_score', 'sentiment_label', 'confidence_score', 'keywords',
+                   'bullish_bearish', 'risk_level')
+
+
+def baseline_analyze_post_sentiment(content):
+    """사전 매처 도입 전의 analyze_post_sentiment() (키워드 목록마다 `word in content` 검사)"""
+    if not content:
+        return {
+            'sentiment_score': 0.0,
+            'sentiment_label': 'neutral',
+            'confidence_score': 0.0,
+            'keywords': [],
+            'bullish_bearish': 'neutral',
+            'risk_level': 'low'
+        }
+
+    positive_keywords = [
+        '상승', '급등', '호재', '좋다', '매수', '추천', '긍정', '성장', '이익', '수익',
+        '올라', '오를', '상승세', '강세', '반등', '회복', '개선', '기대', '전망', '투자',
+        '목표가', '상향', '돌파', '지지', '우상향', '플러스', '수혜', '성과'
+    ]
+    negative_keywords = [
+        '하락', '급락', '악재', '나쁘다', '매도', '손실', '위험', '부정', '하락세', '손해',
+        '떨어', '내려', '약세', '조정', '하락폭', '우하향', '저조', '부진', '위축',
+        '마이너스', '적자', '손실', '리스크', '불안', '걱정', '우려', '경고'
+    ]
+    bullish_keywords = [
+        '상승', '급등', '매수', '호재', '성장', '오를', '상승세', '강세', '반등',
+        '돌파', '목표가', '상향', '투자', '기대', '전망', '수혜'
+    ]
+    bearish_keywords = [
+        '하락', '급락', '매도', '악재', '떨어', '하락세', '약세', '조정',
+        '손실', '위험', '우려', '경고', '부진'
+    ]
+
+    keywords = []
+    for keyword in positive_keywords + negative_keywords:
+        if keyword in content:
+            keywords.append(keyword)
+
+    positive_count = sum(1 for word in positive_keywords if word in content)
+    negative_count = sum(1 for word in negative_keywords if word in content)
+    total_count = positive_count + negative_count
+
+    if total_count == 0:
+        sentiment_score = 0.0
+        sentiment_label = 'neutral'
+        confidence_score = 0.0
+    else:
+        sentiment_score = (positive_count - negative_count) / total_count
+        confidence_score = min(total_count / 10.0, 1.0)
+
+        if sentiment_score > 0.2:
+            sentiment_label = 'positive'
+        elif sentiment_score < -0.2:
+            sentiment_label = 'negative'
+        else:
+            sentiment_label = 'neutral'
+
+    bullish_count = sum(1 for word in bullish_keywords if word in content)
+    bearish_count = sum(1 for word in bearish_keywords if word in content)
+
+    if bullish_count > bearish_count:
+        bullish_bearish = 'bullish'
+    elif bearish_count > bullish_count:
+        bullish_bearish = 'bearish'
+    else:
+        bullish_bearish = 'neutral'
+
+    risk_keywords = ['위험', '손실', '급락', '폭락', '주의']
+    risk_count = sum(1 for word in risk_keywords if word in content)
+
+    if risk_count >= 3:
+        risk_level = 'high'
+    elif risk_count >= 1:
+        risk_level = 'medium'
+    else:
+        risk_level = 'low'
+
+    return {
+        'sentiment_score': round(sentiment_score, 4),
+        'sentiment_label': sentiment_label,
+        'confidence_score': round(confidence_score, 4),
+        'keywords': keywords[:10],
+        'bullish_bearish': bullish_bearish,
+        'risk_level': risk_level
+    }
+
+
+def make_corpus(lexicon, size=CORPUS_SIZE, seed=CORPUS_SEED):
+    """사전 키워드, 키워드의 일부/겹치는 조각, 일반 단어를 섞은 게시글 말뭉치 (빈 글 포함)"""
+    rng = random.Random(seed)
+    patterns = lexicon.matcher.patterns
+    fragments = [pattern[:1] for pattern in patterns] + [pattern[1:] for pattern in patterns if len(pattern) > 1]
+    filler = ['주식', '오늘', '내일', '외인', '개미', '폭', '상', '하', ' ', '\n', '!!', '?', 'ㅋㅋ', '...']
+    vocabulary = patterns * 2 + fragments + filler
+
+    corpus = ['', ' ']
+    while len(corpus) < size:
+        corpus.append(''.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 60))))
+    return corpus
+
+
+def load_lexicon_with_backend(use_automaton):
+    """설정된 사전 파일로 매처 백엔드(Aho-Corasick / str.find)를 지정해 사전 생성"""
+    saved = keyword_matcher.HAS_AHOCORASICK
+    keyword_matcher.HAS_AHOCORASICK = use_automaton
+    try:
+        return keyword_matcher.load_lexicon(ANALYSIS_CONFIG['lexicon_path'])
+    finally:
+        keyword_matcher.HAS_AHOCORASICK = saved
+
+
+class SentimentEquivalenceTest(unittest.TestCase):
+
+    def assert_equivalent(self, lexicon):
+        corpus = make_corpus(lexicon)
+        batch = analyze_post_texts(corpus, lexicon)
+        for i, content in enumerate(corpus):
+            expected = baseline_analyze_post_sentiment(content)
+            result = analyze_post_sentiment(content, lexicon)
+            self.assertEqual({field: result[field] for field in BASELINE_FIELDS}, expected,
+                             f"analyze_post_sentiment 불일치 (게시글 {i}: {content!r})")
+            self.assertEqual({field: batch[i][field] for field in BASELINE_FIELDS}, expected,
+                             f"analyze_post_texts 불일치 (게시글 {i}: {content!r})")
+
+    @unittest.skipUnless(keyword_matcher.HAS_AHOCORASICK, "pyahocorasick 미설치")
+    def test_automaton_matches_baseline(self):
+        lexicon = load_lexicon_with_backend(True)
+        self.assertIsNotNone(lexicon.matcher._automaton)
+        self.assert_equivalent(lexicon)
+
+    def test_str_find_matches_baseline(self):
+        lexicon = load_lexicon_with_backend(False)
+        self.assertIsNone(lexicon.matcher._automaton)
+        self.assert_equivalent(lexicon)
+
+
+if __name__ == "__main__":
+    unittest.main()